@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+STARTUP BENCHMARK
+Cold-start time of both entry points, measured in fresh interpreters
+Save a baseline once per device, then --check after changes to catch
+startup regressions (exits 1 when a stage got slower than the tolerance)
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+HUNTER_READY = "import degen_hunter; degen_hunter.DegenCoinHunter('', '')"
+
+# Existing database with a launch history but no state snapshot (cold start after a crash
+# or a deleted snapshot): the seen-filter rebuild must not delay the first scan
+WITH_HISTORY = HUNTER_READY + """
+import sqlite3
+conn = sqlite3.connect('degen_tracker.db')
+conn.executemany('INSERT INTO new_launches (token_address) VALUES (?)',
+                 ((f'0x{i:040x}',) for i in range(200000)))
+conn.commit()
+"""
+
+# (name, setup run once in the scratch directory first or None, code that is timed)
+STAGES = [
+    ('interpreter', None, "pass"),
+    ('import telegram_control', None, "import telegram_control"),
+    ('import degen_hunter', None, "import degen_hunter"),
+    ('import unified_bot', None, "import unified_bot"),
+    ('hunter ready (new db)', None, HUNTER_READY),
+    ('hunter ready (existing db)', HUNTER_READY, HUNTER_READY),
+    ('hunter ready (200k launches)', WITH_HISTORY, HUNTER_READY),
+]
+
+
+def run_stage(code: str, workdir: str) -> float:
+    """Wall-clock seconds for one fresh interpreter to run code and exit"""
+    env = dict(os.environ, PYTHONPATH=REPO_DIR, PYTHONDONTWRITEBYTECODE='1')
+    started = time.perf_counter()
+    subprocess.run(
+        # os._exit: don't count interpreter teardown or waiting for daemon threads
+        [sys.executable, '-c', f"{code}\nimport os; os._exit(0)"],
+        cwd=workdir, env=env, check=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - started
+
+
+def measure(runs: int) -> dict:
+    """Median milliseconds per stage"""
+    results = {}
+    for name, setup, code in STAGES:
+        times = []
+        for _ in range(runs):
+            workdir = tempfile.mkdtemp(prefix='startup-bench-')
+            try:
+                if setup:
+                    run_stage(setup, workdir)
+                times.append(run_stage(code, workdir))
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+        times.sort()
+        results[name] = round(times[len(times) // 2] * 1000, 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start time of the bot entry points")
+    parser.add_argument('--runs', type=int, default=7, help="runs per stage (median is reported)")
+    parser.add_argument('--save', metavar='FILE', help="write the results as a baseline")
+    parser.add_argument('--check', metavar='FILE', help="compare against a saved baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown per stage as a fraction (default 0.25)")
+    parser.add_argument('--slack-ms', type=float, default=20,
+                        help="absolute noise allowance per stage in ms (default 20)")
+    args = parser.parse_args()
+    
+    print(f"⏱️  Startup benchmark ({args.runs} runs per stage, median)\n")
+    results = measure(args.runs)
+    
+    baseline = {}
+    if args.check:
+        with open(args.check) as f:
+            baseline = json.load(f)
+    
+    regressions = []
+    for name, ms in results.items():
+        line = f"  {name:<28} {ms:>8.1f} ms"
+        if name in baseline:
+            limit = baseline[name] * (1 + args.tolerance) + args.slack_ms
+            slower = ms > limit
+            line += f"   (baseline {baseline[name]:.1f} ms{' ❌ REGRESSION' if slower else ' ✅'})"
+            if slower:
+                regressions.append(name)
+        print(line)
+    
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.save}")
+    
+    if regressions:
+        print(f"\n❌ Slower than baseline: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,33 +6,3081 @@ SAFE: Read-only monitoring, NO auto-trading
 """
 
 import os
+import sys
 import time
 import json
+import signal
+import faulthandler
+import zlib
 import requests
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional, Tuple
 import sqlite3
+import struct
+import mmap
+import string
+import math
+import hashlib
+import bisect
+import heapq
+import threading
+import queue
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from abc import ABC, abstractmethod
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class AlertTemplate:
+    """
+    Alert message template compiled once into static text and field slots
+    Rendering only formats the dynamic fields and joins the segments
+    """
+    
+    def __init__(self, source: str):
+        self.segments = []  # str (static) or (field, format_spec) tuples
+        self.fields = []
+        
+        for literal, field, format_spec, _ in string.Formatter().parse(source.strip()):
+            if literal:
+                if self.segments and isinstance(self.segments[-1], str):
+                    self.segments[-1] += literal
+                else:
+                    self.segments.append(literal)
+            if field is not None:
+                self.segments.append((field, format_spec or ''))
+                if field not in self.fields:
+                    self.fields.append(field)
+    
+    def snapshot_key(self, values: Dict) -> tuple:
+        """Hashable snapshot of the values this template actually uses"""
+        return tuple(values[field] for field in self.fields)
+    
+    def render(self, values: Dict) -> str:
+        """Render template with dynamic values"""
+        return ''.join(
+            segment if isinstance(segment, str) else format(values[segment[0]], segment[1])
+            for segment in self.segments
+        )
+
+
+class RenderCache:
+    """LRU cache of rendered messages keyed by (template, value snapshot)"""
+    
+    def __init__(self, max_size: int = 512):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()  # scan and price threads render concurrently
+        self.hits = 0
+        self.misses = 0
+    
+    def render(self, name: str, template: AlertTemplate, values: Dict) -> str:
+        """Return cached message for identical snapshots, render otherwise"""
+        # The snapshot itself, not its hash: two snapshots may share a hash
+        key = (name, template.snapshot_key(values))
+        with self.lock:
+            message = self.entries.get(key)
+            if message is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return message
+            self.misses += 1
+        
+        message = template.render(values)
+        with self.lock:
+            self.entries[key] = message
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return message
+
+
+DEGEN_WARNING = """<b>⚠️ DEGEN WARNING:</b>
+✅ Check contract on scanner
+✅ Verify liquidity locked
+✅ Check holder distribution
+✅ Use SMALL position size
+✅ Set stop loss -20%
+✅ Never invest more than you can lose
+
+<i>This is extremely high risk. Most degen coins go to zero.</i>"""
+
+LAUNCH_TEMPLATE = AlertTemplate("""
+💎 <b>NEW DEGEN COIN ALERT</b> {score_emoji} {pump_status}
+
+<b>Token:</b> {name} (${symbol})
+<b>Chain:</b> {chain}
+<b>DEX:</b> {dex}
+
+<b>🎯 DEGEN SCORE: {score:.0f}/100 ({potential} POTENTIAL)</b>
+
+<b>💰 Stats:</b>
+• Price: ${price:.10f}
+• Liquidity: ${liquidity:,.0f}
+• Volume 24h: ${volume_24h:,.0f}
+• Age: {age_hours:.1f} hours
+
+<b>📊 Price Action:</b>
+• 5m: {price_change_5m:+.1f}%
+• 1h: {price_change_1h:+.1f}%
+• Txns (5m): {txns_5m}
+
+{contract_check}<b>🔗 Trade:</b>
+{url}
+
+""" + DEGEN_WARNING.replace('{', '{{').replace('}', '}}'))
+
+PUMP_TEMPLATE = AlertTemplate("""
+🔥🔥🔥 <b>PUMP DETECTED!</b> 🔥🔥🔥
+
+<b>Token:</b> ${symbol}
+<b>Chain:</b> {chain}
+
+<b>📈 PUMP METRICS:</b>
+• 5m: <b>{price_change_5m:+.1f}%</b>
+• 1h: <b>{price_change_1h:+.1f}%</b>
+• Volume Surge: <b>{volume_surge:.1f}x</b>
+
+<b>💰 Current Price:</b> ${price:.10f}
+
+<b>🔗 Trade:</b>
+{url}
+
+<b>⚠️ PUMP WARNING:</b>
+• Pumps can dump INSTANTLY
+• Take profits on the way up
+• Don't FOMO at peak
+• Use stop loss
+• High risk of rug pull
+""")
+
+PRICE_TEMPLATE = AlertTemplate("""
+{emoji} <b>{title}</b> {emoji}
+
+<b>Token:</b> ${symbol}
+
+<b>📊 Trade Summary:</b>
+• Entry: ${entry_price:.10f}
+• Current: ${current_price:.10f}
+• Target: ${target:.10f}
+
+<b>💰 P/L: {pnl:+.2f}%</b>
+
+<b>🔗 Trade:</b>
+{url}
+
+<b>{advice}</b>
+""")
+
+POSITION_TEMPLATE = AlertTemplate("""
+📌 <b>POSITION: ${symbol}</b> {status}
+
+• Entry: ${entry_price:.10f}
+• Current: ${current_price:.10f}
+• Stop loss: ${stop_loss:.10f}
+• Take profit: ${take_profit:.10f}
+
+<b>💰 P/L: {pnl:+.2f}%</b>
+
+<i>Updated {updated}</i>
+""")
+
+DIGEST_HEADER_TEMPLATE = AlertTemplate("""
+💎 <b>DEGEN DIGEST</b> - {count} new coins
+""")
+
+DIGEST_LINE_TEMPLATE = AlertTemplate("""
+{score_emoji} <b>${symbol}</b> {chain} | Score {score:.0f} {risk_badge}{pump_status}
+   ${price:.10f} | Liq ${liquidity:,.0f} | 1h {price_change_1h:+.1f}%
+   {url}
+""")
+
+# Contract screen verdict / per-check status markers
+RISK_BADGES = {'ok': '🟢', 'caution': '🟡', 'danger': '🔴', 'unknown': '⚪'}
+RISK_STATUS_EMOJI = {'pass': '✅', 'warn': '⚠️', 'fail': '❌', 'unknown': '❔'}
+
+# Telegram caps messages at 4096 UTF-16 units; emojis count double, so leave headroom
+DIGEST_MAX_CHARS = 3500
+
+
+# Max points calculate_degen_score gives for holder count
+HOLDER_MAX_POINTS = 15
+
+
+class HolderBackend(ABC):
+    """
+    Source of holder counts for token contracts
+    Subclasses implement fetch_holders for one batch of addresses on one chain
+    """
+    
+    batch_size = 20
+    
+    @abstractmethod
+    def fetch_holders(self, chain: str, token_addresses: List[str]) -> Dict[str, int]:
+        """Return {token_address: holders} for the addresses it could resolve"""
+
+
+class MockHolderBackend(HolderBackend):
+    """
+    Local holder backend for tests and offline runs
+    Reads {address: holders} from HOLDER_MOCK_FILE if given,
+    otherwise derives a stable count from the address
+    """
+    
+    def __init__(self, holders: Optional[Dict[str, int]] = None, latency: float = 0.0):
+        self.holders = {address.lower(): count for address, count in (holders or {}).items()}
+        self.latency = latency
+        self.calls = 0
+    
+    @classmethod
+    def from_file(cls, path: str) -> 'MockHolderBackend':
+        with open(path) as f:
+            return cls(json.load(f))
+    
+    def fetch_holders(self, chain: str, token_addresses: List[str]) -> Dict[str, int]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        
+        result = {}
+        for address in token_addresses:
+            if self.holders:
+                if address.lower() in self.holders:
+                    result[address] = self.holders[address.lower()]
+            else:
+                result[address] = int(hashlib.sha1(address.lower().encode()).hexdigest()[:4], 16) % 2000
+        return result
+
+
+class ExplorerHolderBackend(HolderBackend):
+    """
+    Etherscan-style explorer backend
+    URL templates come from HOLDER_EXPLORER_URL_<CHAIN> (or HOLDER_EXPLORER_URL),
+    e.g. https://api.etherscan.io/api?module=token&action=tokenholdercount&contractaddress={address}&apikey=KEY
+    Responses look like {"status": "1", "result": "1234"}
+    """
+    
+    batch_size = 5  # explorers rate-limit hard; keep each batch small
+    
+    def __init__(self, http: 'HttpClient'):
+        self.http = http
+    
+    def url_template(self, chain: str) -> str:
+        return os.getenv(f'HOLDER_EXPLORER_URL_{chain.upper()}', os.getenv('HOLDER_EXPLORER_URL', ''))
+    
+    def fetch_one(self, template: str, address: str) -> Optional[int]:
+        response = self.http.get(template.format(address=address), timeout=8)
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        if str(data.get('status')) != '1':
+            return None
+        return int(data.get('result', 0))
+    
+    def fetch_holders(self, chain: str, token_addresses: List[str]) -> Dict[str, int]:
+        template = self.url_template(chain)
+        if not template:
+            return {}
+        
+        result = {}
+        for address in token_addresses:
+            try:
+                holders = self.fetch_one(template, address)
+                if holders is not None:
+                    result[address] = holders
+            except Exception as e:
+                print(f"Holder lookup error ({chain} {address}): {e}")
+                if isinstance(e, CircuitOpenError):
+                    break
+        return result
+
+
+class HolderEnricher:
+    """
+    Fills token_data['holders'] from a HolderBackend
+    Lookups are batched per chain and run on a worker pool; results are cached
+    per token with a TTL. Each cycle has a time budget: lookups still running
+    when it runs out land in the cache for the next cycle instead of delaying alerts
+    """
+    
+    def __init__(self, backend: HolderBackend, ttl_seconds: float = 600,
+                 budget_seconds: float = 3, workers: int = 4):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.budget_seconds = budget_seconds
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="holders")
+        self.cache = {}  # {(chain, token_address): (holders, fetched_at)}
+        self.pending = set()  # keys with a lookup in flight
+        self.lock = threading.Lock()
+        self.budget_left = budget_seconds
+    
+    @classmethod
+    def from_env(cls, http: 'HttpClient') -> Optional['HolderEnricher']:
+        """Build from HOLDER_BACKEND (none, mock, explorer)"""
+        kind = os.getenv('HOLDER_BACKEND', 'none').lower()
+        if kind == 'mock':
+            mock_file = os.getenv('HOLDER_MOCK_FILE', '')
+            backend = MockHolderBackend.from_file(mock_file) if mock_file else MockHolderBackend()
+        elif kind == 'explorer':
+            backend = ExplorerHolderBackend(http)
+        else:
+            return None
+        
+        return cls(
+            backend,
+            ttl_seconds=float(os.getenv('HOLDER_CACHE_TTL', '600')),
+            budget_seconds=float(os.getenv('HOLDER_BUDGET_SECONDS', '3')),
+        )
+    
+    def start_cycle(self):
+        """Reset the per-cycle time budget"""
+        self.budget_left = self.budget_seconds
+    
+    def cached(self, key: tuple) -> Optional[int]:
+        entry = self.cache.get(key)
+        if entry and time.time() - entry[1] < self.ttl_seconds:
+            return entry[0]
+        return None
+    
+    def lookup_batch(self, chain: str, addresses: List[str]):
+        try:
+            holders = self.backend.fetch_holders(chain, addresses)
+        except Exception as e:
+            print(f"Holder backend error ({chain}): {e}")
+            holders = {}
+        
+        now = time.time()
+        with self.lock:
+            for address in addresses:
+                key = (chain, address)
+                self.pending.discard(key)
+                if address in holders:
+                    self.cache[key] = (holders[address], now)
+    
+    def enrich(self, tokens: List[Dict]):
+        """Set 'holders' on tokens from cache, fetching misses within the budget"""
+        misses = {}  # {chain: [address, ...]}
+        with self.lock:
+            for token in tokens:
+                key = (token['chain'], token.get('token_address', ''))
+                if not key[1]:
+                    continue
+                if self.cached(key) is None and key not in self.pending:
+                    self.pending.add(key)
+                    misses.setdefault(key[0], []).append(key[1])
+            
+            # Expire old entries while holding the lock anyway
+            now = time.time()
+            for key in [key for key, entry in self.cache.items() if now - entry[1] >= self.ttl_seconds]:
+                del self.cache[key]
+        
+        futures = []
+        for chain, addresses in misses.items():
+            addresses = list(dict.fromkeys(addresses))
+            for i in range(0, len(addresses), self.backend.batch_size):
+                batch = addresses[i:i + self.backend.batch_size]
+                futures.append(self.executor.submit(self.lookup_batch, chain, batch))
+        
+        if futures and self.budget_left > 0:
+            started = time.time()
+            wait(futures, timeout=self.budget_left)
+            self.budget_left -= time.time() - started
+        
+        with self.lock:
+            for token in tokens:
+                holders = self.cached((token['chain'], token.get('token_address', '')))
+                if holders is not None:
+                    token['holders'] = holders
+
+
+class RiskSource(ABC):
+    """
+    Facts about token contracts for the risk checks
+    Each lookup returns a dict, or None when the source has nothing on the token
+    """
+    
+    @abstractmethod
+    def liquidity_lock(self, chain: str, token_address: str) -> Optional[Dict]:
+        """{'locked_percent': float, 'unlock_days': float}"""
+    
+    @abstractmethod
+    def ownership(self, chain: str, token_address: str) -> Optional[Dict]:
+        """{'renounced': bool, 'can_mint': bool, 'owner_percent': float}"""
+
+
+class MockRiskSource(RiskSource):
+    """
+    Local risk source for tests and offline runs
+    Reads {address: {"liquidity_lock": {...}, "ownership": {...}}} from
+    RISK_MOCK_FILE if given (a hand-kept file doubles as a local source),
+    otherwise derives stable facts from the address
+    """
+    
+    def __init__(self, facts: Optional[Dict[str, Dict]] = None, latency: float = 0.0):
+        self.facts = {address.lower(): entry for address, entry in (facts or {}).items()}
+        self.latency = latency
+        self.calls = 0
+    
+    @classmethod
+    def from_file(cls, path: str) -> 'MockRiskSource':
+        with open(path) as f:
+            return cls(json.load(f))
+    
+    def lookup(self, kind: str, token_address: str) -> Optional[Dict]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+    
+        if self.facts:
+            return self.facts.get(token_address.lower(), {}).get(kind)
+        seed = int(hashlib.sha1(f"{kind}:{token_address.lower()}".encode()).hexdigest()[:8], 16)
+        if kind == 'liquidity_lock':
+            return {'locked_percent': seed % 101, 'unlock_days': (seed >> 8) % 366}
+        return {'renounced': seed % 3 == 0, 'can_mint': seed % 5 == 0, 'owner_percent': (seed >> 8) % 30}
+    
+    def liquidity_lock(self, chain: str, token_address: str) -> Optional[Dict]:
+        return self.lookup('liquidity_lock', token_address)
+    
+    def ownership(self, chain: str, token_address: str) -> Optional[Dict]:
+        return self.lookup('ownership', token_address)
+
+
+class RiskCheck(ABC):
+    """
+    One contract-risk heuristic
+    run returns {'status': 'pass' | 'warn' | 'fail' | 'unknown', 'detail': str}
+    """
+    
+    name = ''
+    
+    @abstractmethod
+    def run(self, source: RiskSource, chain: str, token_address: str) -> Dict:
+        """Verdict of this check for one token"""
+
+
+class LiquidityLockCheck(RiskCheck):
+    """Enough of the LP locked for long enough (half the minimum is a warning)"""
+    
+    name = 'liquidity'
+    
+    def __init__(self, min_percent: float = 80, min_days: float = 30):
+        self.min_percent = min_percent
+        self.min_days = min_days
+    
+    def run(self, source: RiskSource, chain: str, token_address: str) -> Dict:
+        lock = source.liquidity_lock(chain, token_address)
+        if lock is None:
+            return {'status': 'unknown', 'detail': 'no lock data'}
+    
+        percent = float(lock.get('locked_percent') or 0)
+        days = float(lock.get('unlock_days') or 0)
+        if percent <= 0:
+            return {'status': 'fail', 'detail': 'not locked'}
+        detail = f"{percent:.0f}% locked for {days:.0f}d"
+        if percent >= self.min_percent and days >= self.min_days:
+            return {'status': 'pass', 'detail': detail}
+        if percent >= self.min_percent / 2 and days >= self.min_days / 2:
+            return {'status': 'warn', 'detail': detail}
+        return {'status': 'fail', 'detail': detail}
+
+
+class OwnershipCheck(RiskCheck):
+    """Renounced ownership, no mint authority, no large owner bag"""
+    
+    name = 'ownership'
+    
+    def __init__(self, max_owner_percent: float = 10):
+        self.max_owner_percent = max_owner_percent
+    
+    def run(self, source: RiskSource, chain: str, token_address: str) -> Dict:
+        owner = source.ownership(chain, token_address)
+        if owner is None:
+            return {'status': 'unknown', 'detail': 'no contract data'}
+    
+        renounced = bool(owner.get('renounced'))
+        owner_percent = float(owner.get('owner_percent') or 0)
+        if owner.get('can_mint') and not renounced:
+            return {'status': 'fail', 'detail': 'owner can mint'}
+        if owner_percent > self.max_owner_percent:
+            return {'status': 'warn' if renounced else 'fail', 'detail': f"owner holds {owner_percent:.0f}%"}
+        if not renounced:
+            return {'status': 'warn', 'detail': 'ownership not renounced'}
+        return {'status': 'pass', 'detail': 'renounced'}
+
+
+class RiskScreener:
+    """
+    Contract-risk screening for alert candidates
+    Candidates are submitted at scoring time and every check runs in parallel
+    on a worker pool; dispatch waits for them within a per-cycle time budget.
+    Screens still running when it runs out finish in the background and show
+    the next time the token is alerted. Verdicts are stored in SQLite per
+    token address and never recomputed, except 'unknown' ones (the source had
+    no data yet): those live in memory for unknown_ttl and are then screened again
+    """
+    
+    def __init__(self, source: RiskSource, checks: List[RiskCheck], db_path: str,
+                 db_writer: 'DatabaseWriter', budget_seconds: float = 3, workers: int = 4,
+                 cache_size: int = 5000, unknown_ttl: float = 3600):
+        if not checks:
+            raise ValueError("RiskScreener needs at least one check")
+        self.source = source
+        self.checks = checks
+        self.db_path = db_path
+        self.db_writer = db_writer
+        self.budget_seconds = budget_seconds
+        self.cache_size = cache_size
+        self.unknown_ttl = unknown_ttl
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="risk")
+        self.verdicts = OrderedDict()  # {token key: verdict}, LRU in front of the SQLite table
+        self.pending = {}  # {token key: (chain, {check name: future})}
+        self.lock = threading.Lock()
+        self.budget_left = budget_seconds
+        self.stats = {'screened': 0, 'from_db': 0, 'errors': 0, 'ok': 0, 'caution': 0, 'danger': 0, 'unknown': 0}
+    
+    @classmethod
+    def from_env(cls, db_path: str, db_writer: 'DatabaseWriter') -> Optional['RiskScreener']:
+        """Build from RISK_SOURCE (none, mock) and RISK_CHECKS"""
+        kind = os.getenv('RISK_SOURCE', 'none').lower()
+        if kind == 'mock':
+            mock_file = os.getenv('RISK_MOCK_FILE', '')
+            source = MockRiskSource.from_file(mock_file) if mock_file else MockRiskSource()
+        else:
+            return None
+    
+        available = {
+            'liquidity': lambda: LiquidityLockCheck(
+                float(os.getenv('RISK_MIN_LOCKED_PERCENT', '80')),
+                float(os.getenv('RISK_MIN_LOCK_DAYS', '30')),
+            ),
+            'ownership': lambda: OwnershipCheck(float(os.getenv('RISK_MAX_OWNER_PERCENT', '10'))),
+        }
+        names = [name.strip() for name in os.getenv('RISK_CHECKS', 'liquidity,ownership').split(',') if name.strip()]
+        unknown = [name for name in names if name not in available]
+        if unknown or not names:
+            # A typo must not turn into zero checks and a stored 🟢 OK for every token
+            raise ValueError(f"RISK_CHECKS: unknown check(s) {', '.join(unknown) or '(none given)'}; "
+                             f"available: {', '.join(available)}")
+        return cls(
+            source,
+            [available[name]() for name in names],
+            db_path,
+            db_writer,
+            budget_seconds=float(os.getenv('RISK_BUDGET_SECONDS', '3')),
+            workers=int(os.getenv('RISK_WORKERS', '4')),
+            unknown_ttl=float(os.getenv('RISK_UNKNOWN_TTL', '3600')),
+        )
+    
+    def start_cycle(self):
+        """Reset the per-cycle time budget"""
+        self.budget_left = self.budget_seconds
+    
+    @staticmethod
+    def combine(results: Dict[str, Dict]) -> str:
+        """Overall verdict: any fail is danger, any warn/unknown is caution (no results: unknown)"""
+        statuses = {result['status'] for result in results.values()}
+        if 'fail' in statuses:
+            return 'danger'
+        if not statuses or statuses == {'unknown'}:
+            return 'unknown'
+        if statuses & {'warn', 'unknown'}:
+            return 'caution'
+        return 'ok'
+    
+    def remember(self, key: str, verdict: Dict):
+        """Cache a verdict (caller holds the lock)"""
+        self.verdicts[key] = verdict
+        self.verdicts.move_to_end(key)
+        while len(self.verdicts) > self.cache_size:
+            self.verdicts.popitem(last=False)
+    
+    def known(self, key: str) -> bool:
+        """Whether key has a usable verdict; drops expired 'unknown' ones (caller holds the lock)"""
+        verdict = self.verdicts.get(key)
+        if verdict is None:
+            return False
+        if verdict['verdict'] == 'unknown' and time.time() - verdict['screened_at'] >= self.unknown_ttl:
+            del self.verdicts[key]
+            return False
+        return True
+    
+    def load(self, keys: List[str]):
+        """Pull stored verdicts for keys that aren't cached (one query per 500)"""
+        if not keys:
+            return
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            rows = []
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows += conn.execute(
+                    f"SELECT token_address, verdict, checks, screened_at FROM risk_verdicts "
+                    f"WHERE verdict != 'unknown' AND token_address IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+        finally:
+            conn.close()
+    
+        with self.lock:
+            for key, verdict, checks, screened_at in rows:
+                self.remember(key, {'verdict': verdict, 'checks': json.loads(checks), 'screened_at': screened_at})
+                self.stats['from_db'] += 1
+    
+    def complete(self, key: str, entry: tuple):
+        """Done-callback: once every check of a token finished, store its verdict"""
+        chain, futures = entry
+        if not all(future.done() for future in futures.values()):
+            return
+        with self.lock:
+            # Every check's callback (and collect) gets here; only the first stores
+            if self.pending.get(key) is not entry:
+                return
+            del self.pending[key]
+    
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                # Source trouble is not a verdict: screen again next time the token shows up
+                print(f"Risk check {name} error ({key}): {e}")
+                with self.lock:
+                    self.stats['errors'] += 1
+                return
+    
+        verdict = {'verdict': self.combine(results), 'checks': results, 'screened_at': time.time()}
+        with self.lock:
+            self.remember(key, verdict)
+            self.stats['screened'] += 1
+            self.stats[verdict['verdict']] += 1
+        if verdict['verdict'] == 'unknown':
+            return  # not final: kept in memory for unknown_ttl only
+        self.db_writer.execute(
+            'INSERT OR IGNORE INTO risk_verdicts (token_address, chain, verdict, checks, screened_at) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (key, chain, verdict['verdict'], json.dumps(results), verdict['screened_at'])
+        )
+    
+    def submit(self, tokens: List[Dict]):
+        """Start screening tokens that have no verdict yet (doesn't wait)"""
+        tokens = {TokenIndex.key(token['token_address']): token for token in tokens if token.get('token_address')}
+        with self.lock:
+            unknown = [key for key in tokens if not self.known(key) and key not in self.pending]
+        self.load(unknown)
+    
+        for key in unknown:
+            token = tokens[key]
+            with self.lock:
+                if self.known(key) or key in self.pending:
+                    continue
+                entry = (token['chain'], {
+                    check.name: self.executor.submit(check.run, self.source, token['chain'], token['token_address'])
+                    for check in self.checks
+                })
+                self.pending[key] = entry
+            for future in entry[1].values():
+                future.add_done_callback(lambda _, key=key, entry=entry: self.complete(key, entry))
+    
+    def collect(self, tokens: List[Dict]):
+        """Set 'risk' on tokens, waiting for their running screens within the cycle budget"""
+        keys = [TokenIndex.key(token['token_address']) if token.get('token_address') else '' for token in tokens]
+        with self.lock:
+            running = {key: self.pending[key] for key in keys if key in self.pending}
+    
+        futures = [future for _, checks in running.values() for future in checks.values()]
+        if futures and self.budget_left > 0:
+            started = time.time()
+            wait(futures, timeout=self.budget_left)
+            self.budget_left -= time.time() - started
+        # wait() can return before the done-callbacks ran; storing is idempotent
+        for key, entry in running.items():
+            self.complete(key, entry)
+    
+        with self.lock:
+            for token, key in zip(tokens, keys):
+                verdict = self.verdicts.get(key)
+                if verdict:
+                    self.verdicts.move_to_end(key)
+                    token['risk'] = verdict
+    
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return dict(self.stats, pending=len(self.pending), cached=len(self.verdicts))
+
+
+class TokenIndex:
+    """
+    Base-token address -> every pair seen for it across chains and DEXes
+    Lets the hunter collapse duplicate listings and price from the deepest pool
+    """
+    
+    def __init__(self, max_age_seconds: float = 6 * 3600):
+        self.max_age_seconds = max_age_seconds
+        self.tokens = {}  # {token_address: {pair_address: pair info}}
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def key(token_address: str) -> str:
+        return token_address.lower()
+    
+    def add(self, token_address: str, pair_address: str, info: Dict):
+        if not token_address or not pair_address:
+            return
+        info['updated_at'] = time.time()
+        with self.lock:
+            self.tokens.setdefault(self.key(token_address), {})[pair_address] = info
+    
+    def update(self, tokens: List[Dict]):
+        """Index parsed token data from a scan"""
+        for token in tokens:
+            self.add(token.get('token_address', ''), token['address'], {
+                'chain': token['chain'],
+                'dex': token['dex'],
+                'symbol': token['symbol'],
+                'price': token['price'],
+                'liquidity': token['liquidity'],
+                'url': token['url'],
+            })
+    
+    def update_from_pairs(self, pairs: List[Dict]):
+        """Index raw DexScreener pairs (e.g. from /tokens lookups)"""
+        for pair in pairs:
+            chain = pair.get('chainId', '')
+            pair_address = pair.get('pairAddress', '')
+            self.add(pair.get('baseToken', {}).get('address', ''), pair_address, {
+                'chain': chain,
+                'dex': pair.get('dexId', ''),
+                'symbol': pair.get('baseToken', {}).get('symbol', ''),
+                'price': float(pair.get('priceUsd') or 0),
+                'liquidity': float((pair.get('liquidity') or {}).get('usd', 0) or 0),
+                'url': f"https://dexscreener.com/{chain}/{pair_address}",
+            })
+    
+    def pairs(self, token_address: str) -> Dict[str, Dict]:
+        with self.lock:
+            return dict(self.tokens.get(self.key(token_address), {}))
+    
+    def best_pair(self, token_address: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """Deepest-liquidity pair for a token (optionally only if updated recently)"""
+        now = time.time()
+        best = None
+        for pair_address, info in self.pairs(token_address).items():
+            if max_age is not None and now - info['updated_at'] > max_age:
+                continue
+            if info['price'] <= 0:
+                continue
+            if best is None or info['liquidity'] > best['liquidity']:
+                best = dict(info, pair_address=pair_address)
+        return best
+    
+    def prune(self):
+        """Drop pairs not refreshed within max_age_seconds"""
+        cutoff = time.time() - self.max_age_seconds
+        with self.lock:
+            for key, pairs in list(self.tokens.items()):
+                for pair_address in [p for p, info in pairs.items() if info['updated_at'] < cutoff]:
+                    del pairs[pair_address]
+                if not pairs:
+                    del self.tokens[key]
+    
+    def __len__(self):
+        return len(self.tokens)
+
+
+class SymbolIndex:
+    """
+    Prefix lookup over the symbol and name of every scanned token
+    Terms live in one sorted list of (term, token key), so a prefix query is a
+    bisect plus a short forward scan; matches rank by liquidity, then score
+    """
+    
+    def __init__(self, max_scan: int = 500):
+        self.max_scan = max_scan
+        self.terms = []  # sorted [(term, token key)]
+        self.tokens = {}  # {token key: {token_address, symbol, name, chain, liquidity, score, price, url}}
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def terms_for(symbol: str, name: str) -> set:
+        symbol = symbol.lower().lstrip('$')
+        name = name.lower()
+        terms = {symbol, name} | set(name.split())
+        terms.discard('')
+        return terms
+    
+    def add(self, token: Dict):
+        """Index a parsed token (keeps its deepest pair)"""
+        address = token.get('token_address') or token.get('address', '')
+        if not address or not (token.get('symbol') or token.get('name')):
+            return
+        key = TokenIndex.key(address)
+        entry = {
+            'token_address': token.get('token_address', ''),  # empty for launches stored without it
+            'symbol': token.get('symbol', ''),
+            'name': token.get('name', ''),
+            'chain': token.get('chain', ''),
+            'liquidity': token.get('liquidity', 0) or 0,
+            'score': token.get('degen_score', 0) or 0,
+            'price': token.get('price', 0) or 0,
+            'url': token.get('url', ''),
+        }
+        
+        with self.lock:
+            current = self.tokens.get(key)
+            if current is not None:
+                entry['score'] = max(current['score'], entry['score'])
+                if current['liquidity'] > entry['liquidity'] and current['url'] != entry['url']:
+                    # Shallower listing of a known token: keep the deeper pair's details
+                    current['score'] = entry['score']
+                    return
+                if (current['symbol'], current['name']) == (entry['symbol'], entry['name']):
+                    self.tokens[key] = entry
+                    return
+                self.remove_terms(key, current)
+            
+            self.tokens[key] = entry
+            for term in self.terms_for(entry['symbol'], entry['name']):
+                bisect.insort(self.terms, (term, key))
+    
+    def load(self, tokens: List[Dict]):
+        """
+        Bulk build (one sort instead of an insort per token)
+        Tokens already indexed by a scan are fresher and kept as they are
+        """
+        with self.lock:
+            scanned = set(self.tokens)
+            for token in tokens:
+                address = token.get('token_address') or token.get('address', '')
+                key = TokenIndex.key(address)
+                if key in scanned:
+                    continue
+                current = self.tokens.get(key)
+                if current is None or token['liquidity'] >= current['liquidity']:
+                    self.tokens[key] = token
+            self.terms = sorted(
+                (term, key) for key, token in self.tokens.items()
+                for term in self.terms_for(token['symbol'], token['name'])
+            )
+    
+    def remove_terms(self, key: str, entry: Dict):
+        for term in self.terms_for(entry['symbol'], entry['name']):
+            index = bisect.bisect_left(self.terms, (term, key))
+            if index < len(self.terms) and self.terms[index] == (term, key):
+                del self.terms[index]
+    
+    def find(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Best tokens whose symbol, name or a name word starts with prefix"""
+        prefix = prefix.lower().lstrip('$')
+        if not prefix:
+            return []
+        
+        with self.lock:
+            index = bisect.bisect_left(self.terms, (prefix,))
+            keys = set()
+            while index < len(self.terms) and len(keys) < self.max_scan:
+                term, key = self.terms[index]
+                if not term.startswith(prefix):
+                    break
+                keys.add(key)
+                index += 1
+            
+            # Exact symbol matches first, then the deepest and best-scored
+            tokens = self.tokens
+            best = heapq.nlargest(limit, keys, key=lambda key: (
+                tokens[key]['symbol'].lower() == prefix, tokens[key]['liquidity'], tokens[key]['score']
+            ))
+            return [dict(tokens[key]) for key in best]
+    
+    def __len__(self):
+        return len(self.tokens)
+
+
+class PumpStats:
+    """
+    Online EWMA mean/variance of price moves per chain and liquidity bucket
+    O(1) per update, a few floats per key, persisted in SQLite (pump_stats)
+    so detection keeps what it learned across restarts
+    """
+    
+    # Upper bounds (USD) of liquidity buckets; last bucket is everything above
+    LIQUIDITY_BUCKETS = [10000, 50000, 250000, 1000000]
+    METRICS = ('m5', 'h1', 'vol_liq')
+    
+    def __init__(self, alpha: float = 0.05, min_samples: int = 30, z_threshold: float = 3.0):
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.z_threshold = z_threshold
+        self.stats = {}  # {key: [n, mean, var]}
+        self.dirty = set()
+        self.lock = threading.Lock()
+    
+    @classmethod
+    def liquidity_bucket(cls, liquidity: float) -> int:
+        return bisect.bisect_right(cls.LIQUIDITY_BUCKETS, liquidity)
+    
+    @classmethod
+    def metrics(cls, token: Dict) -> Dict[str, float]:
+        liquidity = token.get('liquidity', 0)
+        return {
+            'm5': token.get('price_change_5m', 0),
+            'h1': token.get('price_change_1h', 0),
+            'vol_liq': token.get('volume_24h', 0) / liquidity if liquidity > 0 else 0.0,
+        }
+    
+    def key(self, token: Dict, metric: str) -> str:
+        return f"{str(token.get('chain', '')).lower()}:{self.liquidity_bucket(token.get('liquidity', 0))}:{metric}"
+    
+    def zscores(self, token: Dict) -> Optional[Dict[str, float]]:
+        """z-score per metric, or None while any of the token's buckets is warming up"""
+        zscores = {}
+        with self.lock:
+            for metric, value in self.metrics(token).items():
+                entry = self.stats.get(self.key(token, metric))
+                if entry is None or entry[0] < self.min_samples:
+                    return None
+                n, mean, var = entry
+                zscores[metric] = (value - mean) / math.sqrt(var) if var > 0 else 0.0
+        return zscores
+    
+    def observe(self, token: Dict):
+        """Fold the token's current moves into its buckets' EWMA"""
+        with self.lock:
+            for metric, value in self.metrics(token).items():
+                key = self.key(token, metric)
+                entry = self.stats.get(key)
+                if entry is None:
+                    self.stats[key] = [1, value, 0.0]
+                else:
+                    diff = value - entry[1]
+                    increment = self.alpha * diff
+                    entry[0] += 1
+                    entry[1] += increment
+                    entry[2] = (1 - self.alpha) * (entry[2] + diff * increment)
+                self.dirty.add(key)
+    
+    def is_abnormal(self, token: Dict) -> Optional[bool]:
+        """Upward move beyond z_threshold on any metric (None = not enough data)"""
+        zscores = self.zscores(token)
+        if zscores is None:
+            return None
+        token['pump_z'] = round(max(zscores.values()), 2)
+        return token['pump_z'] > self.z_threshold
+    
+    def load(self, rows: List[tuple]):
+        with self.lock:
+            for key, n, mean, var in rows:
+                self.stats[key] = [int(n), float(mean), float(var)]
+    
+    def dirty_rows(self) -> List[tuple]:
+        """Rows changed since the last call, for persisting"""
+        with self.lock:
+            rows = [(key, *self.stats[key]) for key in self.dirty]
+            self.dirty.clear()
+        return rows
+
+
+def merge_listing(current: Dict, launch: Dict) -> Dict:
+    """
+    Merge two listings of the same base token: keep the deepest-liquidity pair,
+    pumping if either is, and count the extra listing
+    """
+    merged = dict(launch) if launch['liquidity'] > current['liquidity'] else dict(current)
+    merged['is_pumping'] = current['is_pumping'] or launch['is_pumping']
+    merged['other_listings'] = current.get('other_listings', 0) + launch.get('other_listings', 0) + 1
+    return merged
+
+
+class TopKSelector:
+    """
+    Streaming top-K launches across all chains of a cycle
+    A min-heap on (degen score, momentum) holds only the best K; anything
+    pushed out is counted per chat for a one-line summary, never stored.
+    When streaming, claim() hands out at most K dispatches; a member pushed
+    out after it was dispatched is not counted again
+    """
+    
+    def __init__(self, k: int, route=None):
+        self.k = k
+        self.route = route  # token -> [chat_id, ...] for overflow summaries
+        self.heap = []  # [(score, momentum, seq, token key)]
+        self.members = {}  # {token key: launch}
+        self.dispatched = set()  # token keys handed to dispatch (streaming)
+        self.seq = 0
+        self.total = 0
+        self.dropped = 0
+        self.dropped_best = 0.0
+        self.dropped_per_chat = {}  # {chat_id: count}
+    
+    @staticmethod
+    def rank_key(launch: Dict) -> tuple:
+        return (launch.get('degen_score', 0), launch.get('price_change_1h', 0))
+    
+    @staticmethod
+    def key_of(launch: Dict) -> str:
+        return TokenIndex.key(launch.get('token_address') or launch['address'])
+    
+    def entry(self, key: str, launch: Dict) -> tuple:
+        self.seq += 1
+        # Negative seq: among exact ties the earlier arrival ranks higher
+        return self.rank_key(launch) + (-self.seq, key)
+    
+    def drop(self, launch: Dict):
+        self.dropped += 1
+        self.dropped_best = max(self.dropped_best, launch.get('degen_score', 0))
+        if self.route:
+            for chat_id in self.route(launch):
+                self.dropped_per_chat[chat_id] = self.dropped_per_chat.get(chat_id, 0) + 1
+    
+    def push(self, launch: Dict) -> bool:
+        """Offer a launch; True if it entered the top K as a new member"""
+        key = self.key_of(launch)
+        
+        # Another listing of a token already in the top K: merge in place
+        if key in self.members:
+            self.members[key] = merge_listing(self.members[key], launch)
+            self.heap = [
+                self.rank_key(self.members[k]) + (seq, k) if k == key else (score, momentum, seq, k)
+                for score, momentum, seq, k in self.heap
+            ]
+            heapq.heapify(self.heap)
+            return False
+        
+        self.total += 1
+        if not self.k or len(self.heap) < self.k:
+            heapq.heappush(self.heap, self.entry(key, launch))
+            self.members[key] = launch
+            return True
+        
+        if self.rank_key(launch) > self.heap[0][:2]:
+            evicted = heapq.heapreplace(self.heap, self.entry(key, launch))
+            evicted_launch = self.members.pop(evicted[3])
+            if evicted[3] not in self.dispatched:
+                self.drop(evicted_launch)
+            self.members[key] = launch
+            return True
+        self.drop(launch)
+        return False
+    
+    def claim(self, launch: Dict) -> bool:
+        """Reserve one of the K dispatches for a member; False once all are taken"""
+        if self.k and len(self.dispatched) >= self.k:
+            return False
+        self.dispatched.add(self.key_of(launch))
+        return True
+    
+    def shed(self, launch: Dict):
+        """A claimed launch was shed before dispatch: free its slot and summarize it"""
+        key = self.key_of(launch)
+        self.dispatched.discard(key)
+        if self.members.pop(key, None) is not None:
+            self.heap = [entry for entry in self.heap if entry[3] != key]
+            heapq.heapify(self.heap)
+        self.drop(launch)
+    
+    def settle(self):
+        """End of a streaming cycle: members that never got a dispatch go to the summary"""
+        for key, launch in self.members.items():
+            if key not in self.dispatched:
+                self.drop(launch)
+    
+    def extend(self, launches: List[Dict]):
+        for launch in launches:
+            self.push(launch)
+    
+    def ranked(self) -> List[Dict]:
+        """Best first"""
+        return [self.members[entry[3]] for entry in sorted(self.heap, reverse=True)]
+    
+    def summary(self, chat_id: Optional[str] = None) -> Optional[str]:
+        """One line covering everything below the top K"""
+        count = self.dropped_per_chat.get(chat_id, 0) if chat_id is not None else self.dropped
+        if not count:
+            return None
+        return (f"➕ <b>{count} more</b> candidates not alerted this cycle (top {self.k} only, "
+                f"best skipped score {self.dropped_best:.0f})")
+
+
+class StageQueue:
+    """
+    Bounded queue between two pipeline stages
+    Normally put() blocks when full, pushing back on the producer. With
+    shed=True a full queue instead drops its lowest-priority item (or the
+    new one, if that ranks lowest) and returns it to the caller
+    """
+    
+    def __init__(self, maxsize: int, shed: bool = False):
+        self.maxsize = maxsize
+        self.shed = shed
+        self.items = []  # heap of (negated priority, seq, item)
+        self.seq = 0
+        self.closed = False
+        self.max_depth = 0
+        self.shed_count = 0
+        self.condition = threading.Condition()
+    
+    def put(self, item, priority: tuple = ()):
+        """Queue an item; returns whatever got shed to make room, if anything"""
+        with self.condition:
+            self.seq += 1
+            entry = (tuple(-value for value in priority), self.seq, item)
+            shed = None
+            if self.shed and len(self.items) >= self.maxsize:
+                lowest = max(self.items)
+                if entry > lowest:
+                    shed = item
+                else:
+                    self.items.remove(lowest)
+                    heapq.heapify(self.items)
+                    shed = lowest[2]
+                self.shed_count += 1
+                if shed is item:
+                    return shed
+            while not self.shed and len(self.items) >= self.maxsize:
+                self.condition.wait()
+            heapq.heappush(self.items, entry)
+            self.max_depth = max(self.max_depth, len(self.items))
+            self.condition.notify_all()
+            return shed
+    
+    def get(self):
+        """Next item (highest priority, then FIFO), or None once closed and drained"""
+        with self.condition:
+            while not self.items and not self.closed:
+                self.condition.wait()
+            if not self.items:
+                return None
+            item = heapq.heappop(self.items)[2]
+            self.condition.notify_all()
+            return item
+    
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+    
+    def __len__(self):
+        return len(self.items)
+
+
+class PipelineStage:
+    """
+    Worker threads that take items from an inbox and hand results to the next stage
+    handler(item) returns the items to pass on; the next stage's inbox is
+    closed when the last worker of this stage finishes
+    """
+    
+    def __init__(self, name: str, handler, workers: int = 1, maxsize: int = 100,
+                 shed: bool = False, priority=None, on_shed=None):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.inbox = StageQueue(maxsize, shed=shed)
+        self.priority = priority  # item -> tuple, used when the *next* stage sheds
+        self.on_shed = on_shed
+        self.next = None
+        self.alive = 0
+        self.processed = 0
+        self.lock = threading.Lock()
+        self.threads = []
+    
+    def start(self):
+        self.alive = self.workers
+        for i in range(self.workers):
+            thread = threading.Thread(target=self.run, daemon=True, name=f"pipeline-{self.name}-{i}")
+            thread.start()
+            self.threads.append(thread)
+    
+    def run(self):
+        try:
+            while True:
+                item = self.inbox.get()
+                if item is None:
+                    break
+                try:
+                    outputs = self.handler(item) or []
+                except Exception as e:
+                    print(f"Pipeline {self.name} error: {e}")
+                    outputs = []
+                with self.lock:
+                    self.processed += 1
+                if self.next is not None:
+                    for output in outputs:
+                        priority = self.next.priority(output) if self.next.priority else ()
+                        shed = self.next.inbox.put(output, priority)
+                        if shed is not None and self.next.on_shed:
+                            self.next.on_shed(shed)
+        finally:
+            with self.lock:
+                self.alive -= 1
+                last = self.alive == 0
+            if last and self.next is not None:
+                self.next.inbox.close()
+    
+    def join(self, timeout: Optional[float] = None):
+        deadline = time.time() + timeout if timeout else None
+        for thread in self.threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.time()))
+    
+    def snapshot(self) -> Dict:
+        return {
+            'workers': self.workers,
+            'depth': len(self.inbox),
+            'max_depth': self.inbox.max_depth,
+            'processed': self.processed,
+            'shed': self.inbox.shed_count,
+        }
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a host whose circuit breaker is open"""
+
+
+class HunterStopped(Exception):
+    """Raised in a retired hunter's worker when it reaches its next stage"""
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker with a rolling error/latency window
+    CLOSED -> OPEN when the error rate in the window is too high,
+    OPEN -> HALF_OPEN after a cooldown (one probe request allowed),
+    HALF_OPEN -> CLOSED on success or back to OPEN with a longer cooldown
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, host: str, window_seconds: float = 120, min_requests: int = 5,
+                 error_threshold: float = 0.5, base_cooldown: float = 30, max_cooldown: float = 300):
+        self.host = host
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.error_threshold = error_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        
+        self.samples = deque(maxlen=200)  # (timestamp, ok, latency)
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.cooldown = base_cooldown
+        self.probe_in_flight = False
+        self.total_requests = 0
+        self.total_failures = 0
+        self.fast_fails = 0
+        self.lock = threading.Lock()
+    
+    def prune(self, now: float):
+        while self.samples and now - self.samples[0][0] > self.window_seconds:
+            self.samples.popleft()
+    
+    def allow(self) -> bool:
+        """Whether a request may go out now"""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.time() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                self.probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            self.fast_fails += 1
+            return False
+    
+    def record(self, ok: bool, latency: float):
+        """Record the outcome of a request"""
+        with self.lock:
+            now = time.time()
+            self.samples.append((now, ok, latency))
+            self.total_requests += 1
+            if not ok:
+                self.total_failures += 1
+            self.prune(now)
+            
+            if self.state == self.HALF_OPEN:
+                self.probe_in_flight = False
+                if ok:
+                    self.state = self.CLOSED
+                    self.cooldown = self.base_cooldown
+                    self.samples.clear()
+                else:
+                    self.trip(now, escalate=True)
+                return
+            
+            if self.state == self.CLOSED and not ok and len(self.samples) >= self.min_requests:
+                if self.error_rate() >= self.error_threshold:
+                    self.trip(now, escalate=False)
+    
+    def trip(self, now: float, escalate: bool):
+        if escalate:
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+        self.state = self.OPEN
+        self.opened_at = now
+        print(f"⚡ Circuit OPEN for {self.host} ({self.cooldown:.0f}s cooldown)")
+    
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok, _ in self.samples if not ok) / len(self.samples)
+    
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """Latency percentile of successful requests in the window"""
+        latencies = sorted(latency for _, ok, latency in self.samples if ok)
+        if len(latencies) < self.min_requests:
+            return None
+        index = min(len(latencies) - 1, int(round(percentile / 100 * (len(latencies) - 1))))
+        return latencies[index]
+    
+    def timeout(self, default: float, minimum: float = 2.0) -> float:
+        """Adaptive timeout: twice the observed p99, never above the caller's default"""
+        with self.lock:
+            p99 = self.latency_percentile(99)
+        if p99 is None:
+            return default
+        return max(minimum, min(default, p99 * 2))
+    
+    def hedge_delay(self, default: float, minimum: float = 0.05) -> float:
+        """How long to wait before hedging a request to this host: the observed p95"""
+        with self.lock:
+            p95 = self.latency_percentile(95)
+        if p95 is None:
+            return default
+        return max(minimum, p95)
+    
+    def snapshot(self) -> Dict:
+        """State for status reporting"""
+        with self.lock:
+            self.prune(time.time())
+            p50 = self.latency_percentile(50)
+            p99 = self.latency_percentile(99)
+            return {
+                'state': self.state,
+                'error_rate': round(self.error_rate(), 3),
+                'window_requests': len(self.samples),
+                'p50_ms': round(p50 * 1000) if p50 is not None else None,
+                'p99_ms': round(p99 * 1000) if p99 is not None else None,
+                'total_requests': self.total_requests,
+                'total_failures': self.total_failures,
+                'fast_fails': self.fast_fails,
+            }
+
+
+def aligned_delay(interval: float, now: Optional[float] = None) -> float:
+    """
+    Seconds until the next wall-clock multiple of interval
+    Timers that sleep this way wake on a shared grid (a 60s timer fires on
+    every 300s boundary too), so their network work lands in one burst
+    """
+    now = time.time() if now is None else now
+    return interval - (now % interval) if interval > 0 else 0.0
+
+
+def wire_bytes(response: requests.Response) -> Tuple[int, int]:
+    """(sent, received) bytes of a request/response pair, headers included (approximate)"""
+    request = response.request
+    sent = len(request.url or '') + sum(len(k) + len(v) + 4 for k, v in request.headers.items())
+    if request.body:
+        sent += len(request.body)
+    try:
+        # Compressed size as read off the socket
+        received = response.raw.tell() if response.raw is not None else len(response.content)
+    except Exception:
+        received = len(response.content)
+    received += sum(len(k) + len(v) + 4 for k, v in response.headers.items())
+    return sent, received
+
+
+class PowerMeter:
+    """
+    Wakeups and network traffic per hour (power-saving mode metrics)
+    A radio wakeup is a request after RADIO_TAIL_SECONDS of network silence:
+    on cellular that is roughly when the modem has dropped back to idle
+    """
+    
+    def __init__(self, radio_tail: Optional[float] = None):
+        self.radio_tail = radio_tail if radio_tail is not None else float(os.getenv('RADIO_TAIL_SECONDS', '10'))
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.wakeups = {}  # {timer: count}
+        self.requests = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.radio_wakeups = 0
+        self.last_transfer = 0.0
+    
+    def wakeup(self, timer: str):
+        with self.lock:
+            self.wakeups[timer] = self.wakeups.get(timer, 0) + 1
+    
+    def transfer(self, sent: int, received: int):
+        now = time.time()
+        with self.lock:
+            if now - self.last_transfer > self.radio_tail:
+                self.radio_wakeups += 1
+            self.last_transfer = now
+            self.requests += 1
+            self.bytes_sent += sent
+            self.bytes_received += received
+    
+    def record(self, response: requests.Response):
+        try:
+            self.transfer(*wire_bytes(response))
+        except Exception:
+            self.transfer(0, 0)
+    
+    def snapshot(self) -> Dict:
+        with self.lock:
+            hours = max((time.time() - self.started_at) / 3600, 1 / 60)
+            return {
+                'hours': round(hours, 2),
+                'wakeups_per_hour': round(sum(self.wakeups.values()) / hours, 1),
+                'timers_per_hour': {timer: round(count / hours, 1) for timer, count in self.wakeups.items()},
+                'radio_wakeups_per_hour': round(self.radio_wakeups / hours, 1),
+                'requests_per_hour': round(self.requests / hours, 1),
+                'kb_sent_per_hour': round(self.bytes_sent / 1024 / hours, 1),
+                'kb_received_per_hour': round(self.bytes_received / 1024 / hours, 1),
+            }
+
+
+class HttpClient:
+    """Shared HTTP session with a circuit breaker and adaptive timeout per host"""
+    
+    def __init__(self, session: Optional[requests.Session] = None, meter: Optional[PowerMeter] = None):
+        self.session = session or requests.Session()
+        self.meter = meter
+        self.breakers = {}  # {host: CircuitBreaker}
+        self.lock = threading.Lock()
+    
+    def breaker(self, url: str) -> CircuitBreaker:
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(host)
+            return self.breakers[host]
+    
+    def get(self, url: str, timeout: float = 10, **kwargs) -> requests.Response:
+        """GET through the host's breaker (raises CircuitOpenError when open)"""
+        breaker = self.breaker(url)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{breaker.host} circuit open")
+        
+        started = time.time()
+        try:
+            response = self.session.get(url, timeout=breaker.timeout(timeout), **kwargs)
+        except Exception:
+            breaker.record(False, time.time() - started)
+            raise
+        
+        ok = response.status_code < 500 and response.status_code != 429
+        breaker.record(ok, time.time() - started)
+        if self.meter:
+            self.meter.record(response)
+        return response
+    
+    def health(self) -> Dict[str, Dict]:
+        """Breaker snapshot per host"""
+        with self.lock:
+            breakers = list(self.breakers.values())
+        return {breaker.host: breaker.snapshot() for breaker in breakers}
+
+
+class PriceSource(ABC):
+    """
+    Source of USD prices for token contracts
+    Subclasses implement fetch for one token; quotes look like
+    {'price': float, 'chain': str, 'url': str}
+    """
+    
+    name = ''
+    
+    def __init__(self, http: HttpClient, api: str):
+        self.http = http
+        self.api = api
+    
+    def available(self, chain: Optional[str]) -> bool:
+        """Whether this source can price tokens on the chain (None = unknown)"""
+        return True
+    
+    @abstractmethod
+    def fetch(self, address: str, chain: Optional[str]) -> Optional[Dict]:
+        """Quote for one token, or None when the source has no price"""
+
+
+class DexScreenerPriceSource(PriceSource):
+    """Deepest-liquidity DexScreener pair; also refreshes the token index"""
+    
+    name = 'dexscreener'
+    BATCH_SIZE = 30  # addresses per /tokens request (API limit)
+    
+    def __init__(self, http: HttpClient, api: str, token_index: 'TokenIndex'):
+        super().__init__(http, api)
+        self.token_index = token_index
+    
+    def fetch(self, address: str, chain: Optional[str]) -> Optional[Dict]:
+        response = self.http.get(f"{self.api}/tokens/{address}", timeout=10)
+        if response.status_code != 200:
+            return None
+        pairs = response.json().get('pairs') or []
+        self.token_index.update_from_pairs(pairs)
+        return self.token_index.best_pair(address)
+    
+    def fetch_many(self, addresses: List[str]) -> int:
+        """
+        Refresh the token index for up to BATCH_SIZE tokens in one request
+        Returns how many of them now have a price
+        """
+        response = self.http.get(f"{self.api}/tokens/{','.join(addresses[:self.BATCH_SIZE])}", timeout=15)
+        if response.status_code != 200:
+            return 0
+        self.token_index.update_from_pairs(response.json().get('pairs') or [])
+        return sum(1 for address in addresses if self.token_index.best_pair(address) is not None)
+
+
+class CoinGeckoPriceSource(PriceSource):
+    """CoinGecko simple/token_price (needs the chain to pick the platform)"""
+    
+    name = 'coingecko'
+    PLATFORMS = {
+        'ethereum': 'ethereum',
+        'bsc': 'binance-smart-chain',
+        'polygon': 'polygon-pos',
+        'base': 'base',
+        'arbitrum': 'arbitrum-one',
+        'solana': 'solana',
+    }
+    
+    def available(self, chain: Optional[str]) -> bool:
+        return chain in self.PLATFORMS
+    
+    def fetch(self, address: str, chain: Optional[str]) -> Optional[Dict]:
+        url = (f"{self.api}/simple/token_price/{self.PLATFORMS[chain]}"
+               f"?contract_addresses={address}&vs_currencies=usd")
+        response = self.http.get(url, timeout=10)
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        entry = data.get(address) or data.get(address.lower()) or {}
+        price = float(entry.get('usd') or 0)
+        if price <= 0:
+            return None
+        return {'price': price, 'chain': chain,
+                'url': f"https://www.coingecko.com/en/coins/{self.PLATFORMS[chain]}/contract/{address}"}
+
+
+class DexToolsPriceSource(PriceSource):
+    """DexTools token price (needs DEXTOOLS_API_KEY)"""
+    
+    name = 'dextools'
+    CHAINS = {
+        'ethereum': 'ether',
+        'bsc': 'bsc',
+        'polygon': 'polygon',
+        'base': 'base',
+        'arbitrum': 'arbitrum',
+        'solana': 'solana',
+    }
+    
+    def __init__(self, http: HttpClient, api: str, api_key: str):
+        super().__init__(http, api)
+        self.api_key = api_key
+    
+    def available(self, chain: Optional[str]) -> bool:
+        return bool(self.api_key) and chain in self.CHAINS
+    
+    def fetch(self, address: str, chain: Optional[str]) -> Optional[Dict]:
+        url = f"{self.api}/token/{self.CHAINS[chain]}/{address}/price"
+        response = self.http.get(url, timeout=10, headers={'X-API-KEY': self.api_key})
+        if response.status_code != 200:
+            return None
+        price = float((response.json().get('data') or {}).get('price') or 0)
+        if price <= 0:
+            return None
+        return {'price': price, 'chain': chain,
+                'url': f"https://www.dextools.io/app/en/{self.CHAINS[chain]}/pair-explorer/{address}"}
+
+
+class HedgedPriceFetcher:
+    """
+    Price lookups across several sources with hedging
+    The first source gets the request; if it hasn't answered within its
+    host's p95 latency (or it failed), the next source is asked too and the
+    first valid answer wins. Late answers still count towards per-source
+    freshness and cross-source disagreement stats
+    """
+    
+    def __init__(self, http: HttpClient, sources: List[PriceSource], hedge_delay: float = 1.0,
+                 deadline: float = 10, disagree_percent: float = 5, workers: int = 8):
+        self.http = http
+        self.sources = sources
+        self.hedge_delay = hedge_delay
+        self.deadline = deadline
+        self.disagree_percent = disagree_percent
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prices")
+        self.lock = threading.Lock()
+        self.stats = {
+            source.name: {'requests': 0, 'answers': 0, 'wins': 0, 'errors': 0, 'last_answer_at': 0.0}
+            for source in sources
+        }
+        self.latest = {}  # {address: {source: (price, answered_at)}}
+        self.hedges = 0
+        self.comparisons = 0
+        self.disagreements = 0
+        self.max_disagreement = 0.0
+    
+    def record(self, source: PriceSource, address: str, future):
+        """Done-callback: per-source stats and disagreement against other fresh answers"""
+        try:
+            quote = future.result()
+        except Exception:
+            quote = None
+        
+        with self.lock:
+            stats = self.stats[source.name]
+            if not quote or quote.get('price', 0) <= 0:
+                stats['errors'] += 1
+                return
+            now = time.time()
+            stats['answers'] += 1
+            stats['last_answer_at'] = now
+            
+            answers = self.latest.setdefault(address.lower(), {})
+            for other, (price, answered_at) in answers.items():
+                if other == source.name or now - answered_at > 60:
+                    continue
+                self.comparisons += 1
+                spread = abs(quote['price'] - price) / min(quote['price'], price) * 100
+                self.max_disagreement = max(self.max_disagreement, spread)
+                if spread > self.disagree_percent:
+                    self.disagreements += 1
+            answers[source.name] = (quote['price'], now)
+    
+    def launch(self, source: PriceSource, address: str, chain: Optional[str]):
+        with self.lock:
+            self.stats[source.name]['requests'] += 1
+        future = self.executor.submit(source.fetch, address, chain)
+        future.add_done_callback(lambda f: self.record(source, address, f))
+        return future
+    
+    def quote(self, address: str, chain: Optional[str] = None) -> Optional[Dict]:
+        """First valid quote across sources (raises CircuitOpenError if every source is open)"""
+        candidates = [source for source in self.sources if source.available(chain)]
+        started = time.time()
+        pending = {}  # {future: source}
+        circuit_errors = 0
+        
+        while candidates or pending:
+            if candidates and not pending:
+                source = candidates.pop(0)
+                pending[self.launch(source, address, chain)] = source
+            
+            remaining = self.deadline - (time.time() - started)
+            if remaining <= 0:
+                break
+            if candidates:
+                newest = list(pending.values())[-1]
+                timeout = min(remaining, self.http.breaker(newest.api).hedge_delay(self.hedge_delay))
+            else:
+                timeout = remaining
+            
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                source = pending.pop(future)
+                try:
+                    quote = future.result()
+                except CircuitOpenError:
+                    circuit_errors += 1
+                    continue
+                except Exception as e:
+                    print(f"Price source {source.name} error ({address}): {e}")
+                    continue
+                if quote and quote.get('price', 0) > 0:
+                    with self.lock:
+                        self.stats[source.name]['wins'] += 1
+                    return dict(quote, source=source.name)
+            
+            if not done and candidates:
+                # Primary is slower than usual - hedge to the next source
+                with self.lock:
+                    self.hedges += 1
+                source = candidates.pop(0)
+                pending[self.launch(source, address, chain)] = source
+        
+        if circuit_errors and not pending and circuit_errors == len(
+                [source for source in self.sources if source.available(chain)]):
+            raise CircuitOpenError(f"all price sources open for {address}")
+        return None
+    
+    def prefetch(self, addresses: List[str]) -> int:
+        """
+        Price many tokens with batched requests (sources that support it)
+        One request per BATCH_SIZE tokens instead of one per token; returns
+        how many were priced. Tokens left unpriced fall back to quote()
+        """
+        priced = 0
+        for source in self.sources:
+            if not hasattr(source, 'fetch_many') or not addresses:
+                continue
+            for start in range(0, len(addresses), source.BATCH_SIZE):
+                chunk = addresses[start:start + source.BATCH_SIZE]
+                with self.lock:
+                    self.stats[source.name]['requests'] += 1
+                try:
+                    count = source.fetch_many(chunk)
+                except CircuitOpenError:
+                    break
+                except Exception as e:
+                    print(f"Price source {source.name} batch error: {e}")
+                    count = 0
+                with self.lock:
+                    stats = self.stats[source.name]
+                    if count:
+                        stats['answers'] += 1
+                        stats['last_answer_at'] = time.time()
+                    else:
+                        stats['errors'] += 1
+                priced += count
+            break
+        return priced
+    
+    def forget(self, address: str):
+        with self.lock:
+            self.latest.pop(address.lower(), None)
+    
+    def snapshot(self) -> Dict:
+        """Per-source freshness and win counts plus hedging/disagreement totals"""
+        now = time.time()
+        with self.lock:
+            sources = {
+                name: dict(
+                    {key: value for key, value in stats.items() if key != 'last_answer_at'},
+                    age_s=round(now - stats['last_answer_at']) if stats['last_answer_at'] else None
+                )
+                for name, stats in self.stats.items()
+            }
+            return {
+                'sources': sources,
+                'hedges': self.hedges,
+                'comparisons': self.comparisons,
+                'disagreements': self.disagreements,
+                'max_disagreement_pct': round(self.max_disagreement, 1),
+            }
+
+
+class TelegramTransport:
+    """
+    Shared rate-limited Telegram sender
+    Paces sends globally and per chat, retries once on 429 with retry_after
+    """
+    
+    def __init__(self, token: str, global_interval: float = 0.05, chat_interval: float = 1.0,
+                 session: Optional[requests.Session] = None, meter: Optional[PowerMeter] = None):
+        self.token = token
+        self.global_interval = global_interval
+        self.chat_interval = chat_interval
+        self.session = session or requests.Session()
+        self.meter = meter or PowerMeter()  # shared by everything in the process that talks to the network
+        self.lock = threading.Lock()
+        self.last_send = 0.0
+        self.last_chat_send = {}  # {chat_id: timestamp}
+    
+    def wait_turn(self, chat_id: str):
+        """Block until both the global and the per-chat rate allow a send"""
+        with self.lock:
+            now = time.time()
+            ready_at = max(
+                self.last_send + self.global_interval,
+                self.last_chat_send.get(chat_id, 0) + self.chat_interval,
+            )
+            delay = max(0.0, ready_at - now)
+            # Reserve the slot before sleeping so concurrent senders queue up behind it
+            self.last_send = now + delay
+            self.last_chat_send[chat_id] = now + delay
+        if delay:
+            time.sleep(delay)
+    
+    def request(self, method: str, chat_id: str, payload: Dict) -> Dict:
+        """
+        Paced Bot API call for a chat
+        Returns {'ok': True, 'result': ...} or {'ok': False, 'description': ...}
+        """
+        url = f"https://api.telegram.org/bot{self.token}/{method}"
+        payload = dict(payload, chat_id=chat_id)
+        
+        for attempt in range(2):
+            self.wait_turn(chat_id)
+            try:
+                response = self.session.post(url, json=payload, timeout=10)
+                self.meter.record(response)
+                if response.status_code == 429 and attempt == 0:
+                    retry_after = response.json().get('parameters', {}).get('retry_after', 1)
+                    time.sleep(min(float(retry_after), 30))
+                    continue
+                if response.status_code >= 400:
+                    try:
+                        description = response.json().get('description', '')
+                    except ValueError:
+                        description = ''
+                    return {'ok': False, 'description': description or f"HTTP {response.status_code}"}
+                return {'ok': True, 'result': response.json().get('result')}
+            except Exception as e:
+                print(f"Telegram error ({chat_id}): {e}")
+                return {'ok': False, 'description': str(e)}
+        return {'ok': False, 'description': 'rate limited'}
+    
+    def send_message(self, chat_id: str, text: str, parse_mode: str = 'HTML',
+                     disable_web_page_preview: bool = False) -> Optional[Dict]:
+        """Send message to a chat; returns the sent Message (or {} if not known), None on failure"""
+        response = self.request('sendMessage', chat_id, {
+            'text': text,
+            'parse_mode': parse_mode,
+            'disable_web_page_preview': disable_web_page_preview
+        })
+        if not response['ok']:
+            print(f"Telegram error ({chat_id}): {response['description']}")
+            return None
+        return response['result'] if isinstance(response['result'], dict) else {}
+    
+    def send(self, chat_id: str, text: str, parse_mode: str = 'HTML',
+             disable_web_page_preview: bool = False) -> bool:
+        """Send message to a chat"""
+        return self.send_message(chat_id, text, parse_mode, disable_web_page_preview) is not None
+    
+    def edit(self, chat_id: str, message_id: int, text: str, parse_mode: str = 'HTML') -> Optional[bool]:
+        """
+        Replace a sent message's text
+        True on success (or unchanged), None if the message is gone, False on other errors
+        """
+        response = self.request('editMessageText', chat_id, {
+            'message_id': message_id,
+            'text': text,
+            'parse_mode': parse_mode,
+            'disable_web_page_preview': True
+        })
+        if response['ok']:
+            return True
+        description = response['description'].lower()
+        if 'not modified' in description:
+            return True
+        if 'not found' in description or 'message_id_invalid' in description or "can't be edited" in description:
+            return None
+        print(f"Telegram edit error ({chat_id}): {response['description']}")
+        return False
+    
+    def pin(self, chat_id: str, message_id: int, pinned: bool = True) -> bool:
+        """Pin (or unpin) a message without notifying the chat"""
+        if pinned:
+            return self.request('pinChatMessage', chat_id,
+                                {'message_id': message_id, 'disable_notification': True})['ok']
+        return self.request('unpinChatMessage', chat_id, {'message_id': message_id})['ok']
+
+
+class AlertOutbox:
+    """
+    Groups alerts into one send burst per wakeup (power-saving mode)
+    While a burst is open, alerts are queued per chat; when the last open
+    burst closes, each chat's queue is merged into as few messages as fit
+    Telegram's size limit and sent back to back. Outside a burst (or with
+    grouping off) alerts go out immediately
+    """
+    
+    SEPARATOR = "\n\n➖➖➖➖➖➖\n\n"
+    
+    def __init__(self, transport: TelegramTransport, enabled: bool = False, max_chars: int = 4000):
+        self.transport = transport
+        self.enabled = enabled
+        self.max_chars = max_chars
+        self.lock = threading.Lock()
+        self.depth = 0
+        self.queued = OrderedDict()  # {chat_id: [text, ...]}
+        self.stats = {'queued': 0, 'sent': 0}
+    
+    def send(self, chat_id: str, text: str) -> bool:
+        with self.lock:
+            if self.enabled and self.depth:
+                self.queued.setdefault(chat_id, []).append(text)
+                self.stats['queued'] += 1
+                return True
+        return self.transport.send(chat_id, text)
+    
+    @contextmanager
+    def burst(self):
+        with self.lock:
+            self.depth += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.depth -= 1
+                queued = self.queued if self.depth == 0 else {}
+                if self.depth == 0:
+                    self.queued = OrderedDict()
+            self.send_merged(queued)
+    
+    def flush(self):
+        """Send whatever is queued, even inside an open burst (shutdown)"""
+        with self.lock:
+            queued, self.queued = self.queued, OrderedDict()
+        self.send_merged(queued)
+    
+    def merge(self, texts: List[str]) -> List[str]:
+        messages = []
+        for text in texts:
+            if messages and len(messages[-1]) + len(self.SEPARATOR) + len(text) <= self.max_chars:
+                messages[-1] += self.SEPARATOR + text
+            else:
+                messages.append(text)
+        return messages
+    
+    def send_merged(self, queued: Dict[str, List[str]]):
+        for chat_id, texts in queued.items():
+            for message in self.merge(texts):
+                if self.transport.send(chat_id, message):
+                    self.stats['sent'] += 1
+
+
+class MessageBoard:
+    """
+    Live Telegram messages keyed by (token, chat, kind)
+    Ongoing state (position dashboards, running pumps, repeat launch alerts)
+    is edited in place instead of sent again; edits are throttled per message
+    and skipped when the text hasn't changed. Message ids are stored in
+    SQLite so a restart keeps editing the same messages
+    """
+    
+    def __init__(self, transport: TelegramTransport, db_writer: 'DatabaseWriter',
+                 edit_interval: float = 60, ttl_seconds: float = 24 * 3600):
+        self.transport = transport
+        self.db_writer = db_writer
+        self.edit_interval = edit_interval
+        self.ttl_seconds = ttl_seconds
+        self.messages = {}  # {(token, chat_id, kind): {message_id, digest, pinned, created_at, updated_at}}
+        # Guards messages and stats (scan and price threads both post); never held over a send
+        self.lock = threading.Lock()
+        self.stats = {'sent': 0, 'edited': 0, 'throttled': 0, 'unchanged': 0}
+    
+    def load(self, rows: List[tuple]):
+        with self.lock:
+            for token, chat_id, kind, message_id, digest, pinned, created_at, updated_at in rows:
+                self.messages[(token, chat_id, kind)] = {
+                    'message_id': message_id, 'digest': digest, 'pinned': bool(pinned),
+                    'created_at': created_at, 'updated_at': updated_at,
+                }
+    
+    @staticmethod
+    def digest(text: str) -> str:
+        return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+    
+    def has(self, key: tuple) -> bool:
+        with self.lock:
+            return key in self.messages
+    
+    def save(self, key: tuple):
+        with self.lock:
+            entry = self.messages.get(key)
+            if entry is None:
+                return
+            params = key + (entry['message_id'], entry['digest'], int(entry['pinned']),
+                            entry['created_at'], entry['updated_at'])
+        self.db_writer.execute('''
+            INSERT OR REPLACE INTO live_messages
+            (token_address, chat_id, kind, message_id, digest, pinned, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', params)
+    
+    def forget(self, key: tuple):
+        with self.lock:
+            removed = self.messages.pop(key, None)
+        if removed is not None:
+            self.db_writer.execute(
+                'DELETE FROM live_messages WHERE token_address = ? AND chat_id = ? AND kind = ?', key
+            )
+    
+    def post(self, key: tuple, text: str, pin: bool = False) -> bool:
+        """Send a new message for the key (threshold events) and remember it for later edits"""
+        # Not through AlertOutbox: a merged power-save send has no message id to edit later
+        message = self.transport.send_message(key[1], text)
+        if message is None:
+            return False
+        with self.lock:
+            self.stats['sent'] += 1
+            previous = self.messages.get(key)
+        
+        if previous and previous['pinned']:
+            self.transport.pin(key[1], previous['message_id'], pinned=False)
+        message_id = message.get('message_id')
+        if message_id is None:
+            self.forget(key)
+            return True
+        
+        now = time.time()
+        pinned = pin and self.transport.pin(key[1], message_id)
+        with self.lock:
+            self.messages[key] = {'message_id': message_id, 'digest': self.digest(text), 'pinned': pinned,
+                                  'created_at': now, 'updated_at': now}
+        self.save(key)
+        return True
+    
+    def update(self, key: tuple, text: str, force: bool = False) -> bool:
+        """
+        Edit the live message for the key (at most every edit_interval unless forced)
+        Returns False when there is no live message, so the caller can post one
+        """
+        digest = self.digest(text)
+        with self.lock:
+            entry = self.messages.get(key)
+            if entry is None:
+                return False
+            if digest == entry['digest']:
+                self.stats['unchanged'] += 1
+                return True
+            if not force and time.time() - entry['updated_at'] < self.edit_interval:
+                self.stats['throttled'] += 1
+                return True
+            message_id = entry['message_id']
+        
+        result = self.transport.edit(key[1], message_id, text)
+        if result is None:
+            # Deleted in the chat (or too old to edit) - the caller posts a fresh one
+            self.forget(key)
+            return False
+        if result:
+            with self.lock:
+                self.stats['edited'] += 1
+                entry.update(digest=digest, updated_at=time.time())
+            self.save(key)
+        return True
+    
+    def close(self, key: tuple, text: Optional[str] = None):
+        """Final edit (unthrottled), unpin and stop tracking the message"""
+        with self.lock:
+            entry = self.messages.get(key)
+        if entry is None:
+            return
+        if text:
+            self.update(key, text, force=True)
+        if entry['pinned']:
+            self.transport.pin(key[1], entry['message_id'], pinned=False)
+        self.forget(key)
+    
+    def keys(self, kind: str) -> List[tuple]:
+        with self.lock:
+            return [key for key in self.messages if key[2] == kind]
+    
+    def prune(self, kinds: Tuple[str, ...] = ('launch',)):
+        """Stop tracking old messages of the given kinds"""
+        cutoff = time.time() - self.ttl_seconds
+        with self.lock:
+            expired = [key for key, entry in self.messages.items() if key[2] in kinds and entry['created_at'] < cutoff]
+        for key in expired:
+            self.forget(key)
+    
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return dict(self.stats, live=len(self.messages))
+
+
+class SubscriberIndex:
+    """
+    Alert subscribers with per-chat chain and score filters
+    Filters are compiled into per-chain lists sorted by min score, so routing
+    a token is one bisect per bucket instead of evaluating every filter
+    """
+    
+    WILDCARD = '*'
+    
+    def __init__(self, subscribers: List[Dict]):
+        self.subscribers = subscribers
+        self.score_index = {}  # {chain: ([min_score, ...], [chat_id, ...])}
+        self.pump_index = {}  # {chain: [chat_id, ...]} - chats that want every pump
+        
+        buckets = {}
+        for sub in subscribers:
+            for chain in sub['chains']:
+                buckets.setdefault(chain, []).append(sub)
+        
+        for chain, subs in buckets.items():
+            subs = sorted(subs, key=lambda sub: sub['min_score'])
+            self.score_index[chain] = (
+                [sub['min_score'] for sub in subs],
+                [sub['chat_id'] for sub in subs],
+            )
+            self.pump_index[chain] = [sub['chat_id'] for sub in subs if sub['pumps']]
+    
+    @classmethod
+    def from_env(cls, default_chat_id: str) -> 'SubscriberIndex':
+        """
+        Build from ALERT_SUBSCRIBERS, e.g. "-100123:bsc,ethereum:70;-100456:*:50:nopumps"
+        Falls back to the main chat with MIN_DEGEN_SCORE and all chains
+        """
+        default_score = float(os.getenv('MIN_DEGEN_SCORE', '50'))
+        spec = os.getenv('ALERT_SUBSCRIBERS', '').strip()
+        
+        subscribers = []
+        for entry in filter(None, (part.strip() for part in spec.split(';'))):
+            fields = [field.strip() for field in entry.split(':')]
+            fields += [''] * (4 - len(fields))
+            chat_id, chains, score, pumps = fields[:4]
+            # Name the bad entry: a bare float() error says nothing about which one it is
+            if len(fields) > 4 or not chat_id:
+                raise ValueError(f"ALERT_SUBSCRIBERS entry '{entry}': expected chat_id:chains:min_score[:nopumps]")
+            if pumps.lower() not in ('', 'nopumps'):
+                raise ValueError(f"ALERT_SUBSCRIBERS entry '{entry}': 4th field must be 'nopumps', got '{pumps}'")
+            try:
+                min_score = float(score) if score else default_score
+            except ValueError:
+                raise ValueError(f"ALERT_SUBSCRIBERS entry '{entry}': min_score '{score}' is not a number") from None
+            chains = [chain.strip().lower() for chain in chains.split(',') if chain.strip()]
+            subscribers.append({
+                'chat_id': chat_id,
+                'chains': chains or [cls.WILDCARD],
+                'min_score': min_score,
+                'pumps': pumps.lower() != 'nopumps',
+            })
+        
+        if not subscribers:
+            subscribers.append({
+                'chat_id': default_chat_id,
+                'chains': [cls.WILDCARD],
+                'min_score': default_score,
+                'pumps': True,
+            })
+        
+        return cls(subscribers)
+    
+    def min_score(self) -> float:
+        """Lowest threshold of any subscriber (what the scan must keep)"""
+        return min(sub['min_score'] for sub in self.subscribers)
+    
+    def route(self, token: Dict) -> List[str]:
+        """All chats whose filter matches this token"""
+        chats = []
+        score = token.get('degen_score', 0)
+        chain = str(token.get('chain', '')).lower()
+        
+        for bucket in (chain, self.WILDCARD):
+            entry = self.score_index.get(bucket)
+            if entry is None:
+                continue
+            scores, chat_ids = entry
+            chats.extend(chat_ids[:bisect.bisect_right(scores, score)])
+            if token.get('is_pumping'):
+                chats.extend(self.pump_index[bucket])
+        
+        return list(dict.fromkeys(chats))
+
+
+def sample_cpu_profile(seconds: float, folded_path: str, interval: float = 0.005,
+                       limit: int = 15) -> Dict:
+    """
+    Sampling CPU profile of every other thread in this process
+    Walks sys._current_frames() every interval; writes collapsed stacks
+    (flamegraph.pl / speedscope format) and returns the hottest functions
+    """
+    me = threading.get_ident()
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    folded = {}  # {collapsed stack: samples}
+    self_counts = {}  # {function: samples as leaf}
+    total_counts = {}  # {function: samples anywhere on the stack}
+    samples = 0
+    
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if not stack:
+                continue
+            
+            samples += 1
+            functions = [entry.rsplit(':', 1)[0] for entry in stack]
+            self_counts[functions[0]] = self_counts.get(functions[0], 0) + 1
+            for function in set(functions):
+                total_counts[function] = total_counts.get(function, 0) + 1
+            key = ';'.join([names.get(ident, str(ident))] + functions[::-1])
+            folded[key] = folded.get(key, 0) + 1
+        time.sleep(interval)
+    
+    with open(folded_path, 'w') as f:
+        for stack, count in sorted(folded.items(), key=lambda item: -item[1]):
+            f.write(f"{stack} {count}\n")
+    
+    def top(counts):
+        ranked = sorted(counts.items(), key=lambda item: -item[1])[:limit]
+        return [(function, round(count * 100 / samples, 1)) for function, count in ranked]
+    
+    return {
+        'seconds': seconds,
+        'samples': samples,
+        'top_self': top(self_counts) if samples else [],
+        'top_total': top(total_counts) if samples else [],
+        'folded_path': os.path.abspath(folded_path),
+    }
+
+
+def memory_top(seconds: float, limit: int = 15) -> Dict:
+    """
+    Top allocation sites via tracemalloc
+    Tracing is only switched on for the measurement window (no cost otherwise);
+    if it was already on, the snapshot covers everything since then
+    """
+    import tracemalloc
+    
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start(10)
+    try:
+        time.sleep(seconds)
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+    
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ])
+    sites = []
+    for stat in snapshot.statistics('lineno')[:limit]:
+        frame = stat.traceback[0]
+        sites.append((f"{os.path.basename(frame.filename)}:{frame.lineno}", stat.size, stat.count))
+    
+    return {
+        'seconds': seconds,
+        'traced_bytes': current,
+        'peak_bytes': peak,
+        'top_sites': sites,
+        'window_only': started_here,
+    }
+
+
+def control_dir() -> str:
+    """HUNTER_CONTROL_DIR, read at call time (.env is loaded after import)"""
+    return os.getenv('HUNTER_CONTROL_DIR', 'hunter_ctl')
+
+
+def install_control_handler(hunter):
+    """
+    Let a separate control bot send requests to hunter.handle_control: it writes
+    <control dir>/request.json and signals SIGUSR1; the reply is written to
+    <control dir>/response-<id>.json. Nothing runs until a signal arrives
+    """
+    if not hasattr(signal, 'SIGUSR1'):
+        return
+    
+    def serve():
+        directory = control_dir()
+        try:
+            with open(os.path.join(directory, 'request.json')) as f:
+                request = json.load(f)
+            response = hunter.handle_control(request)
+        except Exception as e:
+            request, response = {}, {'error': str(e)}
+        
+        path = os.path.join(directory, f"response-{request.get('id', 'unknown')}.json")
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(response, f)
+        os.replace(f"{path}.tmp", path)
+    
+    def on_signal(signum, frame):
+        threading.Thread(target=serve, daemon=True, name="control-request").start()
+    
+    signal.signal(signal.SIGUSR1, on_signal)
+    
+    # SIGUSR2 dumps every thread's stack from C, so it works even when the
+    # interpreter is stuck inside a blocking call (the watchdog relies on it)
+    # Read here, not at import: .env is only loaded by main()
+    dump_file = open(os.getenv('HUNTER_STACK_DUMP_FILE', 'hunter_stacks.txt'), 'a')
+    faulthandler.register(signal.SIGUSR2, file=dump_file, all_threads=True)
+
+
+class SeenFilter:
+    """
+    Bloom filter of pair addresses already processed
+    Sized for millions of addresses in a few MB; false positives (a new pair
+    treated as seen) happen at roughly error_rate, there are no false negatives
+    """
+    
+    def __init__(self, capacity: int = 2000000, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+    
+    def positions(self, item: str):
+        digest = hashlib.blake2b(item.lower().encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        # Double hashing: k positions from two 64-bit hashes
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+    
+    def add(self, item: str):
+        new = False
+        for position in self.positions(item):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                new = True
+        if new:
+            self.count += 1
+    
+    def __contains__(self, item: str) -> bool:
+        for position in self.positions(item):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                return False
+        return True
+    
+    def __len__(self):
+        return self.count
+
+
+class MemoryBudget:
+    """
+    One RSS cap shared by every in-process cache
+    Caches register an approximate size function and an eviction function;
+    when RSS nears the cap, the lowest-priority caches are evicted first
+    until the estimated excess is freed, and the scan sheds load (fewer
+    chains, smaller pages) until usage drops again
+    """
+    
+    OK = 'ok'
+    PRESSURE = 'pressure'
+    CRITICAL = 'critical'
+    
+    def __init__(self, budget_mb: float, soft: float = 0.8, hard: float = 0.95):
+        self.budget = budget_mb * 1024 * 1024
+        self.soft = soft
+        self.hard = hard
+        self.caches = []  # [(priority, name, size_fn, evict_fn)]
+        self.evicted = {}  # {name: bytes evicted so far}
+        self.level = self.OK
+        self.last_rss = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.budget > 0
+    
+    def register(self, name: str, size_fn, evict_fn, priority: int):
+        """size_fn() -> bytes; evict_fn(target_bytes) -> bytes freed. Lower priority is evicted first"""
+        self.caches.append((priority, name, size_fn, evict_fn))
+        self.caches.sort(key=lambda cache: cache[0])
+    
+    @staticmethod
+    def rss() -> int:
+        """Current resident set size in bytes"""
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError):
+            import resource
+            usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return usage if sys.platform == 'darwin' else usage * 1024
+    
+    def sizes(self) -> Dict[str, int]:
+        return {name: size_fn() for _, name, size_fn, _ in self.caches}
+    
+    def enforce(self) -> str:
+        """Measure RSS, evict down to the soft limit if needed; returns the pressure level"""
+        if not self.enabled:
+            return self.OK
+        
+        self.last_rss = self.rss()
+        usage = self.last_rss / self.budget
+        if usage >= self.hard:
+            self.level = self.CRITICAL
+        elif usage >= self.soft:
+            self.level = self.PRESSURE
+        else:
+            self.level = self.OK
+            return self.level
+        
+        # Freed objects don't always shrink RSS right away, so work from the estimates
+        excess = self.last_rss - self.soft * self.budget
+        for _, name, size_fn, evict_fn in self.caches:
+            if excess <= 0 and self.level != self.CRITICAL:
+                break
+            target = size_fn() if self.level == self.CRITICAL else min(size_fn(), excess)
+            if target <= 0:
+                continue
+            freed = evict_fn(target)
+            if freed:
+                self.evicted[name] = self.evicted.get(name, 0) + freed
+                excess -= freed
+        
+        print(f"🧠 Memory {self.level}: RSS {self.last_rss / 1048576:.0f}/{self.budget / 1048576:.0f} MB")
+        return self.level
+    
+    def shed_chains(self, chains: List[str]) -> List[str]:
+        """Chains to scan at the current pressure level (config order = priority)"""
+        if self.level == self.CRITICAL:
+            return chains[:1]
+        if self.level == self.PRESSURE:
+            return chains[:max(1, (len(chains) + 1) // 2)]
+        return chains
+    
+    def page_size(self, default: int) -> int:
+        """Pairs to take per query at the current pressure level (0 = unlimited)"""
+        if self.level == self.CRITICAL:
+            return min(default, 10) if default else 10
+        if self.level == self.PRESSURE:
+            return max(1, default // 2) if default else 30
+        return default
+    
+    def snapshot(self) -> Dict:
+        return {
+            'budget_mb': round(self.budget / 1048576, 1),
+            'rss_mb': round(self.last_rss / 1048576, 1),
+            'level': self.level,
+            'caches_kb': {name: round(size / 1024) for name, size in self.sizes().items()},
+            'evicted_kb': {name: round(size / 1024) for name, size in self.evicted.items()},
+        }
+
+
+def evict_oldest(mapping: Dict, count: int, age_key) -> int:
+    """Drop the count entries of a dict with the smallest age_key(value); returns how many went"""
+    if count <= 0 or not mapping:
+        return 0
+    victims = heapq.nsmallest(count, list(mapping.items()), key=lambda item: age_key(item[1]))
+    for key, _ in victims:
+        mapping.pop(key, None)
+    return len(victims)
+
+
+class StateSnapshotFile:
+    """
+    Binary warm-start snapshot of the hunter's in-memory state
+    Two files, each a fixed header (magic, version, sizes, CRC32 of the body)
+    plus a zlib-compressed body: the small JSON state at path, rewritten
+    often, and the seen-filter bits at path + '.seen' (a few MB), rewritten
+    only when the filter changed and at a much longer interval to spare flash.
+    Loaded through mmap so a restart only pays for the checksum and inflate
+    """
+    
+    MAGIC = b'DGHS'
+    SEEN_MAGIC = b'DGHB'
+    VERSION = 2
+    HEADER = struct.Struct('<4sHdQI')  # magic, version, saved_at, body_len, crc
+    SEEN_HEADER = struct.Struct('<4sHHdQQQI')  # magic, version, hashes, saved_at, bits, count, body_len, crc
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.seen_path = f"{path}.seen"
+    
+    @staticmethod
+    def replace(path: str, header: bytes, body: bytes):
+        """Write atomically (tmp file + replace)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(body)
+        os.replace(tmp_path, path)
+    
+    def write(self, state: Dict):
+        body = zlib.compress(json.dumps(state, separators=(',', ':')).encode(), 1)
+        self.replace(self.path, self.HEADER.pack(self.MAGIC, self.VERSION, time.time(), len(body),
+                                                 zlib.crc32(body)), body)
+    
+    def write_seen(self, seen: SeenFilter):
+        body = zlib.compress(seen.bits, 1)
+        self.replace(self.seen_path, self.SEEN_HEADER.pack(self.SEEN_MAGIC, self.VERSION, seen.hashes, time.time(),
+                                                           seen.size, seen.count, len(body), zlib.crc32(body)), body)
+    
+    def load(self, path: str, header: struct.Struct, magic: bytes) -> Optional[Tuple[tuple, bytes]]:
+        """(header fields, inflated body), or None if missing/stale format/corrupt"""
+        try:
+            with open(path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        
+        try:
+            if len(data) < header.size:
+                return None
+            fields = header.unpack_from(data, 0)
+            if fields[0] != magic or fields[1] != self.VERSION:
+                print(f"State snapshot {path}: unsupported format (version {fields[1]})")
+                return None
+            body_len, crc = fields[-2:]
+            if len(data) != header.size + body_len:
+                print(f"State snapshot {path}: truncated")
+                return None
+            
+            view = memoryview(data)
+            body = view[header.size:]
+            ok = zlib.crc32(body) == crc
+            inflated = zlib.decompress(body) if ok else None
+            body.release()
+            view.release()
+            if not ok:
+                print(f"State snapshot {path}: checksum mismatch")
+                return None
+            return fields, inflated
+        finally:
+            data.close()
+    
+    def read(self) -> Optional[Tuple[Dict, Dict]]:
+        """(state, {'saved_at'}), or None"""
+        loaded = self.load(self.path, self.HEADER, self.MAGIC)
+        if loaded is None:
+            return None
+        fields, body = loaded
+        return json.loads(body), {'saved_at': fields[2]}
+    
+    def read_seen(self) -> Optional[Tuple[Dict, bytearray]]:
+        """({'saved_at', 'hashes', 'bits', 'count'}, seen-filter bits), or None"""
+        loaded = self.load(self.seen_path, self.SEEN_HEADER, self.SEEN_MAGIC)
+        if loaded is None:
+            return None
+        (_, _, hashes, saved_at, bits, count, _, _), body = loaded
+        return {'saved_at': saved_at, 'hashes': hashes, 'bits': bits, 'count': count}, bytearray(body)
+
+
+class SnapshotStore:
+    """
+    Immutable JSON snapshots of hunter state for the local API
+    Each publish serializes once; readers get the same bytes and ETag,
+    and long-pollers are woken when a newer version appears
+    """
+    
+    def __init__(self):
+        self.snapshots = {}  # {name: (version, etag, body)}
+        self.condition = threading.Condition()
+    
+    def publish(self, name: str, data) -> str:
+        body = json.dumps(data, separators=(',', ':'), default=str).encode()
+        with self.condition:
+            version = self.snapshots.get(name, (0, None, None))[0] + 1
+            etag = f'"{version}-{zlib.crc32(body):08x}"'
+            self.snapshots[name] = (version, etag, body)
+            self.condition.notify_all()
+        return etag
+    
+    def get(self, name: str) -> Optional[tuple]:
+        with self.condition:
+            return self.snapshots.get(name)
+    
+    def wait_newer(self, name: str, etag: Optional[str], timeout: float) -> Optional[tuple]:
+        """Block until the snapshot's ETag differs from etag (or timeout)"""
+        deadline = time.time() + timeout
+        with self.condition:
+            while True:
+                current = self.snapshots.get(name)
+                if current is not None and current[1] != etag:
+                    return current
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return current
+                self.condition.wait(remaining)
+
+
+class LocalApiHandler:
+    """
+    GET /tokens | /positions | /pumps | /status
+    Supports If-None-Match (304) and ?wait=<seconds> to long-poll for the next version
+    Mixed into BaseHTTPRequestHandler by start_local_api, so http.server is only
+    imported when the API is enabled
+    """
+    
+    store = None  # set by start_local_api
+    MAX_WAIT = 300
+    
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        name = parsed.path.strip('/') or 'tokens'
+        if name not in ('tokens', 'positions', 'pumps', 'status'):
+            self.send_error(404, "Unknown endpoint (tokens, positions, pumps, status)")
+            return
+        
+        query = parse_qs(parsed.query)
+        etag = self.headers.get('If-None-Match')
+        try:
+            wait_seconds = min(float(query.get('wait', ['0'])[0]), self.MAX_WAIT)
+        except ValueError:
+            wait_seconds = 0
+        
+        if wait_seconds > 0:
+            snapshot = self.store.wait_newer(name, etag, wait_seconds)
+        else:
+            snapshot = self.store.get(name)
+        
+        if snapshot is None:
+            self.send_error(503, "No data yet")
+            return
+        
+        version, current_etag, body = snapshot
+        if etag == current_etag:
+            self.send_response(304)
+            self.send_header('ETag', current_etag)
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', current_etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass  # keep the console for cycle output
+
+
+def start_local_api(store: SnapshotStore, port: int, host: str = '127.0.0.1') -> 'ThreadingHTTPServer':
+    """Serve snapshots on localhost in a daemon thread"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    handler = type('BoundLocalApiHandler', (LocalApiHandler, BaseHTTPRequestHandler), {'store': store})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="local-api").start()
+    print(f"🌐 Local API on http://{host}:{port} (tokens, positions, pumps, status)")
+    return server
+
+
+class DatabaseWriter:
+    """
+    Single writer thread that owns the SQLite write connection
+    Writes are queued and everything pending is committed in one transaction,
+    so scanner, tracker and control code never contend for the write lock
+    """
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True, name="db-writer")
+        self.thread.start()
+    
+    def execute(self, sql: str, params: tuple = ()):
+        """Queue a single statement"""
+        self.queue.put((sql, params, False))
+    
+    def executemany(self, sql: str, rows: List[tuple]):
+        """Queue a statement for many rows"""
+        if rows:
+            self.queue.put((sql, rows, True))
+    
+    def flush(self, timeout: float = 10):
+        """Block until everything queued so far is committed"""
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait(timeout)
+    
+    def close(self):
+        self.flush()
+        self.queue.put(None)
+        self.thread.join(timeout=5)
+    
+    def run(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        running = True
+        while running:
+            items = [self.queue.get()]
+            # Group commit whatever else is already waiting
+            while True:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            waiters = []
+            try:
+                cursor = conn.cursor()
+                for item in items:
+                    if item is None:
+                        running = False
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        sql, params, many = item
+                        try:
+                            if many:
+                                cursor.executemany(sql, params)
+                            else:
+                                cursor.execute(sql, params)
+                        except sqlite3.Error as e:
+                            print(f"DB write error: {e}")
+                conn.commit()
+            except Exception as e:
+                print(f"DB writer error: {e}")
+            
+            for waiter in waiters:
+                waiter.set()
+        
+        conn.close()
+
+
+class HistoryCompactor(threading.Thread):
+    """
+    Background job that rolls old pump_events rows into 5m/1h OHLC tables,
+    applies retention and reclaims space with incremental VACUUM (databases
+    from before auto_vacuum are converted at startup, see convert_vacuum)
+    Works in short per-window transactions on its own connection (WAL),
+    so the scanner's writes are never blocked for long
+    """
+    
+    BUCKET_5M = 300
+    BUCKET_1H = 3600
+    WINDOW_SECONDS = 6 * 3600  # rows rolled per transaction
+    
+    def __init__(self, db_path: str):
+        super().__init__(daemon=True, name="history-compactor")
+        self.db_path = db_path
+        self.interval = float(os.getenv('HISTORY_COMPACT_MINUTES', '30')) * 60
+        self.raw_hours = float(os.getenv('HISTORY_RAW_HOURS', '24'))
+        self.retention_5m_days = float(os.getenv('HISTORY_5M_DAYS', '7'))
+        self.retention_1h_days = float(os.getenv('HISTORY_1H_DAYS', '90'))
+        self.launch_retention_days = float(os.getenv('LAUNCH_RETENTION_DAYS', '30'))
+        self.leaderboard_retention_days = float(os.getenv('LEADERBOARD_RETENTION_DAYS', '30'))
+        self.stop_event = threading.Event()
+        self.vacuum_hint_shown = False
+    
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"History compaction error: {e}")
+            self.stop_event.wait(self.interval)
+    
+    def stop(self):
+        self.stop_event.set()
+    
+    @staticmethod
+    def sql_time(ts: float) -> str:
+        """Unix time -> CURRENT_TIMESTAMP format (UTC)"""
+        return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    
+    def run_once(self):
+        """One compaction pass"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            if not self.vacuum_hint_shown and conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                # A full VACUUM here would block the scanner's writes for the whole rewrite
+                print("🗜️ Database predates incremental vacuum; freed pages are reused but not returned. "
+                      "Set HISTORY_VACUUM_CONVERT=true for one restart to convert it")
+                self.vacuum_hint_shown = True
+            now = time.time()
+            
+            raw_cutoff = int((now - self.raw_hours * 3600) // self.BUCKET_5M * self.BUCKET_5M)
+            rolled_raw = self.roll_raw(conn, raw_cutoff)
+            
+            cutoff_5m = int((now - self.retention_5m_days * 86400) // self.BUCKET_1H * self.BUCKET_1H)
+            rolled_5m = self.roll_5m(conn, cutoff_5m)
+            
+            cursor = conn.cursor()
+            cursor.execute(
+                'DELETE FROM pump_events_1h WHERE bucket_start < ?',
+                (int(now - self.retention_1h_days * 86400),)
+            )
+            expired_1h = cursor.rowcount
+            cursor.execute(
+                'DELETE FROM new_launches WHERE timestamp < ?',
+                (self.sql_time(now - self.launch_retention_days * 86400),)
+            )
+            expired_launches = cursor.rowcount
+            cursor.execute(
+                'DELETE FROM top_scores_hourly WHERE hour < ?',
+                (int(now - self.leaderboard_retention_days * 86400),)
+            )
+            conn.commit()
+            
+            # Give freed pages back to the filesystem a bit at a time
+            conn.execute('PRAGMA incremental_vacuum(2000)').fetchall()
+            conn.commit()
+            
+            if rolled_raw or rolled_5m or expired_1h or expired_launches:
+                print(f"🗜️ History compacted: {rolled_raw} raw→5m, {rolled_5m} 5m→1h, "
+                      f"{expired_1h} 1h + {expired_launches} launches expired")
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def convert_vacuum(db_path: str):
+        """
+        Databases created before auto_vacuum was enabled need one full VACUUM
+        to switch modes; after that only incremental vacuums are used.
+        Rewrites the whole file, so it runs at startup before anything writes
+        """
+        conn = sqlite3.connect(db_path, timeout=30)
+        try:
+            if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+                return
+            print("🗜️ Converting database to incremental vacuum (one-time full VACUUM)...")
+            started = time.time()
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
+            print(f"🗜️ Converted in {time.time() - started:.1f}s")
+        finally:
+            conn.close()
+    
+    def roll_raw(self, conn, cutoff: int) -> int:
+        """Roll raw pump_events older than cutoff into 5m buckets"""
+        # Plain MIN(timestamp) is one lookup in idx_pump_events_timestamp; bucket it here
+        row = conn.execute('SELECT MIN(timestamp) FROM pump_events').fetchone()
+        if row[0] is None:
+            return 0
+        
+        rolled = 0
+        oldest = datetime.fromisoformat(row[0]).replace(tzinfo=timezone.utc).timestamp()
+        lower = int(oldest) // self.BUCKET_5M * self.BUCKET_5M
+        while lower < cutoff:
+            upper = min(lower + self.WINDOW_SECONDS, cutoff)
+            params = (self.sql_time(lower), self.sql_time(upper))
+            cursor = conn.cursor()
+            cursor.execute('''
+                WITH grouped AS (
+                    SELECT CAST(strftime('%s', timestamp) AS INTEGER) / 300 * 300 AS bucket_start,
+                           token_address,
+                           MAX(token_symbol) AS token_symbol,
+                           MAX(chain) AS chain,
+                           MIN(id) AS first_id,
+                           MAX(id) AS last_id,
+                           COUNT(*) AS samples,
+                           MAX(price) AS price_high,
+                           MIN(price) AS price_low,
+                           MAX(price_change_5m) AS max_change_5m,
+                           MAX(price_change_1h) AS max_change_1h,
+                           MAX(volume_surge) AS max_volume_surge,
+                           MAX(pump_score) AS max_pump_score
+                    FROM pump_events
+                    WHERE timestamp >= ? AND timestamp < ?
+                    GROUP BY bucket_start, token_address
+                )
+                INSERT INTO pump_events_5m
+                    (bucket_start, token_address, token_symbol, chain, samples,
+                     price_open, price_high, price_low, price_close,
+                     max_change_5m, max_change_1h, max_volume_surge, max_pump_score)
+                SELECT g.bucket_start, g.token_address, g.token_symbol, g.chain, g.samples,
+                       o.price, g.price_high, g.price_low, c.price,
+                       g.max_change_5m, g.max_change_1h, g.max_volume_surge, g.max_pump_score
+                FROM grouped g
+                JOIN pump_events o ON o.id = g.first_id
+                JOIN pump_events c ON c.id = g.last_id
+                WHERE true
+                ON CONFLICT(bucket_start, token_address) DO UPDATE SET
+                    samples = samples + excluded.samples,
+                    price_high = MAX(price_high, excluded.price_high),
+                    price_low = MIN(price_low, excluded.price_low),
+                    price_close = excluded.price_close,
+                    max_change_5m = MAX(max_change_5m, excluded.max_change_5m),
+                    max_change_1h = MAX(max_change_1h, excluded.max_change_1h),
+                    max_volume_surge = MAX(max_volume_surge, excluded.max_volume_surge),
+                    max_pump_score = MAX(max_pump_score, excluded.max_pump_score)
+            ''', params)
+            cursor.execute('DELETE FROM pump_events WHERE timestamp >= ? AND timestamp < ?', params)
+            rolled += cursor.rowcount
+            conn.commit()
+            lower = upper
+        
+        return rolled
+    
+    def roll_5m(self, conn, cutoff: int) -> int:
+        """Roll 5m buckets older than cutoff into 1h buckets"""
+        row = conn.execute('SELECT MIN(bucket_start) FROM pump_events_5m').fetchone()
+        if row[0] is None:
+            return 0
+        
+        rolled = 0
+        lower = int(row[0]) // self.BUCKET_1H * self.BUCKET_1H
+        while lower < cutoff:
+            upper = min(lower + self.WINDOW_SECONDS, cutoff)
+            cursor = conn.cursor()
+            cursor.execute('''
+                WITH grouped AS (
+                    SELECT bucket_start / 3600 * 3600 AS hour_start,
+                           token_address,
+                           MAX(token_symbol) AS token_symbol,
+                           MAX(chain) AS chain,
+                           MIN(bucket_start) AS first_bucket,
+                           MAX(bucket_start) AS last_bucket,
+                           SUM(samples) AS samples,
+                           MAX(price_high) AS price_high,
+                           MIN(price_low) AS price_low,
+                           MAX(max_change_5m) AS max_change_5m,
+                           MAX(max_change_1h) AS max_change_1h,
+                           MAX(max_volume_surge) AS max_volume_surge,
+                           MAX(max_pump_score) AS max_pump_score
+                    FROM pump_events_5m
+                    WHERE bucket_start >= ? AND bucket_start < ?
+                    GROUP BY hour_start, token_address
+                )
+                INSERT INTO pump_events_1h
+                    (bucket_start, token_address, token_symbol, chain, samples,
+                     price_open, price_high, price_low, price_close,
+                     max_change_5m, max_change_1h, max_volume_surge, max_pump_score)
+                SELECT g.hour_start, g.token_address, g.token_symbol, g.chain, g.samples,
+                       o.price_open, g.price_high, g.price_low, c.price_close,
+                       g.max_change_5m, g.max_change_1h, g.max_volume_surge, g.max_pump_score
+                FROM grouped g
+                JOIN pump_events_5m o ON o.token_address = g.token_address AND o.bucket_start = g.first_bucket
+                JOIN pump_events_5m c ON c.token_address = g.token_address AND c.bucket_start = g.last_bucket
+                WHERE true
+                ON CONFLICT(bucket_start, token_address) DO UPDATE SET
+                    samples = samples + excluded.samples,
+                    price_high = MAX(price_high, excluded.price_high),
+                    price_low = MIN(price_low, excluded.price_low),
+                    price_close = excluded.price_close,
+                    max_change_5m = MAX(max_change_5m, excluded.max_change_5m),
+                    max_change_1h = MAX(max_change_1h, excluded.max_change_1h),
+                    max_volume_surge = MAX(max_volume_surge, excluded.max_volume_surge),
+                    max_pump_score = MAX(max_pump_score, excluded.max_pump_score)
+            ''', (lower, upper))
+            cursor.execute('DELETE FROM pump_events_5m WHERE bucket_start >= ? AND bucket_start < ?', (lower, upper))
+            rolled += cursor.rowcount
+            conn.commit()
+            lower = upper
+        
+        return rolled
+
 
 class DegenCoinHunter:
-    def __init__(self, telegram_token: str, telegram_chat_id: str):
+    def __init__(self, telegram_token: str, telegram_chat_id: str,
+                 http_session: Optional[requests.Session] = None,
+                 transport: Optional[TelegramTransport] = None,
+                 db_writer: Optional[DatabaseWriter] = None):
         self.telegram_token = telegram_token
         self.telegram_chat_id = telegram_chat_id
-        self.db_path = "degen_tracker.db"
+        self.transport = transport or TelegramTransport(
+            telegram_token,
+            chat_interval=float(os.getenv('TELEGRAM_CHAT_INTERVAL', '1')),
+            session=http_session
+        )
+        # Power-saving mode: aligned timers, alerts grouped into one burst per wakeup
+        self.power_save = os.getenv('POWER_SAVE', 'false').lower() == 'true'
+        self.power = self.transport.meter
+        self.outbox = AlertOutbox(self.transport, enabled=self.power_save)
+        self.subscribers = SubscriberIndex.from_env(telegram_chat_id)
+        self.http = HttpClient(http_session, meter=self.power)
+        self.holder_enricher = HolderEnricher.from_env(self.http)
+        self.token_index = TokenIndex()
+        self.symbol_index = SymbolIndex()
+        self.status_path = os.getenv('HUNTER_STATUS_FILE', 'hunter_status.json')
+        self.cycle_count = 0
+        self.db_path = db_writer.db_path if db_writer else "degen_tracker.db"
         self.init_database()
+        if os.getenv('HISTORY_VACUUM_CONVERT', 'false').lower() == 'true':
+            HistoryCompactor.convert_vacuum(self.db_path)
+        self.db_writer = db_writer or DatabaseWriter(self.db_path)
+        self.risk_screener = RiskScreener.from_env(self.db_path, self.db_writer)
+        self.compactor = None
+        self.startup_finished = False  # symbol index, compactor and API come up after the first scan
+        self.stopped = False  # set when the watchdog replaced this hunter
         
         # API endpoints
         self.dexscreener_api = "https://api.dexscreener.com/latest/dex"
         self.dextools_api = "https://api.dextools.io/v1"
         self.coingecko_api = "https://api.coingecko.com/api/v3"
+        self.price_fetcher = self.build_price_fetcher()
+        
+        # Live messages: edit ongoing state in place, send new messages only for threshold events
+        self.live_messages = os.getenv('LIVE_MESSAGES', 'false').lower() == 'true'
+        self.pin_positions = os.getenv('LIVE_PIN_POSITIONS', 'false').lower() == 'true'
+        self.board = self.load_live_messages()
         
         # Tracking state
-        self.tracked_tokens = {}  # {address: {price, entry_price, sl, tp}}
+        self.tracked_tokens = self.load_tracked_tokens()  # {address: {price, entry_price, sl, tp}}
         
+        # In-memory snapshots served by the local API
+        self.snapshots = SnapshotStore()
+        self.api_server = None
+        self.cycle_scored = []  # every pair scored this cycle
+        self.recent_pumps = deque(maxlen=int(os.getenv('API_RECENT_PUMPS', '200')))
+        
+        # Liveness for the watchdog: {worker: {stage, ts, deadline, thread}}
+        self.heartbeats = {}
+        self.heartbeat_path = os.getenv('HUNTER_HEARTBEAT_FILE', 'hunter_heartbeat.json')
+        self.stage_budget = float(os.getenv('WATCHDOG_STAGE_SECONDS', '300'))
+        self.render_cache = RenderCache()
+        
+        # Incremental discovery state
+        self.high_water_marks = self.load_high_water_marks()  # {chain: pairCreatedAt ms}
+        self.young_pairs = {}  # {pair_address: {created_at, last_refresh}}
+        self.seen_pairs = SeenFilter(
+            capacity=int(os.getenv('SEEN_CAPACITY', '2000000')),
+            error_rate=float(os.getenv('SEEN_ERROR_RATE', '0.001'))
+        )
+        
+        # Warm start from the last state snapshot, otherwise rebuild what we can from SQLite
+        self.state_file = StateSnapshotFile(os.getenv('HUNTER_STATE_FILE', 'hunter_state.bin'))
+        self.state_interval = float(os.getenv('STATE_SNAPSHOT_SECONDS', '60'))
+        self.state_saved_at = 0.0
+        # The seen filter is MBs: only rewritten when it changed, and rarely
+        self.seen_interval = float(os.getenv('SEEN_SNAPSHOT_SECONDS', '3600'))
+        self.seen_saved_at = 0.0
+        self.seen_saved_count = None
+        saved_at = self.restore_state_snapshot()
+        # Launches newer than the saved filter (all of them on a cold start) are read in the
+        # background while the first scan downloads; users of the filter wait for seen_ready
+        self.seen_ready = threading.Event()
+        threading.Thread(target=self.load_seen_pairs, kwargs={'since': saved_at},
+                         daemon=True, name="seen-loader").start()
+        
+        # Wide discovery (several queries per chain, fetched concurrently)
+        self.discovery_mode = os.getenv('DISCOVERY_MODE', 'single').lower()  # single, wide
+        self.discovery_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv('DISCOVERY_WORKERS', '6')),
+            thread_name_prefix="discovery"
+        )
+        self.profile_feed = (0.0, [])  # (fetched_at, [(chain, token_address), ...])
+        self.discovery_lock = threading.Lock()
+        
+        # Staged scan pipeline (fetch -> parse -> score -> filter -> dispatch)
+        self.pipeline_mode = os.getenv('PIPELINE', 'false').lower() == 'true'
+        self.pipeline_stats = {}  # per-stage queue depth/shedding from the last cycle
+        
+        # Adaptive pump detection
+        self.pump_mode = os.getenv('PUMP_MODE', 'fixed').lower()  # fixed, adaptive, both
+        self.pump_stats = self.load_pump_stats()
+        
+        # Shared memory cap for every cache above (0 = unbounded)
+        self.memory = self.build_memory_budget()
+    
+    # Default DEX queries per chain for wide discovery (DISCOVERY_DEXES_<CHAIN> overrides)
+    DISCOVERY_DEXES = {
+        'ethereum': 'uniswap',
+        'bsc': 'pancakeswap',
+        'polygon': 'quickswap',
+        'base': 'aerodrome,uniswap',
+        'arbitrum': 'camelot,uniswap',
+        'solana': 'raydium,orca,pumpswap',
+    }
+    
+    # Refresh cadence for already-seen pairs: (max age hours, refresh every N seconds)
+    REFRESH_BUCKETS = [
+        (1, 5 * 60),
+        (6, 15 * 60),
+        (24, 60 * 60),
+        (48, 3 * 60 * 60),
+    ]
+        
+    # Bump whenever init_database's tables, columns or indexes change
+    SCHEMA_VERSION = 3
+    
     def init_database(self):
-        """Initialize database for tracking"""
+        """
+        Initialize database for tracking
+        A file already at SCHEMA_VERSION (PRAGMA user_version) skips the DDL
+        """
         conn = sqlite3.connect(self.db_path)
+        if conn.execute('PRAGMA user_version').fetchone()[0] == self.SCHEMA_VERSION:
+            conn.close()
+            return
         cursor = conn.cursor()
         
+        # Only takes effect on a fresh file; HISTORY_VACUUM_CONVERT converts older ones
+        cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        # WAL lets the compactor and readers work alongside the scanner's writes
+        cursor.execute('PRAGMA journal_mode = WAL')
+        
         # New launches table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS new_launches (
@@ -62,10 +3110,60 @@ class DegenCoinHunter:
                 price_change_1h REAL,
                 volume_surge REAL,
                 pump_score REAL,
+                price REAL,
                 timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
             )
         ''')
         
+        # Base token address of a launch (token_address holds the pair), added later
+        columns = [row[1] for row in cursor.execute('PRAGMA table_info(new_launches)')]
+        if 'base_token' not in columns:
+            cursor.execute('ALTER TABLE new_launches ADD COLUMN base_token TEXT')
+        
+        # Added after the first release
+        columns = [row[1] for row in cursor.execute('PRAGMA table_info(pump_events)')]
+        if 'price' not in columns:
+            cursor.execute('ALTER TABLE pump_events ADD COLUMN price REAL')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_pump_events_timestamp ON pump_events (timestamp)')
+        
+        # Compacted pump history (OHLC-style per token per bucket)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pump_events_5m (
+                bucket_start INTEGER,
+                token_address TEXT,
+                token_symbol TEXT,
+                chain TEXT,
+                samples INTEGER,
+                price_open REAL,
+                price_high REAL,
+                price_low REAL,
+                price_close REAL,
+                max_change_5m REAL,
+                max_change_1h REAL,
+                max_volume_surge REAL,
+                max_pump_score REAL,
+                PRIMARY KEY (bucket_start, token_address)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pump_events_1h (
+                bucket_start INTEGER,
+                token_address TEXT,
+                token_symbol TEXT,
+                chain TEXT,
+                samples INTEGER,
+                price_open REAL,
+                price_high REAL,
+                price_low REAL,
+                price_close REAL,
+                max_change_5m REAL,
+                max_change_1h REAL,
+                max_volume_surge REAL,
+                max_pump_score REAL,
+                PRIMARY KEY (bucket_start, token_address)
+            )
+        ''')
+        
         # Price alerts table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS price_alerts (
@@ -82,9 +3180,475 @@ class DegenCoinHunter:
             )
         ''')
         
+        # SL/TP hits (chain and P/L added after the first release)
+        columns = [row[1] for row in cursor.execute('PRAGMA table_info(price_alerts)')]
+        if 'chain' not in columns:
+            cursor.execute('ALTER TABLE price_alerts ADD COLUMN chain TEXT')
+        if 'pnl_percent' not in columns:
+            cursor.execute('ALTER TABLE price_alerts ADD COLUMN pnl_percent REAL')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_price_alerts_type_time ON price_alerts (alert_type, timestamp)')
+        # /history without an outcome filter reads newest-first by time alone
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_price_alerts_time ON price_alerts (timestamp)')
+        
+        # Leaderboard: best score per token per chain/hour, trimmed to the top N on every write
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS top_scores_hourly (
+                chain TEXT,
+                hour INTEGER,
+                token_address TEXT,
+                token_symbol TEXT,
+                score REAL,
+                price REAL,
+                liquidity REAL,
+                url TEXT,
+                PRIMARY KEY (chain, hour, token_address)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_top_scores_hour ON top_scores_hourly (hour)')
+        
+        # SL/TP outcome counters per UTC day and chain
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS outcome_counts (
+                day TEXT,
+                chain TEXT,
+                outcome TEXT,
+                hits INTEGER,
+                pnl_sum REAL,
+                PRIMARY KEY (day, chain, outcome)
+            )
+        ''')
+        
+        # Discovery high-water marks (newest pairCreatedAt seen per chain)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS discovery_state (
+                chain TEXT PRIMARY KEY,
+                high_water_mark INTEGER,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Tracked positions (SL/TP), so restarts pick them back up
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tracked_positions (
+                token_address TEXT PRIMARY KEY,
+                token_symbol TEXT,
+                entry_price REAL,
+                stop_loss REAL,
+                take_profit REAL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Adaptive pump detection state (EWMA per chain/liquidity bucket/metric)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pump_stats (
+                key TEXT PRIMARY KEY,
+                n INTEGER,
+                mean REAL,
+                var REAL
+            )
+        ''')
+        
+        # Telegram messages that are edited in place (position dashboards, running pumps)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS live_messages (
+                token_address TEXT,
+                chat_id TEXT,
+                kind TEXT,
+                message_id INTEGER,
+                digest TEXT,
+                pinned BOOLEAN DEFAULT 0,
+                created_at REAL,
+                updated_at REAL,
+                PRIMARY KEY (token_address, chat_id, kind)
+            )
+        ''')
+        
+        # Contract-risk verdicts, kept forever (a contract is screened once)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS risk_verdicts (
+                token_address TEXT PRIMARY KEY,
+                chain TEXT,
+                verdict TEXT,
+                checks TEXT,
+                screened_at REAL
+            )
+        ''')
+        
+        cursor.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
         conn.commit()
         conn.close()
     
+    # Rough per-entry sizes (bytes) used for memory-budget accounting
+    ENTRY_BYTES = {
+        'render_cache': 2500,
+        'holders': 200,
+        'price_quotes': 400,
+        'token_index': 700,
+        'young_pairs': 300,
+        'recent_pumps': 2000,
+        'live_messages': 400,
+        'tracked_tokens': 800,
+        'symbol_index': 700,
+        'risk_verdicts': 500,
+    }
+    
+    def build_memory_budget(self) -> MemoryBudget:
+        """Register every cache with MEMORY_BUDGET_MB; cheapest to rebuild is evicted first"""
+        memory = MemoryBudget(
+            float(os.getenv('MEMORY_BUDGET_MB', '0')),
+            soft=float(os.getenv('MEMORY_SOFT_RATIO', '0.8')),
+            hard=float(os.getenv('MEMORY_HARD_RATIO', '0.95')),
+        )
+        sizes = self.ENTRY_BYTES
+        
+        def count_for(name: str, target: float) -> int:
+            return int(math.ceil(target / sizes[name]))
+        
+        def evict_render(target: float) -> int:
+            with self.render_cache.lock:
+                entries = self.render_cache.entries
+                count = min(len(entries), count_for('render_cache', target))
+                for _ in range(count):
+                    entries.popitem(last=False)
+            return count * sizes['render_cache']
+        
+        def evict_holders(target: float) -> int:
+            if not self.holder_enricher:
+                return 0
+            with self.holder_enricher.lock:
+                evicted = evict_oldest(self.holder_enricher.cache, count_for('holders', target), lambda entry: entry[1])
+            return evicted * sizes['holders']
+        
+        def evict_quotes(target: float) -> int:
+            with self.price_fetcher.lock:
+                evicted = evict_oldest(self.price_fetcher.latest, count_for('price_quotes', target),
+                                       lambda answers: max(answered_at for _, answered_at in answers.values()))
+            return evicted * sizes['price_quotes']
+        
+        def evict_index(target: float) -> int:
+            with self.token_index.lock:
+                evicted = evict_oldest(self.token_index.tokens, count_for('token_index', target),
+                                       lambda pairs: max(info['updated_at'] for info in pairs.values()))
+            return evicted * sizes['token_index']
+        
+        def evict_young(target: float) -> int:
+            # Seen filter still blocks re-alerts; these pairs just stop being refreshed
+            with self.discovery_lock:
+                evicted = evict_oldest(self.young_pairs, count_for('young_pairs', target),
+                                       lambda young: young['created_at'])
+            return evicted * sizes['young_pairs']
+        
+        def evict_verdicts(target: float) -> int:
+            # Verdicts stay in SQLite; evicted ones are read back when their token reappears
+            if not self.risk_screener:
+                return 0
+            with self.risk_screener.lock:
+                verdicts = self.risk_screener.verdicts
+                count = min(len(verdicts), count_for('risk_verdicts', target))
+                for _ in range(count):
+                    verdicts.popitem(last=False)
+            return count * sizes['risk_verdicts']
+        
+        def evict_pumps(target: float) -> int:
+            count = min(len(self.recent_pumps), count_for('recent_pumps', target))
+            for _ in range(count):
+                self.recent_pumps.popleft()
+            return count * sizes['recent_pumps']
+        
+        def evict_messages(target: float) -> int:
+            # Positions keep their dashboards; only launch/pump messages stop being edited
+            with self.board.lock:
+                keys = sorted((key for key in self.board.messages if key[2] != 'position'),
+                              key=lambda key: self.board.messages[key]['created_at'])
+            keys = keys[:count_for('live_messages', target)]
+            for key in keys:
+                self.board.forget(key)
+            return len(keys) * sizes['live_messages']
+        
+        memory.register('render_cache', lambda: len(self.render_cache.entries) * sizes['render_cache'], evict_render, 0)
+        memory.register('holders', lambda: len(self.holder_enricher.cache) * sizes['holders']
+                        if self.holder_enricher else 0, evict_holders, 1)
+        memory.register('risk_verdicts', lambda: len(self.risk_screener.verdicts) * sizes['risk_verdicts']
+                        if self.risk_screener else 0, evict_verdicts, 1)
+        memory.register('price_quotes', lambda: len(self.price_fetcher.latest) * sizes['price_quotes'], evict_quotes, 1)
+        memory.register('token_index', lambda: sum(len(pairs) for pairs in list(self.token_index.tokens.values()))
+                        * sizes['token_index'], evict_index, 2)
+        memory.register('recent_pumps', lambda: len(self.recent_pumps) * sizes['recent_pumps'], evict_pumps, 3)
+        memory.register('young_pairs', lambda: len(self.young_pairs) * sizes['young_pairs'], evict_young, 3)
+        memory.register('live_messages', lambda: len(self.board.messages) * sizes['live_messages'], evict_messages, 4)
+        # Accounted but never evicted: positions and the fixed-size seen filter
+        memory.register('tracked_tokens', lambda: len(self.tracked_tokens) * sizes['tracked_tokens'], lambda target: 0, 9)
+        memory.register('seen_pairs', lambda: len(self.seen_pairs.bits), lambda target: 0, 9)
+        memory.register('symbol_index', lambda: len(self.symbol_index) * sizes['symbol_index'], lambda target: 0, 9)
+        return memory
+    
+    def build_price_fetcher(self) -> HedgedPriceFetcher:
+        """Price sources in PRICE_SOURCES order (first is primary, the rest are hedges)"""
+        available = {
+            'dexscreener': lambda: DexScreenerPriceSource(self.http, self.dexscreener_api, self.token_index),
+            'coingecko': lambda: CoinGeckoPriceSource(self.http, self.coingecko_api),
+            'dextools': lambda: DexToolsPriceSource(
+                self.http, os.getenv('DEXTOOLS_API', self.dextools_api), os.getenv('DEXTOOLS_API_KEY', '')
+            ),
+        }
+        names = os.getenv('PRICE_SOURCES', 'dexscreener,coingecko,dextools').split(',')
+        sources = [available[name.strip()]() for name in names if name.strip() in available]
+        return HedgedPriceFetcher(
+            self.http,
+            sources,
+            hedge_delay=float(os.getenv('PRICE_HEDGE_DELAY', '1.0')),
+            deadline=float(os.getenv('PRICE_DEADLINE', '10')),
+            disagree_percent=float(os.getenv('PRICE_DISAGREE_PERCENT', '5')),
+        )
+    
+    def load_tracked_tokens(self) -> Dict[str, Dict]:
+        """Load tracked positions saved by a previous run"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT token_address, token_symbol, entry_price, stop_loss, take_profit FROM tracked_positions')
+        tracked = {
+            address: {
+                'symbol': symbol,
+                'entry_price': entry_price,
+                'stop_loss': stop_loss,
+                'take_profit': take_profit
+            }
+            for address, symbol, entry_price, stop_loss, take_profit in cursor.fetchall()
+        }
+        conn.close()
+        return tracked
+    
+    def load_symbol_index(self):
+        """Rebuild the symbol/name lookup from recorded launches"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT token_address, base_token, token_symbol, token_name, chain,
+                   initial_liquidity, pump_potential, initial_price
+            FROM new_launches
+        ''')
+        self.symbol_index.load([
+            {
+                'address': pair_address,
+                'token_address': base_token or '',
+                'symbol': symbol or '',
+                'name': name or '',
+                'chain': chain or '',
+                'liquidity': liquidity or 0,
+                'score': score or 0,
+                'price': price or 0,
+                'url': f"https://dexscreener.com/{chain}/{pair_address}",
+            }
+            for pair_address, base_token, symbol, name, chain, liquidity, score, price in cursor.fetchall()
+        ])
+        conn.close()
+    
+    def load_live_messages(self) -> MessageBoard:
+        """Load live message ids saved by a previous run"""
+        board = MessageBoard(
+            self.transport,
+            self.db_writer,
+            edit_interval=float(os.getenv('LIVE_EDIT_SECONDS', '60')),
+            ttl_seconds=float(os.getenv('LIVE_MESSAGE_TTL_HOURS', '24')) * 3600,
+        )
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT token_address, chat_id, kind, message_id, digest, pinned, created_at, updated_at
+            FROM live_messages
+        ''')
+        board.load(cursor.fetchall())
+        conn.close()
+        return board
+    
+    def load_pump_stats(self) -> PumpStats:
+        """Load adaptive pump statistics"""
+        stats = PumpStats(
+            alpha=float(os.getenv('PUMP_EWMA_ALPHA', '0.05')),
+            min_samples=int(os.getenv('PUMP_MIN_SAMPLES', '30')),
+            z_threshold=float(os.getenv('PUMP_Z_THRESHOLD', '3')),
+        )
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT key, n, mean, var FROM pump_stats')
+        stats.load(cursor.fetchall())
+        conn.close()
+        return stats
+    
+    def save_pump_stats(self):
+        """Persist buckets updated since the last save"""
+        self.db_writer.executemany('''
+            INSERT INTO pump_stats (key, n, mean, var) VALUES (?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET n = excluded.n, mean = excluded.mean, var = excluded.var
+        ''', self.pump_stats.dirty_rows())
+    
+    def load_seen_pairs(self, since: Optional[float] = None):
+        """
+        Seed the seen filter from recorded launches so restarts don't re-alert
+        (only launches recorded after `since` when a snapshot already covers the rest)
+        Sets seen_ready when done, even on error
+        """
+        try:
+            started = time.time()
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            if since:
+                # Small overlap: timestamps are whole seconds and writes are group-committed
+                cursor.execute("SELECT token_address FROM new_launches WHERE timestamp >= datetime(?, 'unixepoch')",
+                               (since - 60,))
+            else:
+                cursor.execute('SELECT token_address FROM new_launches')
+            added = 0
+            for (address,) in cursor:
+                self.seen_pairs.add(address)
+                added += 1
+            conn.close()
+            if not since and added:
+                print(f"♻️ Seen filter rebuilt from {added} recorded launches ({time.time() - started:.1f}s)")
+        except Exception as e:
+            print(f"Seen filter load error: {e}")
+        finally:
+            self.seen_ready.set()
+    
+    def state_snapshot(self) -> Dict:
+        """In-memory state worth keeping across restarts (seen-filter bits are stored separately)"""
+        with self.token_index.lock:
+            token_index = {key: dict(pairs) for key, pairs in self.token_index.tokens.items()}
+        holders = []
+        if self.holder_enricher:
+            with self.holder_enricher.lock:
+                holders = [[chain, address, count, fetched_at]
+                           for (chain, address), (count, fetched_at) in self.holder_enricher.cache.items()]
+        return {
+            'cycle_count': self.cycle_count,
+            'tracked': {address: dict(tracking) for address, tracking in list(self.tracked_tokens.items())},
+            'young_pairs': dict(self.young_pairs),
+            'token_index': token_index,
+            'holders': holders,
+            'recent_pumps': list(self.recent_pumps),
+        }
+    
+    def save_state_snapshot(self, force: bool = False):
+        """
+        Write the warm-start snapshot (at most every STATE_SNAPSHOT_SECONDS unless forced);
+        the seen filter goes along when it changed, at most every SEEN_SNAPSHOT_SECONDS
+        """
+        started = time.time()
+        if not force and started - self.state_saved_at < self.state_interval:
+            return
+        try:
+            self.state_file.write(self.state_snapshot())
+            self.state_saved_at = time.time()
+            seen_count = self.seen_pairs.count
+            # A half-loaded filter must not be saved: the next start would skip the rest
+            with_seen = self.seen_ready.is_set() and seen_count != self.seen_saved_count and (
+                force or started - self.seen_saved_at >= self.seen_interval)
+            if with_seen:
+                self.state_file.write_seen(self.seen_pairs)
+                self.seen_saved_at = time.time()
+                self.seen_saved_count = seen_count
+            print(f"💾 State snapshot saved ({(time.time() - started) * 1000:.0f}ms"
+                  f"{', with seen filter' if with_seen else ''})")
+        except Exception as e:
+            print(f"State snapshot error: {e}")
+    
+    def restore_state_snapshot(self) -> Optional[float]:
+        """
+        Load the warm-start snapshot; returns when the seen filter was saved
+        (launches recorded since then still need adding), or None to rebuild it
+        """
+        started = time.time()
+        saved_at = self.restore_seen_filter()
+        loaded = self.state_file.read()
+        if loaded is None:
+            return saved_at
+        state, _ = loaded
+        
+        # Tracked positions live in SQLite; the snapshot only adds their runtime fields
+        for address, tracking in state.get('tracked', {}).items():
+            if address in self.tracked_tokens:
+                self.tracked_tokens[address] = dict(tracking, **self.tracked_tokens[address])
+        self.young_pairs.update(state.get('young_pairs', {}))
+        self.token_index.tokens.update(state.get('token_index', {}))
+        self.token_index.prune()
+        if self.holder_enricher:
+            for chain, address, count, fetched_at in state.get('holders', []):
+                self.holder_enricher.cache[(chain, address)] = (count, fetched_at)
+        self.recent_pumps.extend(state.get('recent_pumps', []))
+        self.cycle_count = state.get('cycle_count', 0)
+        
+        print(f"♻️ Warm start from {self.state_file.path}: {len(self.tracked_tokens)} tracked, "
+              f"{len(self.young_pairs)} young pairs, {len(self.seen_pairs)} seen pairs, "
+              f"{(time.time() - started) * 1000:.0f}ms")
+        return saved_at
+    
+    def restore_seen_filter(self) -> Optional[float]:
+        """Load the saved seen filter; returns its save time, or None if there is none usable"""
+        loaded = self.state_file.read_seen()
+        if loaded is None:
+            return None
+        meta, seen_bits = loaded
+        # The filter geometry depends on SEEN_CAPACITY/SEEN_ERROR_RATE; reseed from SQLite if they changed
+        if meta['bits'] != self.seen_pairs.size or meta['hashes'] != self.seen_pairs.hashes:
+            print("♻️ Seen-filter settings changed, rebuilding it from the database")
+            return None
+        self.seen_pairs.bits = seen_bits
+        self.seen_pairs.count = meta['count']
+        self.seen_saved_at = meta['saved_at']
+        self.seen_saved_count = meta['count']
+        return meta['saved_at']
+    
+    def load_high_water_marks(self) -> Dict[str, int]:
+        """Load per-chain discovery high-water marks"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT chain, high_water_mark FROM discovery_state')
+        marks = {chain: int(mark or 0) for chain, mark in cursor.fetchall()}
+        conn.close()
+        return marks
+    
+    def save_high_water_mark(self, chain: str, mark: int):
+        """Persist discovery high-water mark for a chain"""
+        self.db_writer.execute('''
+            INSERT INTO discovery_state (chain, high_water_mark, updated_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(chain) DO UPDATE SET
+                high_water_mark = excluded.high_water_mark,
+                updated_at = excluded.updated_at
+        ''', (chain, mark))
+    
+    def record_new_launches(self, launches: List[Dict], min_score: float):
+        """Store first-seen pairs in new_launches"""
+        if not launches:
+            return
+        
+        rows = [
+            (
+                token['address'],
+                token['name'],
+                token['symbol'],
+                token['chain'],
+                token['dex'],
+                # UTC like the table's CURRENT_TIMESTAMP columns; NULL when the pair has no creation time
+                datetime.fromtimestamp(token['created_at'] / 1000, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+                if token.get('created_at') else None,
+                token['liquidity'],
+                token['price'],
+                token['degen_score'],
+                token['degen_score'] >= min_score or token['is_pumping'],
+                token.get('token_address', ''),
+            )
+            for token in launches
+        ]
+        
+        self.db_writer.executemany('''
+            INSERT OR IGNORE INTO new_launches
+                (token_address, token_name, token_symbol, chain, dex, launch_time,
+                 initial_liquidity, initial_price, pump_potential, alerted, base_token)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+    
     def calculate_degen_score(self, token_data: Dict) -> float:
         """
         Calculate degen/pump potential score (0-100)
@@ -160,9 +3724,26 @@ class DegenCoinHunter:
         
         return min(score, 100.0)
     
-    def detect_pump(self, token_data: Dict) -> bool:
+    def detect_pump(self, token_data: Dict) -> bool:
+        """
+        Detect if token is currently pumping
+        PUMP_MODE: fixed (cutoffs below), adaptive (z-score vs. the token's
+        chain/liquidity bucket, fixed while warming up) or both (either one)
+        """
+        fixed = self.detect_pump_fixed(token_data)
+        if self.pump_mode == 'fixed':
+            return fixed
+        
+        abnormal = self.pump_stats.is_abnormal(token_data)
+        if abnormal is None:
+            return fixed
+        if self.pump_mode == 'adaptive':
+            return abnormal
+        return fixed or abnormal
+    
+    def detect_pump_fixed(self, token_data: Dict) -> bool:
         """
-        Detect if token is currently pumping
+        Fixed-threshold pump check
         """
         # Criteria for pump:
         # - Price up 20%+ in 5 minutes OR
@@ -181,6 +3762,282 @@ class DegenCoinHunter:
         
         return is_pumping
     
+    def record_pump_events(self, tokens: List[Dict]):
+        """Store one pump_events row per pumping token for this cycle"""
+        if not tokens:
+            return
+        
+        rows = [
+            (
+                token['address'],
+                token['symbol'],
+                token['chain'],
+                token.get('price_change_5m', 0),
+                token.get('price_change_1h', 0),
+                token.get('volume_surge', 1),
+                token.get('degen_score', 0),
+                token.get('price', 0),
+            )
+            for token in tokens
+        ]
+        
+        self.db_writer.executemany('''
+            INSERT INTO pump_events
+                (token_address, token_symbol, chain, price_change_5m, price_change_1h,
+                 volume_surge, pump_score, price)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+    
+    def record_top_scores(self, chain: str, tokens: List[Dict]):
+        """Fold scored tokens into this hour's leaderboard for the chain (kept at the top N)"""
+        limit = int(os.getenv('LEADERBOARD_PER_HOUR', '10'))
+        best = heapq.nlargest(limit, tokens, key=lambda token: token.get('degen_score', 0))
+        if not best:
+            return
+        
+        hour = int(time.time() // 3600 * 3600)
+        rows = [
+            (
+                chain,
+                hour,
+                token.get('token_address') or token['address'],
+                token['symbol'],
+                token['degen_score'],
+                token['price'],
+                token['liquidity'],
+                token['url'],
+            )
+            for token in best
+        ]
+        self.db_writer.executemany('''
+            INSERT INTO top_scores_hourly
+                (chain, hour, token_address, token_symbol, score, price, liquidity, url)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(chain, hour, token_address) DO UPDATE SET
+                score = MAX(score, excluded.score),
+                price = excluded.price,
+                liquidity = excluded.liquidity
+        ''', rows)
+        self.db_writer.execute('''
+            DELETE FROM top_scores_hourly
+            WHERE chain = ? AND hour = ? AND token_address NOT IN (
+                SELECT token_address FROM top_scores_hourly
+                WHERE chain = ? AND hour = ?
+                ORDER BY score DESC LIMIT ?
+            )
+        ''', (chain, hour, chain, hour, limit))
+    
+    def record_outcome(self, alert: Dict):
+        """Store an SL/TP hit and bump the per-day outcome counters"""
+        self.db_writer.execute('''
+            INSERT INTO price_alerts
+                (token_address, token_symbol, entry_price, current_price, stop_loss, take_profit,
+                 alert_type, triggered, chain, pnl_percent)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?)
+        ''', (
+            alert['address'], alert['symbol'], alert['entry_price'], alert['current_price'],
+            alert.get('stop_loss'), alert.get('take_profit'), alert['type'],
+            alert.get('chain', ''), alert['pnl_percent'],
+        ))
+        self.db_writer.execute('''
+            INSERT INTO outcome_counts (day, chain, outcome, hits, pnl_sum)
+            VALUES (?, ?, ?, 1, ?)
+            ON CONFLICT(day, chain, outcome) DO UPDATE SET
+                hits = hits + 1,
+                pnl_sum = pnl_sum + excluded.pnl_sum
+        ''', (datetime.now(timezone.utc).strftime('%Y-%m-%d'), alert.get('chain', ''), alert['type'], alert['pnl_percent']))
+    
+    def get_pump_history(self, token_address: str, hours: float = 24) -> List[Dict]:
+        """
+        Pump history for a token, oldest first
+        Recent rows come from the small raw table, older ones from the aggregates
+        """
+        since = time.time() - hours * 3600
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        history = []
+        for table in ('pump_events_1h', 'pump_events_5m'):
+            cursor.execute(f'''
+                SELECT bucket_start, samples, price_open, price_high, price_low, price_close,
+                       max_change_5m, max_change_1h, max_volume_surge, max_pump_score
+                FROM {table}
+                WHERE token_address = ? AND bucket_start >= ?
+                ORDER BY bucket_start
+            ''', (token_address, int(since)))
+            history.extend(dict(row) for row in cursor.fetchall())
+        
+        cursor.execute('''
+            SELECT CAST(strftime('%s', timestamp) AS INTEGER) AS bucket_start, 1 AS samples,
+                   price AS price_open, price AS price_high, price AS price_low, price AS price_close,
+                   price_change_5m AS max_change_5m, price_change_1h AS max_change_1h,
+                   volume_surge AS max_volume_surge, pump_score AS max_pump_score
+            FROM pump_events
+            WHERE token_address = ? AND timestamp >= ?
+            ORDER BY id
+        ''', (token_address, HistoryCompactor.sql_time(since)))
+        history.extend(dict(row) for row in cursor.fetchall())
+        conn.close()
+        
+        return history
+    
+    def parse_pair(self, pair: Dict, chain: str, age_hours: float) -> Dict:
+        """Convert a DexScreener pair into token data"""
+        base_token = pair.get('baseToken', {})
+        txns_5m = pair.get('txns', {}).get('m5', {})
+        
+        return {
+            'address': pair.get('pairAddress', ''),
+            'token_address': base_token.get('address', ''),
+            'name': base_token.get('name', ''),
+            'symbol': base_token.get('symbol', ''),
+            'chain': pair.get('chainId', chain),
+            'dex': pair.get('dexId', ''),
+            'price': float(pair.get('priceUsd', 0)),
+            'liquidity': float(pair.get('liquidity', {}).get('usd', 0)),
+            'volume_24h': float(pair.get('volume', {}).get('h24', 0)),
+            'price_change_5m': float(pair.get('priceChange', {}).get('m5', 0)),
+            'price_change_1h': float(pair.get('priceChange', {}).get('h1', 0)),
+            'txns_5m': txns_5m.get('buys', 0) + txns_5m.get('sells', 0),
+            'age_hours': age_hours,
+            'created_at': pair.get('pairCreatedAt', 0) or 0,
+            'url': f"https://dexscreener.com/{pair.get('chainId', chain)}/{pair.get('pairAddress', '')}"
+        }
+    
+    def refresh_interval(self, age_hours: float) -> Optional[int]:
+        """Seconds between refreshes for a pair of this age (None = stop refreshing)"""
+        for max_age, interval in self.REFRESH_BUCKETS:
+            if age_hours < max_age:
+                return interval
+        return None
+    
+    def select_incremental_pairs(self, chain: str, pairs: List[Dict],
+                                 max_age_hours: float) -> Tuple[List[Dict], set]:
+        """
+        Pick pairs newer than the chain's high-water mark (or never seen),
+        plus already-seen young pairs that are due for a refresh
+        """
+        self.seen_ready.wait()
+        mark = self.high_water_marks.get(chain, 0)
+        now = time.time()
+        selected = []
+        new_addresses = set()
+        
+        for pair in pairs:
+            created_at = pair.get('pairCreatedAt', 0) or 0
+            if not created_at:
+                continue
+            
+            age_hours = (now * 1000 - created_at) / (1000 * 3600)
+            if age_hours >= max_age_hours:
+                continue
+            
+            address = pair.get('pairAddress', '')
+            # Feeds other than the plain search aren't ordered by creation
+            # time, so a pair older than the mark can still be unseen
+            if created_at > mark or address not in self.seen_pairs:
+                selected.append(pair)
+                new_addresses.add(address)
+                self.seen_pairs.add(address)
+                self.young_pairs[address] = {'created_at': created_at, 'last_refresh': now}
+                continue
+            
+            young = self.young_pairs.get(address)
+            if young is None:
+                continue
+            
+            interval = self.refresh_interval(age_hours)
+            if interval is not None and now - young['last_refresh'] >= interval:
+                selected.append(pair)
+                young['last_refresh'] = now
+        
+        # Forget pairs that aged out of every refresh bucket
+        for address, young in list(self.young_pairs.items()):
+            age_hours = (now * 1000 - young['created_at']) / (1000 * 3600)
+            if age_hours >= max_age_hours or self.refresh_interval(age_hours) is None:
+                del self.young_pairs[address]
+        
+        return selected, new_addresses
+    
+    def fetch_search(self, query: str) -> List[Dict]:
+        """DexScreener search results for a query"""
+        url = f"{self.dexscreener_api}/search?q={query}"
+        response = self.http.get(url, timeout=15)
+        if response.status_code != 200:
+            return []
+        return response.json().get('pairs') or []
+    
+    def fetch_token_pairs(self, token_addresses: List[str]) -> List[Dict]:
+        """Pairs for up to 30 token addresses in one call"""
+        url = f"{self.dexscreener_api}/tokens/{','.join(token_addresses)}"
+        response = self.http.get(url, timeout=15)
+        if response.status_code != 200:
+            return []
+        return response.json().get('pairs') or []
+    
+    def fetch_profile_feed(self) -> List[tuple]:
+        """Latest token profiles (new tokens across chains), fetched once per minute"""
+        fetched_at, entries = self.profile_feed
+        if time.time() - fetched_at < 60:
+            return entries
+        
+        response = self.http.get("https://api.dexscreener.com/token-profiles/latest/v1", timeout=15)
+        if response.status_code == 200:
+            data = response.json()
+            entries = [
+                (str(item.get('chainId', '')).lower(), item.get('tokenAddress', ''))
+                for item in (data if isinstance(data, list) else [])
+                if item.get('tokenAddress')
+            ]
+        self.profile_feed = (time.time(), entries)
+        return entries
+    
+    def fetch_wide(self, chain: str) -> List[Dict]:
+        """
+        Fan out several discovery queries for a chain concurrently
+        (chain search, per-DEX searches, new-profile feed) and merge by pair address
+        """
+        dexes = os.getenv(f'DISCOVERY_DEXES_{chain.upper()}', self.DISCOVERY_DEXES.get(chain, ''))
+        limit = self.memory.page_size(int(os.getenv('SCAN_PAIR_LIMIT', '0')))
+        
+        futures = [self.discovery_pool.submit(self.fetch_search, chain)]
+        futures += [
+            self.discovery_pool.submit(self.fetch_search, dex.strip())
+            for dex in dexes.split(',') if dex.strip()
+        ]
+        
+        try:
+            profile_tokens = [address for feed_chain, address in self.fetch_profile_feed() if feed_chain == chain]
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            print(f"Profile feed error: {e}")
+            profile_tokens = []
+        futures += [
+            self.discovery_pool.submit(self.fetch_token_pairs, profile_tokens[i:i + 30])
+            for i in range(0, len(profile_tokens), 30)
+        ]
+        
+        merged = {}  # {pair_address: pair}
+        queries = 0
+        for future in futures:
+            try:
+                pairs = future.result()
+            except Exception as e:
+                print(f"Discovery query error ({chain}): {e}")
+                continue
+            queries += 1
+            for pair in pairs[:limit] if limit else pairs:
+                # DEX searches and token lookups span chains; keep this chain only
+                if str(pair.get('chainId', chain)).lower() != chain:
+                    continue
+                merged.setdefault(pair.get('pairAddress', ''), pair)
+        
+        merged.pop('', None)
+        print(f"   {len(merged)} unique pairs from {queries} queries")
+        return list(merged.values())
+    
     def scan_new_launches(self, chain: str = "ethereum") -> List[Dict]:
         """
         Scan for new token launches on DEX
@@ -188,110 +4045,201 @@ class DegenCoinHunter:
         print(f"→ Scanning new launches on {chain}...")
         results = []
         
+        incremental = os.getenv('INCREMENTAL_DISCOVERY', 'false').lower() == 'true'
+        max_age_hours = float(os.getenv('MAX_COIN_AGE', '48'))
+        min_score = self.subscribers.min_score()
+        
         try:
-            # DexScreener API - new pairs
-            url = f"{self.dexscreener_api}/search?q={chain}"
-            response = requests.get(url, timeout=15)
+            if self.discovery_mode == 'wide':
+                pairs = self.fetch_wide(chain)
+            else:
+                pairs = self.fetch_search(chain)[:self.memory.page_size(20)]  # Check recent 20
             
-            if response.status_code == 200:
-                data = response.json()
-                pairs = data.get('pairs', [])
-                
-                for pair in pairs[:20]:  # Check recent 20
-                    # Check if recently launched (< 48 hours)
-                    created_at = pair.get('pairCreatedAt', 0)
-                    age_hours = (time.time() * 1000 - created_at) / (1000 * 3600) if created_at else 999
-                    
-                    if age_hours < 48:  # Less than 48 hours old
-                        token_data = {
-                            'address': pair.get('pairAddress', ''),
-                            'name': pair.get('baseToken', {}).get('name', ''),
-                            'symbol': pair.get('baseToken', {}).get('symbol', ''),
-                            'chain': pair.get('chainId', chain),
-                            'dex': pair.get('dexId', ''),
-                            'price': float(pair.get('priceUsd', 0)),
-                            'liquidity': float(pair.get('liquidity', {}).get('usd', 0)),
-                            'volume_24h': float(pair.get('volume', {}).get('h24', 0)),
-                            'price_change_5m': float(pair.get('priceChange', {}).get('m5', 0)),
-                            'price_change_1h': float(pair.get('priceChange', {}).get('h1', 0)),
-                            'txns_5m': pair.get('txns', {}).get('m5', {}).get('buys', 0) + pair.get('txns', {}).get('m5', {}).get('sells', 0),
-                            'age_hours': age_hours,
-                            'url': f"https://dexscreener.com/{chain}/{pair.get('pairAddress', '')}"
-                        }
-                        
-                        # Calculate degen score
-                        degen_score = self.calculate_degen_score(token_data)
-                        token_data['degen_score'] = degen_score
-                        
-                        # Check if pumping
-                        is_pumping = self.detect_pump(token_data)
-                        token_data['is_pumping'] = is_pumping
-                        
-                        # Only alert if score > threshold
-                        min_score = float(os.getenv('MIN_DEGEN_SCORE', '50'))
-                        if degen_score >= min_score or is_pumping:
-                            results.append(token_data)
+            new_addresses = None  # score_parsed works them out from seen_pairs
+            if incremental:
+                pairs, new_addresses = self.select_incremental_pairs(chain, pairs, max_age_hours)
+            
+            results = self.score_pairs(chain, pairs, new_addresses, max_age_hours, min_score)
                             
         except Exception as e:
             print(f"Error scanning {chain}: {e}")
         
         return results
     
+    def score_pairs(self, chain: str, pairs: List[Dict], new_addresses: Optional[set],
+                    max_age_hours: float, min_score: float) -> List[Dict]:
+        """
+        Parse, score and filter fetched pairs; record new launches and pumps
+        """
+        return self.score_parsed(chain, self.parse_pairs(chain, pairs, max_age_hours), new_addresses, min_score)
+    
+    def parse_pairs(self, chain: str, pairs: List[Dict], max_age_hours: float) -> List[Dict]:
+        """Parse recently launched pairs and give them a first (holder-less) score"""
+        scored = []
+        for pair in pairs:
+            # Check if recently launched
+            created_at = pair.get('pairCreatedAt', 0)
+            age_hours = (time.time() * 1000 - created_at) / (1000 * 3600) if created_at else 999
+            
+            if age_hours < max_age_hours:
+                token_data = self.parse_pair(pair, chain, age_hours)
+                
+                # Calculate degen score (without holders for now)
+                token_data['degen_score'] = self.calculate_degen_score(token_data)
+                scored.append(token_data)
+        return scored
+    
+    def score_parsed(self, chain: str, scored: List[Dict], new_addresses: Optional[set], min_score: float,
+                     record_all: bool = True) -> List[Dict]:
+        """
+        Enrich, detect pumps and filter parsed pairs; record new launches and pumps
+        new_addresses=None (no incremental discovery): pairs not in seen_pairs are new
+        With record_all=False (database falling behind) only alert-worthy launches are stored
+        """
+        if new_addresses is None:
+            self.seen_ready.wait()
+            with self.discovery_lock:
+                new_addresses = {token['address'] for token in scored if token['address'] not in self.seen_pairs}
+                for address in new_addresses:
+                    self.seen_pairs.add(address)
+        
+        self.token_index.update(scored)
+        self.cycle_scored.extend(scored)
+        
+        # Holder lookups only for tokens that can still reach the threshold
+        if self.holder_enricher:
+            candidates = [
+                token for token in scored
+                if token['degen_score'] + HOLDER_MAX_POINTS >= min_score
+            ]
+            self.holder_enricher.enrich(candidates)
+            for token in candidates:
+                if token.get('holders'):
+                    token['degen_score'] = self.calculate_degen_score(token)
+        
+        results = []
+        new_launches = []
+        for token_data in scored:
+            # Check if pumping, then let this observation update the baseline
+            token_data['is_pumping'] = self.detect_pump(token_data)
+            self.pump_stats.observe(token_data)
+            
+            if token_data['address'] in new_addresses:
+                new_launches.append(token_data)
+            
+            # Only keep if some subscriber's threshold is met
+            if token_data['degen_score'] >= min_score or token_data['is_pumping']:
+                results.append(token_data)
+        
+        # Contract screening of everything that may be alerted runs in the background until dispatch
+        if self.risk_screener:
+            self.risk_screener.submit(results)
+        
+        pumping = [token for token in results if token['is_pumping']]
+        self.record_pump_events(pumping)
+        self.record_top_scores(chain, scored)
+        for token in scored:
+            self.symbol_index.add(token)
+        now = time.time()
+        self.recent_pumps.extend(dict(token, detected_at=now) for token in pumping)
+        
+        if new_launches:
+            if record_all:
+                self.record_new_launches(new_launches, min_score)
+            else:
+                self.record_new_launches([token for token in new_launches
+                                          if token['degen_score'] >= min_score or token['is_pumping']], min_score)
+            mark = max(token['created_at'] for token in new_launches)
+            self.high_water_marks[chain] = max(mark, self.high_water_marks.get(chain, 0))
+            self.save_high_water_mark(chain, self.high_water_marks[chain])
+            print(f"   {len(new_launches)} new pairs, {len(scored) - len(new_launches)} refreshed")
+        
+        return results
+    
+    def get_current_price(self, address: str, chain: Optional[str] = None) -> Optional[Dict]:
+        """
+        Current price of a tracked token from its deepest-liquidity pair
+        Uses the token index when a scan already priced it recently,
+        otherwise a hedged lookup across the price sources
+        """
+        max_age = float(os.getenv('INDEX_PRICE_MAX_AGE', '60'))
+        best = self.token_index.best_pair(address, max_age=max_age)
+        if best is not None:
+            return best
+        
+        # Alternate sources need the chain: last known quote, any indexed pair or the caller's hint
+        tracking = self.tracked_tokens.get(address, {})
+        known = self.token_index.best_pair(address)
+        chain = tracking.get('chain') or (known or {}).get('chain') or chain
+        return self.price_fetcher.quote(address, chain)
+    
+    def evaluate_price(self, address: str, tracking: Dict, quote: Dict) -> Optional[Dict]:
+        """Stop loss / take profit alert for a price quote, if triggered"""
+        current_price = quote['price']
+        entry_price = tracking['entry_price']
+        stop_loss = tracking['stop_loss']
+        take_profit = tracking['take_profit']
+        
+        # Calculate profit/loss %
+        pnl_percent = ((current_price - entry_price) / entry_price) * 100
+        tracking.update(last_price=current_price, pnl_percent=pnl_percent, checked_at=time.time(),
+                        chain=quote['chain'])
+        
+        alert = {
+            'address': address,
+            'symbol': tracking['symbol'],
+            'entry_price': entry_price,
+            'current_price': current_price,
+            'pnl_percent': pnl_percent,
+            'chain': quote['chain'],
+            'url': quote['url']
+        }
+        
+        # Check stop loss
+        if current_price <= stop_loss:
+            alert.update({'type': 'STOP_LOSS', 'stop_loss': stop_loss})
+            return alert
+        
+        # Check take profit
+        if current_price >= take_profit:
+            alert.update({'type': 'TAKE_PROFIT', 'take_profit': take_profit})
+            return alert
+        
+        return None
+    
     def check_price_alerts(self) -> List[Dict]:
         """
         Check tracked tokens for stop loss / take profit triggers
+        Tokens the last scan didn't price are fetched in batches first, so a
+        check is a handful of requests rather than one per position
         """
         alerts = []
         
+        max_age = float(os.getenv('INDEX_PRICE_MAX_AGE', '60'))
+        stale = [address for address in list(self.tracked_tokens)
+                 if self.token_index.best_pair(address, max_age=max_age) is None]
+        if stale:
+            self.price_fetcher.prefetch(stale)
+        
         for address, tracking in list(self.tracked_tokens.items()):
             try:
-                # Get current price
-                url = f"{self.dexscreener_api}/tokens/{address}"
-                response = requests.get(url, timeout=10)
+                quote = self.get_current_price(address)
+                if not quote:
+                    continue
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    pairs = data.get('pairs', [])
-                    
-                    if pairs:
-                        current_price = float(pairs[0].get('priceUsd', 0))
-                        entry_price = tracking['entry_price']
-                        stop_loss = tracking['stop_loss']
-                        take_profit = tracking['take_profit']
-                        
-                        # Calculate profit/loss %
-                        pnl_percent = ((current_price - entry_price) / entry_price) * 100
-                        
-                        # Check stop loss
-                        if current_price <= stop_loss:
-                            alerts.append({
-                                'type': 'STOP_LOSS',
-                                'address': address,
-                                'symbol': tracking['symbol'],
-                                'entry_price': entry_price,
-                                'current_price': current_price,
-                                'stop_loss': stop_loss,
-                                'pnl_percent': pnl_percent,
-                                'url': f"https://dexscreener.com/ethereum/{address}"
-                            })
-                            # Remove from tracking
-                            del self.tracked_tokens[address]
-                        
-                        # Check take profit
-                        elif current_price >= take_profit:
-                            alerts.append({
-                                'type': 'TAKE_PROFIT',
-                                'address': address,
-                                'symbol': tracking['symbol'],
-                                'entry_price': entry_price,
-                                'current_price': current_price,
-                                'take_profit': take_profit,
-                                'pnl_percent': pnl_percent,
-                                'url': f"https://dexscreener.com/ethereum/{address}"
-                            })
-                            # Remove from tracking
-                            del self.tracked_tokens[address]
+                alert = self.evaluate_price(address, tracking, quote)
+                if alert:
+                    alerts.append(alert)
+                    # Remove from tracking
+                    del self.tracked_tokens[address]
+                    self.price_fetcher.forget(address)
+                    self.record_outcome(alert)
+                    self.db_writer.execute('DELETE FROM tracked_positions WHERE token_address = ?', (address,))
                             
+            except CircuitOpenError as e:
+                # Every remaining token would fail fast too - try again next cycle
+                print(f"Skipping price checks: {e}")
+                break
             except Exception as e:
                 print(f"Error checking {address}: {e}")
         
@@ -300,8 +4248,15 @@ class DegenCoinHunter:
     def add_price_alert(self, address: str, symbol: str, entry_price: float, 
                        stop_loss_percent: float = -20, take_profit_percent: float = 100):
         """
-        Add token to price tracking
+        Add token to price tracking (refused when MAX_TRACKED_TOKENS is reached
+        or memory is critical)
         """
+        max_tracked = int(os.getenv('MAX_TRACKED_TOKENS', '200'))
+        if address not in self.tracked_tokens and (
+                len(self.tracked_tokens) >= max_tracked or self.memory.level == MemoryBudget.CRITICAL):
+            print(f"✗ Not tracking {symbol}: {len(self.tracked_tokens)} positions, memory {self.memory.level}")
+            return False
+        
         stop_loss = entry_price * (1 + stop_loss_percent / 100)
         take_profit = entry_price * (1 + take_profit_percent / 100)
         
@@ -311,178 +4266,604 @@ class DegenCoinHunter:
             'stop_loss': stop_loss,
             'take_profit': take_profit
         }
+        self.db_writer.execute('''
+            INSERT OR REPLACE INTO tracked_positions
+                (token_address, token_symbol, entry_price, stop_loss, take_profit)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (address, symbol, entry_price, stop_loss, take_profit))
         
         print(f"✓ Tracking {symbol}: Entry ${entry_price:.8f}, SL ${stop_loss:.8f}, TP ${take_profit:.8f}")
+        return True
     
-    def send_telegram_alert(self, message: str):
-        """Send Telegram alert"""
-        url = f"https://api.telegram.org/bot{self.telegram_token}/sendMessage"
-        payload = {
-            'chat_id': self.telegram_chat_id,
-            'text': message,
-            'parse_mode': 'HTML',
-            'disable_web_page_preview': False
-        }
-        
-        try:
-            response = requests.post(url, json=payload, timeout=10)
-            response.raise_for_status()
-            return True
-        except Exception as e:
-            print(f"Telegram error: {e}")
-            return False
+    def send_telegram_alert(self, message: str, chat_id: Optional[str] = None):
+        """Send Telegram alert (main chat unless chat_id is given; queued during a power-saving burst)"""
+        return self.outbox.send(chat_id or self.telegram_chat_id, message)
     
-    def format_launch_alert(self, token: Dict) -> str:
-        """Format new launch alert"""
-        score = token.get('degen_score', 0)
-        is_pumping = token.get('is_pumping', False)
-        
-        # Score emoji
+    def score_badge(self, score: float) -> Tuple[str, str]:
+        """Score emoji and potential label"""
         if score >= 80:
-            score_emoji = "🚀🚀🚀"
-            potential = "VERY HIGH"
+            return "🚀🚀🚀", "VERY HIGH"
         elif score >= 60:
-            score_emoji = "🚀🚀"
-            potential = "HIGH"
+            return "🚀🚀", "HIGH"
         elif score >= 40:
-            score_emoji = "🚀"
-            potential = "MODERATE"
+            return "🚀", "MODERATE"
         else:
-            score_emoji = "⚡"
-            potential = "LOW"
-        
-        pump_status = "🔥 PUMPING NOW!" if is_pumping else ""
+            return "⚡", "LOW"
+    
+    def launch_values(self, token: Dict) -> Dict:
+        """Dynamic fields of a launch alert (rounded to display precision)"""
+        score = token.get('degen_score', 0)
+        score_emoji, potential = self.score_badge(score)
         
-        message = f"""
-💎 <b>NEW DEGEN COIN ALERT</b> {score_emoji} {pump_status}
-
-<b>Token:</b> {token.get('name', 'Unknown')} (${token.get('symbol', '???')})
-<b>Chain:</b> {token.get('chain', 'Unknown').upper()}
-<b>DEX:</b> {token.get('dex', 'Unknown').upper()}
-
-<b>🎯 DEGEN SCORE: {score:.0f}/100 ({potential} POTENTIAL)</b>
-
-<b>💰 Stats:</b>
-• Price: ${token.get('price', 0):.10f}
-• Liquidity: ${token.get('liquidity', 0):,.0f}
-• Volume 24h: ${token.get('volume_24h', 0):,.0f}
-• Age: {token.get('age_hours', 0):.1f} hours
-
-<b>📊 Price Action:</b>
-• 5m: {token.get('price_change_5m', 0):+.1f}%
-• 1h: {token.get('price_change_1h', 0):+.1f}%
-• Txns (5m): {token.get('txns_5m', 0)}
-
-<b>🔗 Trade:</b>
-{token.get('url', 'Not available')}
-
-<b>⚠️ DEGEN WARNING:</b>
-✅ Check contract on scanner
-✅ Verify liquidity locked
-✅ Check holder distribution
-✅ Use SMALL position size
-✅ Set stop loss -20%
-✅ Never invest more than you can lose
-
-<i>This is extremely high risk. Most degen coins go to zero.</i>
-"""
-        return message.strip()
+        return {
+            'score_emoji': score_emoji,
+            'pump_status': "🔥 PUMPING NOW!" if token.get('is_pumping', False) else "",
+            'name': token.get('name', 'Unknown'),
+            'symbol': token.get('symbol', '???'),
+            'chain': token.get('chain', 'Unknown').upper(),
+            'dex': token.get('dex', 'Unknown').upper() + (
+                f" (+{token['other_listings']} more)" if token.get('other_listings') else ""
+            ),
+            'score': round(score),
+            'potential': potential,
+            'price': token.get('price', 0),
+            'liquidity': round(token.get('liquidity', 0)),
+            'volume_24h': round(token.get('volume_24h', 0)),
+            'age_hours': round(token.get('age_hours', 0), 1),
+            'price_change_5m': round(token.get('price_change_5m', 0), 1),
+            'price_change_1h': round(token.get('price_change_1h', 0), 1),
+            'txns_5m': token.get('txns_5m', 0),
+            'url': token.get('url', 'Not available'),
+            'contract_check': self.format_contract_check(token),
+            'risk_badge': RISK_BADGES[token['risk']['verdict']] + " " if token.get('risk') else "",
+        }
+    
+    def format_contract_check(self, token: Dict) -> str:
+        """Contract screen block of a launch alert ('' when screening is off or impossible)"""
+        if not self.risk_screener or not token.get('token_address'):
+            return ""
+        risk = token.get('risk')
+        if not risk:
+            return "<b>🛡️ Contract Screen:</b> ⏳ pending\n\n"
+        lines = [f"<b>🛡️ Contract Screen: {RISK_BADGES[risk['verdict']]} {risk['verdict'].upper()}</b>"]
+        for name, result in risk['checks'].items():
+            lines.append(f"• {RISK_STATUS_EMOJI.get(result['status'], '❔')} {name.title()}: {result['detail']}")
+        return "\n".join(lines) + "\n\n"
+    
+    def format_launch_alert(self, token: Dict) -> str:
+        """Format new launch alert"""
+        return self.render_cache.render('launch', LAUNCH_TEMPLATE, self.launch_values(token))
     
     def format_pump_alert(self, token: Dict) -> str:
         """Format pump detection alert"""
-        message = f"""
-🔥🔥🔥 <b>PUMP DETECTED!</b> 🔥🔥🔥
-
-<b>Token:</b> ${token.get('symbol', '???')}
-<b>Chain:</b> {token.get('chain', 'Unknown').upper()}
-
-<b>📈 PUMP METRICS:</b>
-• 5m: <b>{token.get('price_change_5m', 0):+.1f}%</b>
-• 1h: <b>{token.get('price_change_1h', 0):+.1f}%</b>
-• Volume Surge: <b>{token.get('volume_surge', 1):.1f}x</b>
-
-<b>💰 Current Price:</b> ${token.get('price', 0):.10f}
-
-<b>🔗 Trade:</b>
-{token.get('url', 'Not available')}
-
-<b>⚠️ PUMP WARNING:</b>
-• Pumps can dump INSTANTLY
-• Take profits on the way up
-• Don't FOMO at peak
-• Use stop loss
-• High risk of rug pull
-"""
-        return message.strip()
+        values = {
+            'symbol': token.get('symbol', '???'),
+            'chain': token.get('chain', 'Unknown').upper(),
+            'price_change_5m': round(token.get('price_change_5m', 0), 1),
+            'price_change_1h': round(token.get('price_change_1h', 0), 1),
+            'volume_surge': round(token.get('volume_surge', 1), 1),
+            'price': token.get('price', 0),
+            'url': token.get('url', 'Not available'),
+        }
+        return self.render_cache.render('pump', PUMP_TEMPLATE, values)
     
     def format_price_alert(self, alert: Dict) -> str:
         """Format stop loss / take profit alert"""
-        alert_type = alert['type']
-        pnl = alert['pnl_percent']
+        is_stop_loss = alert['type'] == 'STOP_LOSS'
         
-        if alert_type == 'STOP_LOSS':
-            emoji = "🛑"
-            title = "STOP LOSS TRIGGERED"
-            color = "RED"
-        else:
-            emoji = "✅"
-            title = "TAKE PROFIT TRIGGERED"
-            color = "GREEN"
+        values = {
+            'emoji': "🛑" if is_stop_loss else "✅",
+            'title': "STOP LOSS TRIGGERED" if is_stop_loss else "TAKE PROFIT TRIGGERED",
+            'symbol': alert['symbol'],
+            'entry_price': alert['entry_price'],
+            'current_price': alert['current_price'],
+            'target': alert.get('stop_loss' if is_stop_loss else 'take_profit', 0),
+            'pnl': round(alert['pnl_percent'], 2),
+            'url': alert.get('url', ''),
+            'advice': '🛑 Consider selling to limit losses' if is_stop_loss else '✅ Consider taking profits',
+        }
+        return self.render_cache.render('price', PRICE_TEMPLATE, values)
+    
+    def format_position_dashboard(self, tracking: Dict, status: str = "🟢 LIVE") -> str:
+        """Format the live dashboard message for a tracked position"""
+        return POSITION_TEMPLATE.render({
+            'symbol': tracking['symbol'],
+            'status': status,
+            'entry_price': tracking['entry_price'],
+            'current_price': tracking.get('last_price', tracking['entry_price']),
+            'stop_loss': tracking['stop_loss'],
+            'take_profit': tracking['take_profit'],
+            'pnl': round(tracking.get('pnl_percent', 0), 2),
+            'updated': datetime.fromtimestamp(tracking.get('checked_at', time.time())).strftime('%H:%M:%S'),
+        })
+    
+    def format_launch_digest(self, tokens: List[Dict]) -> List[str]:
+        """
+        Render many launches as compact digest messages
+        The risk warning is included once per message instead of per token
+        """
+        lines = [DIGEST_LINE_TEMPLATE.render(self.launch_values(token)) for token in tokens]
+        footer = "\n\n" + DEGEN_WARNING
         
-        message = f"""
-{emoji} <b>{title}</b> {emoji}
-
-<b>Token:</b> ${alert['symbol']}
-
-<b>📊 Trade Summary:</b>
-• Entry: ${alert['entry_price']:.10f}
-• Current: ${alert['current_price']:.10f}
-• Target: ${alert.get('stop_loss' if alert_type == 'STOP_LOSS' else 'take_profit', 0):.10f}
-
-<b>💰 P/L: {pnl:+.2f}%</b>
-
-<b>🔗 Trade:</b>
-{alert.get('url', '')}
-
-<b>{'🛑 Consider selling to limit losses' if alert_type == 'STOP_LOSS' else '✅ Consider taking profits'}</b>
-"""
-        return message.strip()
+        messages = []
+        chunk = []
+        size = len(footer) + 64  # header allowance
+        for line in lines:
+            if chunk and size + len(line) + 2 > DIGEST_MAX_CHARS:
+                messages.append(chunk)
+                chunk = []
+                size = len(footer) + 64
+            chunk.append(line)
+            size += len(line) + 2
+        if chunk:
+            messages.append(chunk)
+        
+        return [
+            DIGEST_HEADER_TEMPLATE.render({'count': len(chunk)}) + "\n\n" + "\n\n".join(chunk) + footer
+            for chunk in messages
+        ]
+    
+    def run_price_checks(self, worker: str = 'scan') -> List[Dict]:
+        """Check SL/TP for tracked tokens and send any alerts"""
+        self.heartbeat("prices", worker=worker)
+        positions = dict(self.tracked_tokens)
+        with self.outbox.burst():
+            price_alerts = self.check_price_alerts()
+            for alert in price_alerts:
+                message = self.format_price_alert(alert)
+                self.send_telegram_alert(message)
+                if self.live_messages:
+                    status = "🛑 STOPPED OUT" if alert['type'] == 'STOP_LOSS' else "✅ TAKE PROFIT HIT"
+                    self.board.close((alert['address'], self.telegram_chat_id, 'position'),
+                                     self.format_position_dashboard(positions[alert['address']], status))
+            if self.live_messages:
+                self.update_position_dashboards()
+        self.publish_positions()
+        return price_alerts
+    
+    def update_position_dashboards(self):
+        """Edit (or create and pin) one dashboard message per priced position"""
+        for address, tracking in list(self.tracked_tokens.items()):
+            if 'last_price' not in tracking:
+                continue
+            key = (address, self.telegram_chat_id, 'position')
+            text = self.format_position_dashboard(tracking)
+            if not self.board.update(key, text):
+                self.board.post(key, text, pin=self.pin_positions)
+    
+    def send_live_launch(self, launch: Dict, chat_id: str, message: str) -> int:
+        """
+        Edit the chat's existing messages for a token instead of re-sending them;
+        only a first sighting or a pump start goes out as a new message (a token
+        first seen mid-pump gets both, launch alert first).
+        Returns the number of new messages sent
+        """
+        token = launch.get('token_address') or launch['address']
+        launch_key = (token, chat_id, 'launch')
+        sent = 0
+        if not self.board.update(launch_key, message):
+            sent += self.board.post(launch_key, message)
+        
+        if launch.get('is_pumping'):
+            pump_key = (token, chat_id, 'pump')
+            pump_message = self.format_pump_alert(launch)
+            if not self.board.update(pump_key, pump_message):
+                sent += self.board.post(pump_key, pump_message)
+        return sent
+    
+    def close_finished_pumps(self):
+        """Mark pump messages as ended once their token is rescanned and no longer pumping"""
+        latest = {}  # {token: scored pair, a pumping one if any}
+        for token in self.cycle_scored:
+            key = token.get('token_address') or token['address']
+            if key not in latest or token.get('is_pumping'):
+                latest[key] = token
+        for key in self.board.keys('pump'):
+            token = latest.get(key[0])
+            if token is not None and not token.get('is_pumping'):
+                self.board.close(key, self.format_pump_alert(token) + "\n⏹ <i>Pump ended</i>")
+        self.board.prune(kinds=('launch', 'pump'))
+    
+    def dispatch_launches(self, launches: List[Dict]) -> Tuple[int, Dict]:
+        """
+        Fan out launches (in order) to every matching subscriber,
+        as one digest per chat at high volume
+        """
+        if self.risk_screener:
+            self.risk_screener.collect(launches)
+        routes = [(launch, self.subscribers.route(launch)) for launch in launches]
+        routed = {}  # {chat_id: [launch, ...]}
+        for launch, chat_ids in routes:
+            for chat_id in chat_ids:
+                routed.setdefault(chat_id, []).append(launch)
+        
+        new_alerts = 0
+        digest_min = int(os.getenv('DIGEST_MIN_ALERTS', '0'))
+        digest_chats = {
+            chat_id for chat_id, chat_launches in routed.items()
+            if digest_min and len(chat_launches) >= digest_min
+        }
+        for chat_id in digest_chats:
+            for message in self.format_launch_digest(routed[chat_id]):
+                self.send_telegram_alert(message, chat_id)
+            new_alerts += len(routed[chat_id])
+        
+        # Interleave chats so per-chat pacing doesn't serialize the whole fan-out
+        for launch, chat_ids in routes:
+            new_alerts += self.deliver_launch(launch, [chat_id for chat_id in chat_ids if chat_id not in digest_chats])
+        
+        return new_alerts, routed
+    
+    def deliver_launch(self, launch: Dict, chat_ids: List[str]) -> int:
+        """Send (or live-update) one launch alert to each chat; returns new messages sent"""
+        if not chat_ids or self.stopped:
+            return 0
+        message = self.format_launch_alert(launch)
+        sent = 0
+        for chat_id in chat_ids:
+            if self.live_messages:
+                sent += self.send_live_launch(launch, chat_id, message)
+            elif self.send_telegram_alert(message, chat_id):
+                sent += 1
+        return sent
+    
+    def run_pipeline(self, chains: List[str], top_k: TopKSelector) -> Tuple[int, Dict]:
+        """
+        Scan as a staged pipeline: fetch -> parse -> score -> filter -> dispatch
+        (contract screening runs on its own pool between score and dispatch)
+        Stages run on their own workers joined by bounded queues, so alerts for
+        the first chain go out while later chains are still downloading. A full
+        dispatch queue sheds its lowest-ranked launch (into the summary line);
+        a database backlog stops low-score launches from being stored
+        """
+        incremental = os.getenv('INCREMENTAL_DISCOVERY', 'false').lower() == 'true'
+        max_age_hours = float(os.getenv('MAX_COIN_AGE', '48'))
+        min_score = self.subscribers.min_score()
+        queue_size = int(os.getenv('PIPELINE_QUEUE_SIZE', '50'))
+        db_backlog = int(os.getenv('PIPELINE_DB_BACKLOG', '5000'))
+        
+        lock = threading.Lock()
+        routed = {}  # {chat_id: [launch, ...]}
+        counters = {'sent': 0, 'db_shed': 0}
+        
+        def fetch(chain: str):
+            print(f"→ Scanning new launches on {chain}...")
+            try:
+                pairs = (self.fetch_wide(chain) if self.discovery_mode == 'wide'
+                         else self.fetch_search(chain)[:self.memory.page_size(20)])
+            except Exception as e:
+                print(f"Error scanning {chain}: {e}")
+                return []
+            new_addresses = None
+            if incremental:
+                with self.discovery_lock:
+                    pairs, new_addresses = self.select_incremental_pairs(chain, pairs, max_age_hours)
+            return [(chain, pairs, new_addresses)]
+        
+        def parse(batch: tuple):
+            chain, pairs, new_addresses = batch
+            return [(chain, self.parse_pairs(chain, pairs, max_age_hours), new_addresses)]
+        
+        def score(batch: tuple):
+            chain, scored, new_addresses = batch
+            record_all = self.db_writer.queue.qsize() < db_backlog
+            if not record_all:
+                with lock:
+                    counters['db_shed'] += 1
+            return self.score_parsed(chain, scored, new_addresses, min_score, record_all=record_all)
+        
+        def admit(launch: Dict):
+            # Single worker: it owns top_k (on_shed also runs on this thread)
+            return [launch] if top_k.push(launch) and top_k.claim(launch) else []
+        
+        def dispatch(launch: Dict):
+            if self.risk_screener:
+                self.risk_screener.collect([launch])
+            chat_ids = self.subscribers.route(launch)
+            with lock:
+                for chat_id in chat_ids:
+                    routed.setdefault(chat_id, []).append(launch)
+            sent = self.deliver_launch(launch, chat_ids)
+            with lock:
+                counters['sent'] += sent
+        
+        stages = [
+            PipelineStage('fetch', fetch, workers=int(os.getenv('PIPELINE_FETCH_WORKERS', '3')),
+                          maxsize=max(1, len(chains))),
+            PipelineStage('parse', parse, workers=1, maxsize=queue_size),
+            PipelineStage('score', score, workers=int(os.getenv('PIPELINE_SCORE_WORKERS', '2')),
+                          maxsize=queue_size),
+            PipelineStage('filter', admit, workers=1, maxsize=queue_size),
+            PipelineStage('dispatch', dispatch, workers=int(os.getenv('PIPELINE_DISPATCH_WORKERS', '2')),
+                          maxsize=queue_size, shed=True, priority=TopKSelector.rank_key, on_shed=top_k.shed),
+        ]
+        for stage, next_stage in zip(stages, stages[1:]):
+            stage.next = next_stage
+        for stage in stages:
+            stage.start()
+        
+        for chain in chains:
+            stages[0].inbox.put(chain)
+        stages[0].inbox.close()
+        for stage in stages:
+            stage.join()
+        top_k.settle()
+        
+        self.pipeline_stats = {stage.name: stage.snapshot() for stage in stages}
+        self.pipeline_stats['db_shed_batches'] = counters['db_shed']
+        return counters['sent'], routed
+    
+    def run_monitoring_cycle(self, check_prices: bool = True):
+        """Run one monitoring cycle (SL/TP checks can run on their own schedule)"""
+        # In power-saving mode the cycle's alerts go out together at its end
+        with self.outbox.burst():
+            self.monitoring_cycle(check_prices)
     
-    def run_monitoring_cycle(self):
-        """Run one monitoring cycle"""
+    def monitoring_cycle(self, check_prices: bool):
+        """Scan, dispatch and (optionally) check prices"""
         print(f"\n{'='*70}")
         print(f"💎 DEGEN COIN HUNTER - Cycle Started")
         print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"{'='*70}")
         
-        # Scan chains
+        # Scan chains (fewer when close to the memory budget)
         chains = os.getenv('DEGEN_CHAINS', 'ethereum,bsc,polygon').split(',')
+        if self.memory.enforce() != MemoryBudget.OK:
+            chains = self.memory.shed_chains(chains)
+            print(f"🧠 Memory {self.memory.level}: scanning {', '.join(chains)} only")
         
-        all_launches = []
-        for chain in chains:
-            launches = self.scan_new_launches(chain.strip())
-            all_launches.extend(launches)
+        if self.holder_enricher:
+            self.holder_enricher.start_cycle()
+        if self.risk_screener:
+            self.risk_screener.start_cycle()
+        self.cycle_scored = []
         
-        # Send alerts for new launches
-        new_alerts = 0
-        for launch in all_launches:
-            message = self.format_launch_alert(launch)
-            if self.send_telegram_alert(message):
-                new_alerts += 1
-                time.sleep(2)
+        # Keep only the best K across all chains as results stream in
+        top_k = TopKSelector(int(os.getenv('TOP_K_ALERTS', '10')), route=self.subscribers.route)
+        if self.pipeline_mode:
+            # Streaming: a launch is alerted as soon as it ranks in the best K seen so far
+            # (at most K per cycle)
+            self.heartbeat("pipeline", budget=self.stage_budget * (len(chains) + 2))
+            new_alerts, routed = self.run_pipeline([chain.strip() for chain in chains], top_k)
+            self.token_index.prune()
+            self.save_pump_stats()
+        else:
+            for chain in chains:
+                self.heartbeat(f"scan:{chain.strip()}")
+                top_k.extend(self.scan_new_launches(chain.strip()))
+            
+            self.token_index.prune()
+            self.save_pump_stats()
+            
+            self.heartbeat("dispatch", budget=self.stage_budget * 2)
+            new_alerts, routed = self.dispatch_launches(top_k.ranked())
+        if self.live_messages:
+            self.close_finished_pumps()
+        
+        # Everything below the cut gets one line per chat
+        for chat_id in top_k.dropped_per_chat:
+            self.send_telegram_alert(top_k.summary(chat_id), chat_id)
         
         # Check price alerts
-        price_alerts = self.check_price_alerts()
-        for alert in price_alerts:
-            message = self.format_price_alert(alert)
-            self.send_telegram_alert(message)
-            time.sleep(1)
+        price_alerts = self.run_price_checks() if check_prices else []
         
         print(f"\n📊 Cycle Summary:")
-        print(f"   New launches found: {len(all_launches)}")
-        print(f"   Alerts sent: {new_alerts}")
+        alerted = len(top_k.dispatched) if self.pipeline_mode else len(top_k.heap)
+        print(f"   New launches found: {top_k.total} ({alerted} alerted, {top_k.dropped} summarized)")
+        print(f"   Alerts sent: {new_alerts} ({len(routed)} chats)")
+        if self.live_messages:
+            print(f"   Live messages: {self.board.stats['edited']} edited, {self.board.stats['throttled']} throttled")
         print(f"   Price alerts: {len(price_alerts)}")
         print(f"{'='*70}\n")
+        
+        self.cycle_count += 1
+        self.publish_snapshots()
+        self.memory.enforce()
+        self.write_status()
+        self.save_state_snapshot()
+    
+    def publish_positions(self):
+        """Publish tracked positions for the local API"""
+        self.snapshots.publish('positions', {
+            'updated_at': time.time(),
+            'positions': {address: dict(tracking) for address, tracking in list(self.tracked_tokens.items())},
+        })
+    
+    def publish_snapshots(self):
+        """Publish this cycle's results for the local API"""
+        now = time.time()
+        self.snapshots.publish('tokens', {
+            'cycle': self.cycle_count,
+            'updated_at': now,
+            'tokens': sorted(self.cycle_scored, key=lambda token: -token.get('degen_score', 0)),
+        })
+        self.snapshots.publish('pumps', {'updated_at': now, 'pumps': list(self.recent_pumps)})
+        self.snapshots.publish('status', self.status_snapshot())
+        self.publish_positions()
+    
+    def heartbeat(self, stage: str, budget: Optional[float] = None, worker: str = 'scan'):
+        """
+        Record that a worker entered a stage and how long it may take;
+        the watchdog treats a stage still current after its deadline as stalled
+        A stopped (replaced) hunter's worker gets HunterStopped here instead
+        """
+        if self.stopped:
+            raise HunterStopped(f"{worker} of a replaced hunter reached {stage}")
+        now = time.time()
+        self.heartbeats[worker] = {
+            'stage': stage,
+            'ts': now,
+            'deadline': now + (budget if budget is not None else self.stage_budget),
+            'thread': threading.get_ident(),
+        }
+        try:
+            tmp_path = f"{self.heartbeat_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'pid': os.getpid(), 'workers': dict(self.heartbeats)}, f)
+            os.replace(tmp_path, self.heartbeat_path)
+        except Exception as e:
+            print(f"Heartbeat write error: {e}")
+    
+    def handle_control(self, request: Dict) -> Dict:
+        """Serve a request from the control bot (in-process or via signal)"""
+        kind = request.get('kind')
+        seconds = max(1.0, min(float(request.get('seconds', 10)), 60.0))
+        
+        if kind == 'profile':
+            os.makedirs(control_dir(), exist_ok=True)
+            folded_path = os.path.join(control_dir(), f"profile-{int(time.time())}.folded")
+            return sample_cpu_profile(seconds, folded_path)
+        
+        if kind == 'memtop':
+            return memory_top(seconds)
+        
+        if kind == 'find':
+            return {'matches': self.symbol_index.find(request.get('query', ''), int(request.get('limit', 10)))}
+        
+        if kind == 'track':
+            return self.track_token(
+                request.get('query', ''),
+                float(request.get('stop_loss', os.getenv('DEFAULT_STOP_LOSS', '-20'))),
+                float(request.get('take_profit', os.getenv('DEFAULT_TAKE_PROFIT', '100'))),
+            )
+        
+        return {'error': f"unknown request {kind}"}
+    
+    def track_token(self, query: str, stop_loss_percent: float, take_profit_percent: float) -> Dict:
+        """
+        Start tracking a token by symbol/name prefix (resolved locally, best match
+        by liquidity and score) or by address, at its current price
+        """
+        if len(query) >= 32:
+            quote = self.get_current_price(query)
+            if not quote:
+                return {'error': f"No price found for {query}"}
+            match = {'token_address': query, 'symbol': quote.get('symbol', '') or query[:8],
+                     'chain': quote['chain'], 'price': quote['price'], 'url': quote['url']}
+            alternatives = []
+        else:
+            matches = [match for match in self.symbol_index.find(query, 6) if match['token_address']]
+            if not matches:
+                return {'error': f"No scanned token matches {query}"}
+            match, alternatives = matches[0], matches[1:]
+            # The indexed price can be the launch price from weeks ago: always quote now
+            quote = self.get_current_price(match['token_address'], match['chain'])
+            if not quote:
+                return {'error': f"No current price for {match['symbol']}, not tracking"}
+            match = dict(match, price=quote['price'])
+        
+        if match['price'] <= 0:
+            return {'error': f"No price for {match['symbol']} yet"}
+        if not self.add_price_alert(match['token_address'], match['symbol'], match['price'],
+                                    stop_loss_percent, take_profit_percent):
+            return {'error': "Tracking limit reached"}
+        
+        self.tracked_tokens[match['token_address']]['chain'] = match['chain']
+        self.publish_positions()
+        return {
+            'tracked': dict(match, stop_loss_percent=stop_loss_percent, take_profit_percent=take_profit_percent),
+            'alternatives': alternatives,
+        }
+    
+    def status_snapshot(self) -> Dict:
+        """Runtime state shared with the control bot"""
+        return {
+            'updated_at': time.time(),
+            'pid': os.getpid(),
+            'cycle': self.cycle_count,
+            'tracked_tokens': len(self.tracked_tokens),
+            'health': self.http.health(),
+            'prices': self.price_fetcher.snapshot(),
+            'live_messages': self.board.snapshot(),
+            'pipeline': self.pipeline_stats,
+            'memory': self.memory.snapshot() if self.memory.enabled else None,
+            'power': dict(self.power.snapshot(), power_save=self.power_save, grouped=dict(self.outbox.stats)),
+            'risk': self.risk_screener.snapshot() if self.risk_screener else None,
+        }
+    
+    def write_status(self):
+        """Write status file for the control bot's /status (atomic replace)"""
+        try:
+            tmp_path = f"{self.status_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.status_snapshot(), f)
+            os.replace(tmp_path, self.status_path)
+        except Exception as e:
+            print(f"Status write error: {e}")
+    
+    def finish_startup(self):
+        """
+        Setup the first scan doesn't need: the symbol index rebuild and the
+        background jobs. Runs once, after the first cycle, so a (re)started
+        hunter is scanning as early as possible
+        """
+        if self.startup_finished:
+            return
+        self.startup_finished = True
+        self.load_symbol_index()
+        self.start_background()
+    
+    def start_background(self):
+        """Start background jobs (history compaction, local API) and publish initial status"""
+        if self.compactor is None:
+            self.compactor = HistoryCompactor(self.db_path)
+            self.compactor.start()
+        
+        api_port = int(os.getenv('API_PORT', '0'))
+        if api_port and self.api_server is None:
+            try:
+                self.api_server = start_local_api(self.snapshots, api_port)
+            except OSError as e:
+                print(f"Local API disabled: {e}")
+        
+        self.publish_positions()
+        self.write_status()
+    
+    def adopt_background(self, previous: 'DegenCoinHunter'):
+        """Retire a replaced hunter and take over its background jobs and API snapshots"""
+        # Its stuck worker may still wake up: stop it at its next stage before sharing state
+        previous.stopped = True
+        self.compactor = previous.compactor
+        self.api_server = previous.api_server
+        self.snapshots = previous.snapshots
+        self.recent_pumps = previous.recent_pumps
+        self.seen_pairs = previous.seen_pairs
+        self.seen_ready = previous.seen_ready
+        # Its worker pools would otherwise pile up with every restart
+        previous.discovery_pool.shutdown(wait=False, cancel_futures=True)
+        previous.price_fetcher.executor.shutdown(wait=False, cancel_futures=True)
+        if previous.holder_enricher:
+            previous.holder_enricher.executor.shutdown(wait=False, cancel_futures=True)
+        if previous.risk_screener:
+            previous.risk_screener.executor.shutdown(wait=False, cancel_futures=True)
+    
+    def announce_start(self, interval_minutes: int):
+        """Send startup message"""
+        self.send_telegram_alert(
+            "💎 <b>Degen Coin Hunter Started!</b>\n\n"
+            f"✓ Monitoring every {interval_minutes} minutes\n"
+            "✓ Scanning: New launches & pumps\n"
+            "✓ Tracking: Price alerts (SL/TP)\n\n"
+            "⚠️ <b>HIGH RISK WARNING:</b>\n"
+            "Degen coins are EXTREMELY risky!\n"
+            "Only use money you can afford to lose!\n\n"
+            "Stay safe and DYOR! 💎"
+        )
+    
+    def shutdown(self):
+        """Stop background jobs and flush pending writes"""
+        if self.compactor:
+            self.compactor.stop()
+        if self.api_server:
+            self.api_server.shutdown()
+        self.discovery_pool.shutdown(wait=False)
+        self.price_fetcher.executor.shutdown(wait=False)
+        if self.risk_screener:
+            self.risk_screener.executor.shutdown(wait=False)
+        self.outbox.flush()
+        self.save_state_snapshot(force=True)
+        self.save_pump_stats()
+        self.db_writer.flush()
     
     def run_continuous(self, interval_minutes: int = 5):
         """Run continuous monitoring"""
@@ -497,29 +4878,35 @@ class DegenCoinHunter:
 ╚══════════════════════════════════════════════════════════════════╝
 """)
         
-        self.send_telegram_alert(
-            "💎 <b>Degen Coin Hunter Started!</b>\n\n"
-            f"✓ Monitoring every {interval_minutes} minutes\n"
-            "✓ Scanning: New launches & pumps\n"
-            "✓ Tracking: Price alerts (SL/TP)\n\n"
-            "⚠️ <b>HIGH RISK WARNING:</b>\n"
-            "Degen coins are EXTREMELY risky!\n"
-            "Only use money you can afford to lose!\n\n"
-            "Stay safe and DYOR! 💎"
-        )
+        # Scan first: the startup message round trip runs alongside it (as in unified_bot)
+        threading.Thread(target=self.announce_start, args=(interval_minutes,),
+                         daemon=True, name="announce").start()
         
         while True:
             try:
                 self.run_monitoring_cycle()
-                print(f"💤 Sleeping {interval_minutes} minutes...\n")
-                time.sleep(interval_minutes * 60)
+                self.finish_startup()
+                # Power-saving mode wakes on the interval grid instead of N minutes after the cycle ended
+                delay = aligned_delay(interval_minutes * 60) if self.power_save else interval_minutes * 60
+                print(f"💤 Sleeping {delay / 60:.1f} minutes...\n")
+                self.heartbeat("sleep", budget=delay + self.stage_budget)
+                time.sleep(delay)
+                self.power.wakeup('scan')
                 
             except KeyboardInterrupt:
                 print("\n\n🛑 Hunter stopped")
                 self.send_telegram_alert("🛑 <b>Degen Coin Hunter Stopped</b>")
+                self.shutdown()
                 break
+            except SystemExit:
+                # SIGTERM from the control bot's /stop or /restart
+                print("\n\n🛑 Hunter terminated")
+                self.shutdown()
+                raise
             except Exception as e:
                 print(f"❌ Error: {e}")
+                self.finish_startup()
+                self.write_status()
                 time.sleep(60)
 
 
@@ -536,6 +4923,9 @@ def main():
         return
     
     hunter = DegenCoinHunter(telegram_token, telegram_chat_id)
+    install_control_handler(hunter)
+    # Exit through run_continuous so shutdown() flushes writes and the state snapshot
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     interval = int(os.getenv('CHECK_INTERVAL', '5'))
     hunter.run_continuous(interval_minutes=interval)
 
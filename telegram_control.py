@@ -8,15 +8,141 @@ Start/Stop monitoring, Check status, Configure settings
 import os
 import sys
 import time
-import subprocess
-import psutil
-from datetime import datetime
-from dotenv import load_dotenv
+import json
+import html
+import signal
+import threading
+from datetime import datetime, timezone
+
+# psutil, subprocess, sqlite3 and dotenv are imported where they are used:
+# unified_bot.py imports this module, and every import here delays a restart
+
+
+class RestartBackoff:
+    """Exponential restart delay that resets after a quiet period"""
+    
+    def __init__(self, base: float = 5, maximum: float = 300, reset_after: float = 600):
+        self.base = base
+        self.maximum = maximum
+        self.reset_after = reset_after
+        self.failures = 0
+        self.last_restart = 0.0
+    
+    def next_delay(self) -> float:
+        if self.last_restart and time.time() - self.last_restart > self.reset_after:
+            self.failures = 0
+        delay = min(self.base * (2 ** self.failures), self.maximum)
+        self.failures += 1
+        self.last_restart = time.time()
+        return delay
+
+
+def extract_thread_stack(dump: str, thread_ident: int) -> str:
+    """Pick one thread's section out of a faulthandler all-threads dump"""
+    marker = f"0x{thread_ident:016x}"
+    sections = dump.split("\n\n")
+    for section in sections:
+        if marker in section:
+            return section.strip()
+    return dump.strip()
+
+
+class Watchdog(threading.Thread):
+    """
+    Watches the hunter's heartbeat file. When a stage overruns its deadline
+    (or the process died), dumps the stuck thread's stack and restarts the
+    hunter with exponential backoff; tracked positions are reloaded from the DB
+    """
+    
+    def __init__(self, bot):
+        super().__init__(daemon=True, name="watchdog")
+        self.bot = bot
+        self.heartbeat_path = os.getenv('HUNTER_HEARTBEAT_FILE', 'hunter_heartbeat.json')
+        self.dump_path = os.getenv('HUNTER_STACK_DUMP_FILE', 'hunter_stacks.txt')
+        self.check_seconds = float(os.getenv('WATCHDOG_CHECK_SECONDS', '15'))
+        self.backoff = RestartBackoff()
+        self.restarts = 0
+    
+    def read_heartbeat(self):
+        try:
+            with open(self.heartbeat_path) as f:
+                return json.load(f)
+        except:
+            return None
+    
+    def find_stall(self, pid):
+        """(worker, heartbeat) of a stalled stage, or None"""
+        heartbeat = self.read_heartbeat()
+        if not heartbeat or heartbeat.get('pid') != pid:
+            return None
+        now = time.time()
+        for worker, beat in heartbeat.get('workers', {}).items():
+            if now > beat.get('deadline', now):
+                return worker, beat
+        return None
+    
+    def dump_stack(self, pid, thread_ident):
+        """Ask the hunter to dump all stacks (SIGUSR2) and return the stuck thread's"""
+        if not hasattr(signal, 'SIGUSR2'):
+            return ""
+        try:
+            offset = os.path.getsize(self.dump_path) if os.path.exists(self.dump_path) else 0
+            os.kill(pid, signal.SIGUSR2)
+            time.sleep(1)
+            with open(self.dump_path) as f:
+                f.seek(offset)
+                return extract_thread_stack(f.read(), thread_ident)
+        except Exception as e:
+            return f"(stack dump failed: {e})"
+    
+    def recover(self, reason, stack=""):
+        delay = self.backoff.next_delay()
+        self.restarts += 1
+        
+        text = f"🐕 <b>Watchdog:</b> {reason}\n♻️ Restarting in {delay:.0f}s (restart #{self.restarts})"
+        if stack:
+            text += f"\n\n<pre>{html.escape(stack[-3000:])}</pre>"
+        self.bot.send_message(text)
+        print(f"🐕 Watchdog: {reason}")
+        
+        mode = self.bot.expected_mode
+        self.bot.stop_bot(manual=False)
+        time.sleep(delay)
+        if self.bot.expected_mode == mode:  # nobody stopped it meanwhile
+            self.bot.send_message(self.bot.start_bot(mode))
+    
+    def check(self):
+        mode = self.bot.expected_mode
+        if not mode:
+            return
+        
+        running, pid = self.bot.is_bot_running()
+        if not running:
+            self.recover("hunter process exited unexpectedly")
+            return
+        
+        stall = self.find_stall(pid)
+        if stall:
+            worker, beat = stall
+            overdue = time.time() - beat['deadline']
+            stack = self.dump_stack(pid, beat.get('thread', 0))
+            self.recover(f"{worker} stalled in stage {beat['stage']} ({overdue:.0f}s past deadline)", stack)
+    
+    def run(self):
+        while True:
+            if self.bot.power_save:
+                # Wake on the same wall-clock grid as the hunter's timers
+                time.sleep(self.check_seconds - time.time() % self.check_seconds)
+            else:
+                time.sleep(self.check_seconds)
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Watchdog error: {e}")
 
-load_dotenv()
 
 class TelegramControlBot:
-    def __init__(self):
+    def __init__(self, runtime=None, session=None, transport=None):
         self.token = os.getenv('TELEGRAM_BOT_TOKEN', '')
         self.chat_id = os.getenv('TELEGRAM_CHAT_ID', '')
         
@@ -24,13 +150,29 @@ class TelegramControlBot:
             print("❌ Missing Telegram credentials!")
             sys.exit(1)
         
+        # Set when hosted inside unified_bot.py: commands drive the in-process
+        # hunter and share its HTTP pool and Telegram sender
+        self.runtime = runtime
+        self.session = session
+        self.transport = transport
+        
         self.bot_process = None
+        self.expected_mode = None  # mode the watchdog should keep alive
         self.last_update_id = 0
+        # Power-saving mode: longer long-polls, timers aligned with the hunter's
+        self.power_save = os.getenv('POWER_SAVE', 'false').lower() == 'true'
+        self.poll_seconds = 50 if self.power_save else 30
+        self.status_path = os.getenv('HUNTER_STATUS_FILE', 'hunter_status.json')
+        self.control_dir = os.getenv('HUNTER_CONTROL_DIR', 'hunter_ctl')
+        self.db_path = runtime.db_writer.db_path if runtime else 'degen_tracker.db'
         
     def send_message(self, text: str, parse_mode: str = "HTML"):
         """Send message to Telegram"""
         import requests
         
+        if self.transport:
+            return self.transport.send(self.chat_id, text, parse_mode=parse_mode)
+        
         url = f"https://api.telegram.org/bot{self.token}/sendMessage"
         payload = {
             'chat_id': self.chat_id,
@@ -44,28 +186,280 @@ class TelegramControlBot:
         except:
             return False
     
+    def send_document(self, path: str, caption: str = ""):
+        """Send a file to Telegram"""
+        import requests
+        
+        url = f"https://api.telegram.org/bot{self.token}/sendDocument"
+        try:
+            with open(path, 'rb') as f:
+                response = (self.session or requests).post(
+                    url,
+                    data={'chat_id': self.chat_id, 'caption': caption},
+                    files={'document': (os.path.basename(path), f)},
+                    timeout=30
+                )
+            return response.status_code == 200
+        except:
+            return False
+    
+    def hunter_request(self, kind: str, seconds: float = 1, **params):
+        """
+        Ask the running hunter to do some work and wait for the reply
+        In-process when hosted by unified_bot.py, otherwise via file + SIGUSR1
+        """
+        request = dict(params, id=f"{int(time.time() * 1000)}", kind=kind, seconds=seconds)
+        
+        if self.runtime:
+            return self.runtime.hunter.handle_control(request)
+        
+        running, pid = self.is_bot_running()
+        if not running:
+            return {'error': "Bot is not running"}
+        if not hasattr(signal, 'SIGUSR1'):
+            return {'error': "Not supported on this platform"}
+        
+        os.makedirs(self.control_dir, exist_ok=True)
+        with open(os.path.join(self.control_dir, 'request.json'), 'w') as f:
+            json.dump(request, f)
+        os.kill(pid, signal.SIGUSR1)
+        
+        response_path = os.path.join(self.control_dir, f"response-{request['id']}.json")
+        deadline = time.time() + seconds + 30
+        poll = 0.05
+        while time.time() < deadline:
+            if os.path.exists(response_path):
+                with open(response_path) as f:
+                    response = json.load(f)
+                os.remove(response_path)
+                return response
+            time.sleep(poll)
+            poll = min(poll * 2, 0.5)
+        
+        return {'error': "Hunter did not answer (is it an up-to-date degen_hunter.py?)"}
+    
+    def get_profile(self, seconds: float = 10):
+        """Sampling CPU profile of the running hunter"""
+        result = self.hunter_request('profile', seconds)
+        if 'error' in result:
+            return f"❌ {result['error']}"
+        
+        lines = [
+            f"🔬 <b>CPU Profile</b> ({result['seconds']:.0f}s wall-clock, {result['samples']} samples, all threads)",
+            ""
+        ]
+        lines.append("<b>Top (self):</b>")
+        for function, percent in result['top_self'][:10]:
+            lines.append(f"• {percent:.1f}% <code>{html.escape(function)}</code>")
+        lines.append("")
+        lines.append("<b>Top (total):</b>")
+        for function, percent in result['top_total'][:10]:
+            lines.append(f"• {percent:.1f}% <code>{html.escape(function)}</code>")
+        
+        if os.path.exists(result.get('folded_path', '')):
+            self.send_document(result['folded_path'], "Collapsed stacks (flamegraph.pl / speedscope)")
+        
+        return "\n".join(lines)
+    
+    def get_memtop(self, seconds: float = 10):
+        """Top allocation sites of the running hunter"""
+        result = self.hunter_request('memtop', seconds)
+        if 'error' in result:
+            return f"❌ {result['error']}"
+        
+        window = f"last {result['seconds']:.0f}s" if result.get('window_only') else "since tracing started"
+        lines = [
+            f"🧠 <b>Memory Top</b> ({window})",
+            f"Traced: {result['traced_bytes'] / 1024:.0f} KB (peak {result['peak_bytes'] / 1024:.0f} KB)",
+            "",
+        ]
+        for site, size, count in result['top_sites'][:10]:
+            lines.append(f"• {size / 1024:.1f} KB / {count} blocks <code>{html.escape(site)}</code>")
+        
+        return "\n".join(lines)
+    
+    def query_db(self, sql: str, params: tuple = ()) -> list:
+        """Read-only query against the hunter's database"""
+        import sqlite3
+        
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, timeout=5)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+    
+    def parse_report_args(self, args: list, default_hours: float):
+        """Parse [count] [6h|7d] [chain] [sl|tp] in any order"""
+        options = {'limit': 10, 'hours': default_hours, 'chain': None, 'outcome': None}
+        for arg in args:
+            if arg.isdigit():
+                options['limit'] = max(1, min(int(arg), 50))
+            elif arg[-1:] in ('h', 'd') and arg[:-1].replace('.', '', 1).isdigit():
+                options['hours'] = float(arg[:-1]) * (24 if arg.endswith('d') else 1)
+            elif arg in ('sl', 'tp'):
+                options['outcome'] = 'STOP_LOSS' if arg == 'sl' else 'TAKE_PROFIT'
+            else:
+                options['chain'] = arg
+        return options
+    
+    def get_top(self, args: list):
+        """Top scores from the hourly leaderboard, e.g. /top 10 6h bsc"""
+        import sqlite3
+        
+        options = self.parse_report_args(args, default_hours=24)
+        since_hour = int((time.time() - options['hours'] * 3600) // 3600 * 3600)
+        sql = '''
+            SELECT token_symbol, chain, MAX(score), price, liquidity, url
+            FROM top_scores_hourly
+            WHERE hour >= ?
+        '''
+        params = [since_hour]
+        if options['chain']:
+            sql += ' AND chain = ?'
+            params.append(options['chain'])
+        sql += ' GROUP BY chain, token_address ORDER BY MAX(score) DESC LIMIT ?'
+        params.append(options['limit'])
+        
+        try:
+            rows = self.query_db(sql, tuple(params))
+        except sqlite3.Error as e:
+            return f"❌ Leaderboard unavailable: {e}"
+        
+        scope = f"{options['chain'].upper()} " if options['chain'] else ""
+        if not rows:
+            return f"🏆 No {scope}scores in the last {options['hours']:.0f}h"
+        
+        lines = [f"🏆 <b>Top {len(rows)} {scope}scores</b> (last {options['hours']:.0f}h)", ""]
+        for rank, (symbol, chain, score, price, liquidity, url) in enumerate(rows, 1):
+            lines.append(
+                f"{rank}. <b>${html.escape(symbol or '???')}</b> {chain.upper()} | Score {score:.0f} | "
+                f"${price:.10f} | Liq ${liquidity:,.0f}\n   {url}"
+            )
+        return "\n".join(lines)
+    
+    def get_history(self, args: list):
+        """SL/TP outcomes, e.g. /history sl 7d"""
+        import sqlite3
+        
+        options = self.parse_report_args(args, default_hours=7 * 24)
+        since = time.time() - options['hours'] * 3600
+        since_day = datetime.fromtimestamp(since, timezone.utc).strftime('%Y-%m-%d')
+        
+        filters = ''
+        params = []
+        if options['chain']:
+            filters += ' AND chain = ?'
+            params.append(options['chain'])
+        if options['outcome']:
+            filters += ' AND alert_type = ?'
+            params.append(options['outcome'])
+        
+        try:
+            totals = self.query_db(f'''
+                SELECT outcome, SUM(hits), SUM(pnl_sum) FROM outcome_counts
+                WHERE day >= ?{filters.replace('alert_type', 'outcome')}
+                GROUP BY outcome
+            ''', tuple([since_day] + params))
+            hits = self.query_db(f'''
+                SELECT token_symbol, chain, alert_type, pnl_percent, timestamp FROM price_alerts
+                WHERE triggered = 1 AND timestamp >= ?{filters}
+                ORDER BY timestamp DESC LIMIT ?
+            ''', tuple([datetime.fromtimestamp(since, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')] + params + [options['limit']]))
+        except sqlite3.Error as e:
+            return f"❌ History unavailable: {e}"
+        
+        if not totals and not hits:
+            return f"📜 No SL/TP hits in the last {options['hours'] / 24:.0f}d"
+        
+        names = {'STOP_LOSS': '🛑 Stop loss', 'TAKE_PROFIT': '✅ Take profit'}
+        lines = [f"📜 <b>SL/TP History</b> (since {since_day})", ""]
+        for outcome, count, pnl_sum in totals:
+            lines.append(f"{names.get(outcome, outcome)}: {count} hits, avg P/L {pnl_sum / count:+.1f}%")
+        if hits:
+            lines.append("")
+            for symbol, chain, outcome, pnl, timestamp in hits:
+                lines.append(f"{timestamp[5:16]} {names.get(outcome, outcome)[:1]} "
+                             f"<b>${html.escape(symbol or '???')}</b> {(chain or '').upper()} {pnl or 0:+.1f}%")
+        return "\n".join(lines)
+    
+    def find_tokens(self, args: list):
+        """Scanned tokens whose symbol or name starts with a prefix"""
+        if not args:
+            return "❌ Usage: /find <symbol or name prefix>"
+        result = self.hunter_request('find', query=args[0], limit=10)
+        if 'error' in result:
+            return f"❌ {result['error']}"
+        
+        matches = result['matches']
+        if not matches:
+            return f"🔍 No scanned token matches <b>{html.escape(args[0])}</b>"
+        lines = [f"🔍 <b>{len(matches)} matches for {html.escape(args[0])}</b>", ""]
+        for match in matches:
+            lines.append(
+                f"• <b>${html.escape(match['symbol'])}</b> {html.escape(match['name'])} | {match['chain'].upper()} | "
+                f"Liq ${match['liquidity']:,.0f} | Score {match['score']:.0f}\n"
+                f"   <code>{match['token_address'] or 'address unknown'}</code>"
+            )
+        return "\n".join(lines)
+    
+    def track_token(self, args: list):
+        """Start SL/TP tracking by symbol (or address) at the current price"""
+        if not args:
+            return "❌ Usage: /track <symbol|address> [stop_loss%] [take_profit%]"
+        params = {'query': args[0]}
+        try:
+            if len(args) > 1:
+                params['stop_loss'] = float(args[1])
+            if len(args) > 2:
+                params['take_profit'] = float(args[2])
+        except ValueError:
+            return "❌ Usage: /track <symbol|address> [stop_loss%] [take_profit%]"
+        
+        result = self.hunter_request('track', **params)
+        if 'error' in result:
+            return f"❌ {result['error']}"
+        
+        tracked = result['tracked']
+        lines = [
+            f"🎯 <b>Tracking ${html.escape(tracked['symbol'])}</b> ({tracked['chain'].upper()})",
+            f"Entry ${tracked['price']:.10f} | SL {tracked['stop_loss_percent']:+.0f}% | "
+            f"TP {tracked['take_profit_percent']:+.0f}%",
+            f"<code>{tracked['token_address']}</code>",
+        ]
+        if result.get('alternatives'):
+            others = ", ".join(f"${html.escape(m['symbol'])} ({m['chain']})" for m in result['alternatives'])
+            lines.append(f"\nAlso matched: {others} - use the address to pick another")
+        return "\n".join(lines)
+    
     def get_updates(self):
-        """Get updates from Telegram"""
+        """Get updates from Telegram (long poll; None on network/API errors)"""
         import requests
         
         url = f"https://api.telegram.org/bot{self.token}/getUpdates"
         params = {
             'offset': self.last_update_id + 1,
-            'timeout': 30
+            'timeout': self.poll_seconds
         }
         
         try:
-            response = requests.get(url, params=params, timeout=35)
+            response = (self.session or requests).get(url, params=params, timeout=self.poll_seconds + 5)
+            if self.transport:
+                self.transport.meter.record(response)
+                self.transport.meter.wakeup('control')
             if response.status_code == 200:
                 data = response.json()
                 return data.get('result', [])
         except:
             pass
         
-        return []
+        return None
     
     def is_bot_running(self):
         """Check if unified bot is running"""
+        if self.runtime:
+            return self.runtime.is_hunter_running(), os.getpid()
+        
+        import psutil
         for proc in psutil.process_iter(['name', 'cmdline']):
             try:
                 cmdline = ' '.join(proc.info['cmdline'] or [])
@@ -75,8 +469,27 @@ class TelegramControlBot:
                 pass
         return False, None
     
+    def detect_mode(self, pid):
+        """Mode of an already running bot, from its command line"""
+        import psutil
+        
+        try:
+            cmdline = ' '.join(psutil.Process(pid).cmdline())
+        except:
+            return 'unified'
+        if 'degen_hunter' in cmdline:
+            return 'degen'
+        if 'nft_monitor' in cmdline:
+            return 'nft'
+        return 'unified'
+    
     def start_bot(self, mode: str = "unified"):
         """Start monitoring bot"""
+        import subprocess
+        
+        if self.runtime:
+            return self.runtime.start_hunter(mode)
+        
         running, pid = self.is_bot_running()
         if running:
             return f"❌ Bot already running (PID: {pid})"
@@ -95,19 +508,31 @@ class TelegramControlBot:
             if not os.path.exists(script):
                 return f"❌ {script} not found! Make sure you're in the correct directory."
             
-            # Start in background
+            # Start in background (this process already handles Telegram commands)
+            args = [sys.executable, script]
+            env = None
+            if mode == "unified":
+                args.append("--no-control")
+                # Stalls are this process's Watchdog's job: two watchdogs would
+                # both restart on the same stall
+                env = dict(os.environ, WATCHDOG='false')
+            # Output goes to a log file: a PIPE nobody reads fills up and
+            # freezes the bot on its next print
+            log_file = open(os.getenv('BOT_LOG_FILE', 'bot.log'), 'a')
             self.bot_process = subprocess.Popen(
-                [sys.executable, script],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+                args,
+                env=env,
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
                 start_new_session=True
             )
-            
-            time.sleep(2)
+            log_file.close()
             
             # Verify it started
+            self.wait_started(float(os.getenv('STARTUP_WAIT_SECONDS', '15')))
             running, pid = self.is_bot_running()
             if running:
+                self.expected_mode = mode
                 return f"✅ Bot started successfully!\n📍 Mode: {mode}\n🆔 PID: {pid}"
             else:
                 return "❌ Bot failed to start. Check logs."
@@ -115,20 +540,49 @@ class TelegramControlBot:
         except Exception as e:
             return f"❌ Error starting bot: {e}"
     
-    def stop_bot(self):
+    def wait_started(self, timeout: float) -> bool:
+        """
+        Wait until the new process writes its first heartbeat (startup done,
+        first scan under way) instead of a fixed sleep; False if it exited
+        """
+        heartbeat_path = os.getenv('HUNTER_HEARTBEAT_FILE', 'hunter_heartbeat.json')
+        deadline = time.time() + timeout
+        poll = 0.05
+        while time.time() < deadline:
+            if self.bot_process.poll() is not None:
+                return False
+            try:
+                with open(heartbeat_path) as f:
+                    if json.load(f).get('pid') == self.bot_process.pid:
+                        return True
+            except (OSError, ValueError):
+                pass
+            time.sleep(poll)
+            poll = min(poll * 2, 0.5)
+        return self.bot_process.poll() is None
+    
+    def stop_bot(self, manual: bool = True):
         """Stop monitoring bot"""
+        if manual:
+            self.expected_mode = None
+        
+        if self.runtime:
+            return self.runtime.stop_hunter()
+        
         running, pid = self.is_bot_running()
         if not running:
             return "❌ Bot is not running"
         
+        import psutil
+        
         try:
-            # Kill process
+            # Kill process (it flushes its DB writes and state snapshot on SIGTERM)
             proc = psutil.Process(pid)
             proc.terminate()
-            time.sleep(1)
-            
-            # Force kill if still running
-            if proc.is_running():
+            try:
+                proc.wait(timeout=float(os.getenv('STOP_WAIT_SECONDS', '10')))
+            except psutil.TimeoutExpired:
+                # Force kill if still running
                 proc.kill()
             
             return f"✅ Bot stopped (PID: {pid})"
@@ -139,7 +593,11 @@ class TelegramControlBot:
         """Get bot status"""
         running, pid = self.is_bot_running()
         
+        if self.runtime:
+            return self.runtime.get_status() + self.format_hunter_status()
+        
         if running:
+            import psutil
             try:
                 proc = psutil.Process(pid)
                 cpu = proc.cpu_percent(interval=1)
@@ -163,11 +621,117 @@ class TelegramControlBot:
 """
             except:
                 status = f"🟢 <b>Bot Status: RUNNING</b>\n\n🆔 PID: {pid}"
+            
+            status += self.format_hunter_status()
         else:
             status = "🔴 <b>Bot Status: STOPPED</b>"
         
         return status
     
+    def read_hunter_status(self):
+        """Read status file written by the hunter after each cycle"""
+        if self.runtime:
+            return self.runtime.hunter.status_snapshot()
+        
+        try:
+            with open(self.status_path) as f:
+                return json.load(f)
+        except:
+            return None
+    
+    def format_hunter_status(self):
+        """Format hunter cycle and API health section for /status"""
+        hunter_status = self.read_hunter_status()
+        if not hunter_status:
+            return ""
+        
+        age = time.time() - hunter_status.get('updated_at', 0)
+        lines = [
+            "",
+            f"🔁 Cycles: {hunter_status.get('cycle', 0)} (last update {self.format_uptime(age)} ago)",
+            f"🎯 Tracked tokens: {hunter_status.get('tracked_tokens', 0)}",
+        ]
+        
+        memory = hunter_status.get('memory')
+        if memory:
+            usage = memory['rss_mb'] / memory['budget_mb'] * 100 if memory['budget_mb'] else 0
+            level_emoji = {'ok': '🟢', 'pressure': '🟡', 'critical': '🔴'}.get(memory['level'], '⚪')
+            evicted = sum(memory.get('evicted_kb', {}).values())
+            lines.append(
+                f"{level_emoji} Memory budget: {memory['rss_mb']:.0f}/{memory['budget_mb']:.0f} MB "
+                f"({usage:.0f}%, {memory['level']}) | caches {sum(memory['caches_kb'].values()) / 1024:.1f} MB"
+                + (f" | evicted {evicted / 1024:.1f} MB" if evicted else "")
+            )
+        
+        risk = hunter_status.get('risk')
+        if risk:
+            lines.append(
+                f"🛡️ Contract screens: {risk.get('screened', 0)} new "
+                f"(🟢 {risk.get('ok', 0)} 🟡 {risk.get('caution', 0)} 🔴 {risk.get('danger', 0)}) | "
+                f"{risk.get('from_db', 0)} from DB | {risk.get('pending', 0)} pending"
+                + (f" | {risk['errors']} errors" if risk.get('errors') else "")
+            )
+        
+        health = hunter_status.get('health', {})
+        if health:
+            lines.append("")
+            lines.append("🌐 <b>API Health:</b>")
+            state_emoji = {'closed': '🟢', 'half_open': '🟡', 'open': '🔴'}
+            for host, info in sorted(health.items()):
+                p99 = info.get('p99_ms')
+                latency = f"p99 {p99}ms" if p99 is not None else "p99 n/a"
+                lines.append(
+                    f"{state_emoji.get(info.get('state'), '⚪')} {host}: {info.get('state')} | "
+                    f"err {info.get('error_rate', 0) * 100:.0f}% | {latency} | "
+                    f"fast-fails {info.get('fast_fails', 0)}"
+                )
+        
+        prices = hunter_status.get('prices', {})
+        if prices.get('sources'):
+            lines.append("")
+            lines.append("💱 <b>Price Sources:</b>")
+            for name, info in prices['sources'].items():
+                age = info.get('age_s')
+                freshness = f"last {self.format_uptime(age)} ago" if age is not None else "no answers"
+                lines.append(
+                    f"• {name}: {info.get('wins', 0)} wins / {info.get('requests', 0)} req | "
+                    f"{info.get('errors', 0)} errors | {freshness}"
+                )
+            lines.append(
+                f"Hedged: {prices.get('hedges', 0)} | Disagreements: {prices.get('disagreements', 0)}"
+                f"/{prices.get('comparisons', 0)} (max {prices.get('max_disagreement_pct', 0)}%)"
+            )
+        
+        power = hunter_status.get('power')
+        if power:
+            lines.append("")
+            lines.append(f"🔋 <b>Power</b> ({'power-saving' if power.get('power_save') else 'normal'} mode, per hour):")
+            lines.append(
+                f"Wakeups: {power.get('wakeups_per_hour', 0)} timers | "
+                f"{power.get('radio_wakeups_per_hour', 0)} radio bursts | {power.get('requests_per_hour', 0)} requests"
+            )
+            lines.append(
+                f"Data: {power.get('kb_received_per_hour', 0):.0f} KB in / {power.get('kb_sent_per_hour', 0):.0f} KB out"
+            )
+            grouped = power.get('grouped', {})
+            if grouped.get('queued'):
+                lines.append(f"Grouped alerts: {grouped['queued']} in {grouped.get('sent', 0)} messages")
+        
+        pipeline = hunter_status.get('pipeline', {})
+        stages = {name: info for name, info in pipeline.items() if isinstance(info, dict)}
+        if stages:
+            lines.append("")
+            lines.append("🧵 <b>Pipeline</b> (last cycle):")
+            for name, info in stages.items():
+                lines.append(
+                    f"• {name}: {info.get('workers', 0)} workers | max queue {info.get('max_depth', 0)} | "
+                    f"{info.get('processed', 0)} done | {info.get('shed', 0)} shed"
+                )
+            if pipeline.get('db_shed_batches'):
+                lines.append(f"DB backlog: {pipeline['db_shed_batches']} batches stored alert-worthy launches only")
+        
+        return "\n".join(lines) + "\n"
+    
     def format_uptime(self, seconds):
         """Format uptime"""
         days = int(seconds // 86400)
@@ -227,6 +791,18 @@ class TelegramControlBot:
 /config - View configuration
 /help - Show this help
 
+<b>Tokens:</b>
+/find &lt;prefix&gt; - Search scanned tokens by symbol/name
+/track &lt;symbol|address&gt; [sl%] [tp%] - Track SL/TP
+
+<b>Reports:</b>
+/top [count] [6h|2d] [chain] - Best scores
+/history [sl|tp] [7d] [chain] - SL/TP hits
+
+<b>Diagnostics:</b>
+/profile [seconds] - CPU profile of the running bot
+/memtop [seconds] - Top memory allocation sites
+
 <b>Quick Actions:</b>
 Just send:
 • "start" - Start bot
@@ -242,7 +818,31 @@ Just send:
     
     def handle_command(self, command: str):
         """Handle command from Telegram"""
+        raw_args = command.strip().split()[1:]
         command = command.lower().strip()
+        parts = command.split()
+        
+        if parts and parts[0] in ['/profile', 'profile', '/memtop', 'memtop']:
+            try:
+                seconds = float(parts[1]) if len(parts) > 1 else 10
+            except ValueError:
+                return "❌ Usage: /profile [seconds] or /memtop [seconds]"
+            if parts[0].endswith('profile'):
+                return self.get_profile(seconds)
+            return self.get_memtop(seconds)
+        
+        if parts and parts[0] in ['/find', 'find']:
+            return self.find_tokens(parts[1:])
+        
+        if parts and parts[0] in ['/track', 'track']:
+            # Addresses can be case-sensitive (Solana), so take them from the raw text
+            return self.track_token(raw_args)
+        
+        if parts and parts[0] in ['/top', 'top']:
+            return self.get_top(parts[1:])
+        
+        if parts and parts[0] in ['/history', 'history']:
+            return self.get_history(parts[1:])
         
         if command in ['/start', 'start']:
             return self.start_bot('unified')
@@ -258,7 +858,10 @@ Just send:
         
         elif command in ['/restart', 'restart']:
             stop_msg = self.stop_bot()
-            time.sleep(2)
+            # stop_bot waits for the process to exit; in-process tasks are cancelled asynchronously
+            deadline = time.time() + 5
+            while self.is_bot_running()[0] and time.time() < deadline:
+                time.sleep(0.05)
             start_msg = self.start_bot('unified')
             return f"{stop_msg}\n\n{start_msg}"
         
@@ -292,14 +895,23 @@ Just send:
             "You can now control the monitoring bot through Telegram!"
         )
         
+        if os.getenv('WATCHDOG', 'true').lower() == 'true':
+            running, pid = self.is_bot_running()
+            if running:
+                self.expected_mode = self.detect_mode(pid)
+            Watchdog(self).start()
+        
         print("✅ Control bot running...")
         print("📱 Send commands via Telegram")
         print("⌨️  Press Ctrl+C to stop\n")
         
-        # Main loop
+        # Main loop (getUpdates long-polls, so there is no sleep between polls)
         while True:
             try:
                 updates = self.get_updates()
+                if updates is None:
+                    time.sleep(5)
+                    continue
                 
                 for update in updates:
                     self.last_update_id = update['update_id']
@@ -319,8 +931,6 @@ Just send:
                         
                         print(f"📤 Sent response")
                 
-                time.sleep(1)
-                
             except KeyboardInterrupt:
                 print("\n\n🛑 Control bot stopped")
                 self.send_message("🛑 <b>Control Bot Stopped</b>")
@@ -335,12 +945,15 @@ def main():
     try:
         import requests
         import psutil
+        from dotenv import load_dotenv
     except ImportError:
+        import subprocess
         print("Installing required packages...")
         subprocess.check_call([sys.executable, "-m", "pip", "install", "requests", "psutil", "python-dotenv"])
         print("✅ Packages installed. Please run again.")
         sys.exit(0)
     
+    load_dotenv()
     bot = TelegramControlBot()
     bot.run()
 
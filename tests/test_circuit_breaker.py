@@ -0,0 +1,105 @@
+from unittest.mock import Mock
+
+import pytest
+
+from degen_hunter import CircuitBreaker, CircuitOpenError, HttpClient
+
+
+def make_breaker(**kwargs):
+    kwargs.setdefault('min_requests', 4)
+    kwargs.setdefault('base_cooldown', 30)
+    return CircuitBreaker('api.example', **kwargs)
+
+
+def trip(breaker):
+    for _ in range(breaker.min_requests):
+        breaker.record(False, 0.1)
+
+
+def expire_cooldown(breaker):
+    breaker.opened_at -= breaker.cooldown
+
+
+def test_stays_closed_below_min_requests_and_threshold():
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record(False, 0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    
+    for _ in range(5):
+        breaker.record(True, 0.1)
+    breaker.record(False, 0.1)
+    assert breaker.state == CircuitBreaker.CLOSED  # 4/9 errors
+
+
+def test_opens_on_error_rate_and_fails_fast():
+    breaker = make_breaker()
+    trip(breaker)
+    
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.fast_fails == 1
+
+
+def test_half_open_allows_a_single_probe():
+    breaker = make_breaker()
+    trip(breaker)
+    expire_cooldown(breaker)
+    
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_successful_probe_closes():
+    breaker = make_breaker()
+    trip(breaker)
+    expire_cooldown(breaker)
+    breaker.allow()
+    
+    breaker.record(True, 0.1)
+    
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.cooldown == breaker.base_cooldown
+    assert breaker.error_rate() == 0.0
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_with_longer_cooldown():
+    breaker = make_breaker(max_cooldown=100)
+    trip(breaker)
+    for expected in (60, 100, 100):
+        expire_cooldown(breaker)
+        breaker.allow()
+        breaker.record(False, 0.1)
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.cooldown == expected
+
+
+def test_adaptive_timeout_and_hedge_delay_follow_latency():
+    breaker = make_breaker()
+    assert breaker.timeout(10) == 10
+    assert breaker.hedge_delay(1.5) == 1.5
+    
+    for latency in (1.0, 1.2, 1.4, 1.6, 3.0):
+        breaker.record(True, latency)
+    
+    assert breaker.timeout(10) == 6.0
+    assert breaker.timeout(4) == 4
+    assert breaker.hedge_delay(1.5) == 3.0
+
+
+def test_http_client_records_per_host_and_raises_when_open():
+    session = Mock()
+    session.get.return_value = Mock(status_code=503)
+    client = HttpClient(session=session)
+    
+    for _ in range(5):
+        client.get('https://api.example/tokens')
+    with pytest.raises(CircuitOpenError):
+        client.get('https://api.example/other')
+    
+    assert session.get.call_count == 5
+    assert client.health()['api.example']['state'] == CircuitBreaker.OPEN
+    session.get.return_value = Mock(status_code=200)
+    assert client.get('https://other.example/tokens').status_code == 200
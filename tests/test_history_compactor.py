@@ -0,0 +1,120 @@
+import sqlite3
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from degen_hunter import DegenCoinHunter, HistoryCompactor
+
+HOUR = 3600
+# Hour boundary three days back (inside the default retention windows)
+BASE = int(time.time() - 3 * 86400) // HOUR * HOUR
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'history.db')
+    DegenCoinHunter.init_database(SimpleNamespace(db_path=path, SCHEMA_VERSION=DegenCoinHunter.SCHEMA_VERSION))
+    return path
+
+
+def add_pump_event(conn, ts, price, token='0xTok', change_5m=10.0, score=50.0):
+    conn.execute('''
+        INSERT INTO pump_events (token_address, token_symbol, chain, price_change_5m, price_change_1h,
+                                 volume_surge, pump_score, price, timestamp)
+        VALUES (?, 'TOK', 'bsc', ?, 20.0, 2.0, ?, ?, ?)
+    ''', (token, change_5m, score, price, HistoryCompactor.sql_time(ts)))
+
+
+def test_roll_raw_builds_5m_ohlc(db_path):
+    conn = sqlite3.connect(db_path)
+    add_pump_event(conn, BASE + 10, 1.0, change_5m=5.0)
+    add_pump_event(conn, BASE + 100, 3.0, change_5m=30.0, score=80.0)
+    add_pump_event(conn, BASE + 200, 2.0)
+    add_pump_event(conn, BASE + 310, 4.0)
+    add_pump_event(conn, BASE + 2 * HOUR, 5.0)  # newer than the cutoff
+    conn.commit()
+    
+    rolled = HistoryCompactor(db_path).roll_raw(conn, BASE + HOUR)
+    
+    assert rolled == 4
+    rows = conn.execute('''
+        SELECT bucket_start, samples, price_open, price_high, price_low, price_close, max_change_5m, max_pump_score
+        FROM pump_events_5m ORDER BY bucket_start
+    ''').fetchall()
+    assert rows == [(BASE, 3, 1.0, 3.0, 1.0, 2.0, 30.0, 80.0),
+                    (BASE + 300, 1, 4.0, 4.0, 4.0, 4.0, 10.0, 50.0)]
+    assert conn.execute('SELECT price FROM pump_events').fetchall() == [(5.0,)]
+    conn.close()
+
+
+def test_roll_raw_merges_into_existing_bucket(db_path):
+    conn = sqlite3.connect(db_path)
+    compactor = HistoryCompactor(db_path)
+    add_pump_event(conn, BASE + 10, 2.0)
+    conn.commit()
+    compactor.roll_raw(conn, BASE + HOUR)
+    
+    # A late row for the same bucket arrives after the first pass
+    add_pump_event(conn, BASE + 250, 0.5)
+    conn.commit()
+    compactor.roll_raw(conn, BASE + HOUR)
+    
+    row = conn.execute('SELECT samples, price_open, price_low, price_close FROM pump_events_5m').fetchone()
+    assert row == (2, 2.0, 0.5, 0.5)
+    conn.close()
+
+
+def test_roll_raw_without_rows_is_a_no_op(db_path):
+    conn = sqlite3.connect(db_path)
+    
+    assert HistoryCompactor(db_path).roll_raw(conn, BASE + HOUR) == 0
+    conn.close()
+
+
+def test_roll_5m_builds_hourly_buckets(db_path):
+    conn = sqlite3.connect(db_path)
+    compactor = HistoryCompactor(db_path)
+    for offset, price in ((10, 1.0), (1000, 4.0), (3000, 2.0), (HOUR + 10, 7.0)):
+        add_pump_event(conn, BASE + offset, price)
+    conn.commit()
+    compactor.roll_raw(conn, BASE + 2 * HOUR)
+    
+    rolled = compactor.roll_5m(conn, BASE + 2 * HOUR)
+    
+    assert rolled == 4
+    rows = conn.execute('''
+        SELECT bucket_start, samples, price_open, price_high, price_low, price_close
+        FROM pump_events_1h ORDER BY bucket_start
+    ''').fetchall()
+    assert rows == [(BASE, 3, 1.0, 4.0, 1.0, 2.0), (BASE + HOUR, 1, 7.0, 7.0, 7.0, 7.0)]
+    assert conn.execute('SELECT COUNT(*) FROM pump_events_5m').fetchone()[0] == 0
+    conn.close()
+
+
+def test_run_once_applies_retention(db_path, monkeypatch):
+    monkeypatch.setenv('HISTORY_RAW_HOURS', '24')
+    monkeypatch.setenv('HISTORY_5M_DAYS', '1')
+    monkeypatch.setenv('HISTORY_1H_DAYS', '2')
+    monkeypatch.setenv('LAUNCH_RETENTION_DAYS', '2')
+    monkeypatch.setenv('LEADERBOARD_RETENTION_DAYS', '2')
+    now = time.time()
+    conn = sqlite3.connect(db_path)
+    add_pump_event(conn, BASE + 10, 1.0)  # 3 days old: rolled to 5m, then 1h, then expired
+    add_pump_event(conn, now - 36 * HOUR, 2.0)  # rolled to 5m, then kept as 1h
+    add_pump_event(conn, now - 60, 3.0)  # stays raw
+    conn.executemany('INSERT INTO new_launches (token_address, timestamp) VALUES (?, ?)', [
+        ('0xOld', HistoryCompactor.sql_time(now - 3 * 86400)),
+        ('0xNew', HistoryCompactor.sql_time(now - 60)),
+    ])
+    conn.execute('INSERT INTO top_scores_hourly (hour, token_address) VALUES (?, ?)', (int(now - 3 * 86400), '0xOld'))
+    conn.commit()
+    
+    HistoryCompactor(db_path).run_once()
+    
+    assert conn.execute('SELECT price FROM pump_events').fetchall() == [(3.0,)]
+    assert conn.execute('SELECT COUNT(*) FROM pump_events_5m').fetchone()[0] == 0
+    assert conn.execute('SELECT price_close FROM pump_events_1h').fetchall() == [(2.0,)]
+    assert conn.execute('SELECT token_address FROM new_launches').fetchall() == [('0xNew',)]
+    assert conn.execute('SELECT COUNT(*) FROM top_scores_hourly').fetchone()[0] == 0
+    conn.close()
@@ -0,0 +1,99 @@
+import time
+
+from degen_hunter import HolderEnricher, MockHolderBackend
+
+
+def make_tokens(chain, count, prefix='0xTok'):
+    return [{'chain': chain, 'token_address': f"{prefix}{i}"} for i in range(count)]
+
+
+def test_misses_are_batched_per_chain():
+    backend = MockHolderBackend()
+    backend.batch_size = 2
+    enricher = HolderEnricher(backend, budget_seconds=5)
+    tokens = make_tokens('bsc', 5) + make_tokens('ethereum', 1)
+    
+    enricher.enrich(tokens)
+    
+    # bsc: 3 batches of at most 2, ethereum: 1
+    assert backend.calls == 4
+    assert all('holders' in token for token in tokens)
+
+
+def test_duplicate_addresses_are_looked_up_once():
+    backend = MockHolderBackend({'0xTok0': 1234})
+    enricher = HolderEnricher(backend, budget_seconds=5)
+    tokens = make_tokens('bsc', 1) + make_tokens('bsc', 1)
+    
+    enricher.enrich(tokens)
+    
+    assert backend.calls == 1
+    assert [token['holders'] for token in tokens] == [1234, 1234]
+
+
+def test_cache_hits_within_ttl():
+    backend = MockHolderBackend()
+    enricher = HolderEnricher(backend, ttl_seconds=600, budget_seconds=5)
+    enricher.enrich(make_tokens('bsc', 3))
+    assert backend.calls == 1
+    
+    tokens = make_tokens('bsc', 3)
+    enricher.enrich(tokens)
+    
+    assert backend.calls == 1
+    assert all('holders' in token for token in tokens)
+
+
+def test_expired_entries_are_fetched_again():
+    backend = MockHolderBackend()
+    enricher = HolderEnricher(backend, ttl_seconds=600, budget_seconds=5)
+    enricher.enrich(make_tokens('bsc', 1))
+    
+    key = ('bsc', '0xTok0')
+    holders, fetched_at = enricher.cache[key]
+    enricher.cache[key] = (holders, fetched_at - 601)
+    tokens = make_tokens('bsc', 1)
+    enricher.enrich(tokens)
+    
+    assert backend.calls == 2
+    assert tokens[0]['holders'] == holders
+
+
+def test_unresolved_addresses_are_not_cached():
+    backend = MockHolderBackend({'0xTok0': 10})
+    enricher = HolderEnricher(backend, budget_seconds=5)
+    tokens = make_tokens('bsc', 2)
+    
+    enricher.enrich(tokens)
+    
+    assert tokens[0]['holders'] == 10
+    assert 'holders' not in tokens[1]
+    assert ('bsc', '0xTok1') not in enricher.cache
+
+
+def test_budget_cut_off_leaves_lookups_for_next_cycle():
+    backend = MockHolderBackend(latency=0.5)
+    enricher = HolderEnricher(backend, budget_seconds=0.1)
+    tokens = make_tokens('bsc', 2)
+    
+    started = time.time()
+    enricher.enrich(tokens)
+    
+    assert time.time() - started < 0.4
+    assert enricher.budget_left <= 0
+    assert not any('holders' in token for token in tokens)
+    
+    # Budget spent: the rest of the cycle doesn't wait, and in-flight keys aren't resubmitted
+    started = time.time()
+    enricher.enrich(make_tokens('bsc', 2))
+    assert time.time() - started < 0.1
+    assert backend.calls == 1
+    
+    # The late lookup lands in the cache and serves the next cycle
+    enricher.executor.shutdown(wait=True)
+    enricher.start_cycle()
+    assert enricher.budget_left == 0.1
+    tokens = make_tokens('bsc', 2)
+    enricher.enrich(tokens)
+    assert backend.calls == 1
+    assert all('holders' in token for token in tokens)
@@ -0,0 +1,126 @@
+import sqlite3
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from degen_hunter import DatabaseWriter, DegenCoinHunter, MessageBoard
+
+KEY = ('0xTok', 'chat1', 'pump')
+
+
+@pytest.fixture
+def db_writer(tmp_path):
+    path = str(tmp_path / 'board.db')
+    DegenCoinHunter.init_database(SimpleNamespace(db_path=path, SCHEMA_VERSION=DegenCoinHunter.SCHEMA_VERSION))
+    writer = DatabaseWriter(path)
+    yield writer
+    writer.close()
+
+
+def make_transport(message_id=101, edit_result=True):
+    transport = Mock()
+    transport.send_message.return_value = {'message_id': message_id}
+    transport.edit.return_value = edit_result
+    transport.pin.return_value = True
+    return transport
+
+
+def stored_rows(db_writer):
+    db_writer.flush()
+    conn = sqlite3.connect(db_writer.db_path)
+    rows = conn.execute('''
+        SELECT token_address, chat_id, kind, message_id, digest, pinned, created_at, updated_at FROM live_messages
+    ''').fetchall()
+    conn.close()
+    return rows
+
+
+def test_update_without_live_message_returns_false(db_writer):
+    board = MessageBoard(make_transport(), db_writer)
+    
+    assert board.update(KEY, "pump 10%") is False
+
+
+def test_edits_are_throttled_and_unchanged_text_skipped(db_writer):
+    transport = make_transport()
+    board = MessageBoard(transport, db_writer, edit_interval=60)
+    board.post(KEY, "pump 10%")
+    
+    assert board.update(KEY, "pump 10%")
+    assert board.update(KEY, "pump 20%")
+    assert transport.edit.call_count == 0
+    assert board.snapshot()['unchanged'] == 1
+    assert board.snapshot()['throttled'] == 1
+    
+    board.messages[KEY]['updated_at'] -= 61
+    assert board.update(KEY, "pump 30%")
+    transport.edit.assert_called_once_with('chat1', 101, "pump 30%")
+    assert board.update(KEY, "pump 40%", force=True)
+    assert board.snapshot()['edited'] == 2
+
+
+def test_message_deleted_in_chat_is_forgotten(db_writer):
+    transport = make_transport(edit_result=None)
+    board = MessageBoard(transport, db_writer, edit_interval=0)
+    board.post(KEY, "pump 10%")
+    
+    assert board.update(KEY, "pump 20%") is False
+    
+    assert not board.has(KEY)
+    assert stored_rows(db_writer) == []
+
+
+def test_restart_keeps_editing_the_same_message(db_writer):
+    board = MessageBoard(make_transport(), db_writer, edit_interval=0)
+    board.post(KEY, "pump 10%")
+    
+    transport = make_transport()
+    restarted = MessageBoard(transport, db_writer, edit_interval=0)
+    restarted.load(stored_rows(db_writer))
+    
+    assert restarted.update(KEY, "pump 10%")  # same text as stored
+    assert restarted.update(KEY, "pump 20%")
+    transport.edit.assert_called_once_with('chat1', 101, "pump 20%")
+
+
+def test_repost_unpins_the_previous_message(db_writer):
+    transport = make_transport()
+    board = MessageBoard(transport, db_writer)
+    board.post(KEY, "position", pin=True)
+    transport.send_message.return_value = {'message_id': 202}
+    
+    board.post(KEY, "position again", pin=True)
+    
+    transport.pin.assert_any_call('chat1', 101, pinned=False)
+    transport.pin.assert_called_with('chat1', 202)
+    assert board.messages[KEY]['message_id'] == 202
+
+
+def test_close_edits_unpins_and_forgets(db_writer):
+    transport = make_transport()
+    board = MessageBoard(transport, db_writer, edit_interval=600)
+    board.post(KEY, "position", pin=True)
+    
+    board.close(KEY, "position closed")
+    
+    transport.edit.assert_called_once_with('chat1', 101, "position closed")
+    transport.pin.assert_called_with('chat1', 101, pinned=False)
+    assert not board.has(KEY)
+    assert stored_rows(db_writer) == []
+
+
+def test_prune_drops_expired_messages_of_the_given_kinds(db_writer):
+    board = MessageBoard(make_transport(), db_writer, ttl_seconds=3600)
+    old_launch, new_launch, old_pump = ('0xA', 'chat1', 'launch'), ('0xB', 'chat1', 'launch'), ('0xC', 'chat1', 'pump')
+    for key in (old_launch, new_launch, old_pump):
+        board.post(key, "alert")
+    board.messages[old_launch]['created_at'] = time.time() - 7200
+    board.messages[old_pump]['created_at'] = time.time() - 7200
+    
+    board.prune()
+    
+    assert board.keys('launch') == [new_launch]
+    assert board.has(old_pump)
+    assert sorted(row[0] for row in stored_rows(db_writer)) == ['0xB', '0xC']
@@ -0,0 +1,102 @@
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from degen_hunter import CircuitOpenError, HedgedPriceFetcher, HttpClient, PriceSource
+
+
+class FakePriceSource(PriceSource):
+    def __init__(self, name, price=None, latency=0.0, error=None, chains=None):
+        super().__init__(HttpClient(session=Mock()), f"https://{name}.example")
+        self.name = name
+        self.price = price
+        self.latency = latency
+        self.error = error
+        self.chains = chains
+        self.calls = 0
+    
+    def available(self, chain):
+        return self.chains is None or chain in self.chains
+    
+    def fetch(self, address, chain):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error:
+            raise self.error
+        return {'price': self.price, 'chain': chain, 'url': ''} if self.price else None
+
+
+def make_fetcher(*sources, hedge_delay=0.1, deadline=2):
+    return HedgedPriceFetcher(HttpClient(session=Mock()), list(sources), hedge_delay=hedge_delay, deadline=deadline)
+
+
+def test_fast_primary_is_not_hedged():
+    primary, backup = FakePriceSource('primary', 1.0), FakePriceSource('backup', 1.1)
+    fetcher = make_fetcher(primary, backup)
+    
+    quote = fetcher.quote('0xTok', 'bsc')
+    
+    assert quote['price'] == 1.0
+    assert quote['source'] == 'primary'
+    assert backup.calls == 0
+    assert fetcher.hedges == 0
+
+
+def test_slow_primary_is_hedged_and_backup_wins():
+    primary, backup = FakePriceSource('primary', 1.0, latency=0.5), FakePriceSource('backup', 1.2)
+    fetcher = make_fetcher(primary, backup)
+    
+    started = time.time()
+    quote = fetcher.quote('0xTok', 'bsc')
+    
+    assert time.time() - started < 0.4
+    assert quote['source'] == 'backup'
+    assert fetcher.hedges == 1
+    assert fetcher.snapshot()['sources']['backup']['wins'] == 1
+    
+    # The late primary answer still counts for freshness and disagreement
+    fetcher.executor.shutdown(wait=True)
+    assert fetcher.stats['primary']['answers'] == 1
+    assert fetcher.comparisons == 1
+    assert fetcher.disagreements == 1
+    assert fetcher.max_disagreement == pytest.approx(20.0)
+
+
+def test_failed_primary_falls_back_without_waiting():
+    primary = FakePriceSource('primary', error=ValueError('bad json'))
+    backup = FakePriceSource('backup', 1.1)
+    fetcher = make_fetcher(primary, backup, hedge_delay=5)
+    
+    started = time.time()
+    quote = fetcher.quote('0xTok', 'bsc')
+    
+    assert time.time() - started < 1
+    assert quote['source'] == 'backup'
+    assert fetcher.hedges == 0
+    fetcher.executor.shutdown(wait=True)
+    assert fetcher.stats['primary']['errors'] == 1
+
+
+def test_sources_without_the_chain_are_skipped():
+    primary = FakePriceSource('primary', 1.0, chains={'ethereum'})
+    backup = FakePriceSource('backup', 1.1)
+    fetcher = make_fetcher(primary, backup)
+    
+    assert fetcher.quote('0xTok', 'bsc')['source'] == 'backup'
+    assert primary.calls == 0
+
+
+def test_no_price_anywhere_returns_none():
+    fetcher = make_fetcher(FakePriceSource('primary'), FakePriceSource('backup'))
+    
+    assert fetcher.quote('0xTok', 'bsc') is None
+
+
+def test_all_circuits_open_raises():
+    fetcher = make_fetcher(FakePriceSource('primary', error=CircuitOpenError('open')),
+                           FakePriceSource('backup', error=CircuitOpenError('open')))
+    
+    with pytest.raises(CircuitOpenError):
+        fetcher.quote('0xTok', 'bsc')
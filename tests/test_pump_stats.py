@@ -0,0 +1,71 @@
+import sqlite3
+
+from degen_hunter import DatabaseWriter, PumpStats
+
+
+def make_token(m5=0.0, h1=0.0, volume=10000, liquidity=20000, chain='bsc'):
+    return {'chain': chain, 'liquidity': liquidity, 'volume_24h': volume,
+            'price_change_5m': m5, 'price_change_1h': h1}
+
+
+def warm_up(stats, samples, **kwargs):
+    for i in range(samples):
+        # Alternate around a small baseline so the variance is non-zero
+        stats.observe(make_token(m5=1.0 + (i % 2), h1=2.0 + (i % 2), **kwargs))
+
+
+def test_warming_up_bucket_returns_none():
+    stats = PumpStats(min_samples=5)
+    warm_up(stats, 4)
+    
+    assert stats.zscores(make_token()) is None
+    assert stats.is_abnormal(make_token(m5=50)) is None
+
+
+def test_zscores_after_warm_up():
+    stats = PumpStats(min_samples=5)
+    warm_up(stats, 50)
+    
+    zscores = stats.zscores(make_token(m5=1.5, h1=2.5, volume=10000))
+    
+    assert set(zscores) == {'m5', 'h1', 'vol_liq'}
+    assert abs(zscores['m5']) < 1
+    assert zscores['vol_liq'] == 0.0  # constant metric: zero variance
+
+
+def test_large_move_is_abnormal():
+    stats = PumpStats(min_samples=5, z_threshold=3.0)
+    warm_up(stats, 50)
+    token = make_token(m5=40.0, h1=2.5)
+    
+    assert stats.is_abnormal(token) is True
+    assert token['pump_z'] > 3.0
+    assert stats.is_abnormal(make_token(m5=1.5, h1=2.5)) is False
+
+
+def test_buckets_are_separate_per_chain_and_liquidity():
+    stats = PumpStats(min_samples=5)
+    warm_up(stats, 50)
+    
+    assert stats.zscores(make_token(chain='ethereum')) is None
+    assert stats.zscores(make_token(liquidity=5000000)) is None
+
+
+def test_dirty_rows_round_trip_through_sqlite(tmp_path):
+    db_path = str(tmp_path / 'stats.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE pump_stats (key TEXT PRIMARY KEY, n INTEGER, mean REAL, var REAL)')
+    conn.commit()
+    stats = PumpStats(min_samples=5)
+    warm_up(stats, 50)
+    writer = DatabaseWriter(db_path)
+    
+    writer.executemany('INSERT INTO pump_stats (key, n, mean, var) VALUES (?, ?, ?, ?)', stats.dirty_rows())
+    writer.close()
+    
+    assert stats.dirty_rows() == []
+    restored = PumpStats(min_samples=5)
+    restored.load(conn.execute('SELECT key, n, mean, var FROM pump_stats').fetchall())
+    conn.close()
+    token = make_token(m5=40.0, h1=2.5)
+    assert restored.zscores(token) == stats.zscores(token)
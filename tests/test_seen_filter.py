@@ -0,0 +1,39 @@
+from degen_hunter import SeenFilter
+
+
+def test_added_items_are_seen_case_insensitively():
+    seen = SeenFilter(capacity=1000)
+    seen.add('0xAbC123')
+    
+    assert '0xabc123' in seen
+    assert '0xABC123' in seen
+    assert '0xdef456' not in seen
+
+
+def test_count_ignores_repeats():
+    seen = SeenFilter(capacity=1000)
+    for _ in range(3):
+        seen.add('0xPair')
+    seen.add('0xOther')
+    
+    assert len(seen) == 2
+
+
+def test_no_false_negatives_and_few_false_positives():
+    seen = SeenFilter(capacity=10000, error_rate=0.01)
+    added = [f"0xpair{i}" for i in range(10000)]
+    for item in added:
+        seen.add(item)
+    
+    assert all(item in seen for item in added)
+    false_positives = sum(f"0xother{i}" in seen for i in range(10000))
+    assert false_positives < 300  # ~1% expected
+
+
+def test_sizing_follows_capacity_and_error_rate():
+    small = SeenFilter(capacity=1000, error_rate=0.01)
+    strict = SeenFilter(capacity=1000, error_rate=0.0001)
+    
+    assert len(small.bits) * 8 >= small.size
+    assert strict.size > small.size
+    assert strict.hashes > small.hashes
@@ -0,0 +1,77 @@
+import threading
+import time
+
+from degen_hunter import PipelineStage, StageQueue
+
+
+def test_get_returns_highest_priority_then_fifo():
+    inbox = StageQueue(10)
+    inbox.put('low', (10,))
+    inbox.put('high-1', (90,))
+    inbox.put('high-2', (90,))
+    inbox.close()
+    
+    assert [inbox.get(), inbox.get(), inbox.get(), inbox.get()] == ['high-1', 'high-2', 'low', None]
+
+
+def test_full_shedding_queue_drops_lowest_priority():
+    inbox = StageQueue(2, shed=True)
+    assert inbox.put('a', (50,)) is None
+    assert inbox.put('b', (30,)) is None
+    
+    assert inbox.put('c', (70,)) == 'b'
+    
+    assert inbox.shed_count == 1
+    assert len(inbox) == 2
+    inbox.close()
+    assert [inbox.get(), inbox.get()] == ['c', 'a']
+
+
+def test_new_item_ranking_lowest_is_shed_itself():
+    inbox = StageQueue(2, shed=True)
+    inbox.put('a', (50,))
+    inbox.put('b', (30,))
+    
+    assert inbox.put('c', (10,)) == 'c'
+    
+    assert inbox.shed_count == 1
+    inbox.close()
+    assert [inbox.get(), inbox.get(), inbox.get()] == ['a', 'b', None]
+
+
+def test_full_blocking_queue_waits_for_a_get():
+    inbox = StageQueue(1)
+    inbox.put('a')
+    done = threading.Event()
+    producer = threading.Thread(target=lambda: (inbox.put('b'), done.set()), daemon=True)
+    producer.start()
+    
+    assert not done.wait(0.1)
+    assert inbox.get() == 'a'
+    assert done.wait(1)
+    assert inbox.get() == 'b'
+    assert inbox.max_depth == 1
+
+
+def test_stage_sheds_into_next_inbox():
+    shed = []
+    release = threading.Event()
+    sink = PipelineStage('sink', lambda item: release.wait(1) and [], maxsize=1, shed=True,
+                         priority=lambda item: (item,), on_shed=shed.append)
+    source = PipelineStage('source', lambda item: [item])
+    source.next = sink
+    sink.start()
+    source.start()
+    
+    # The sink holds its first item while the next ones compete for its one slot
+    for item in (5, 1, 9, 3):
+        source.inbox.put(item)
+        time.sleep(0.05)
+    source.inbox.close()
+    source.join(1)
+    release.set()
+    sink.join(1)
+    
+    assert shed == [1, 3]
+    assert sink.processed == 2
+    assert sink.snapshot()['shed'] == 2
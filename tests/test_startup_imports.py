@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules each entry point must leave to the code paths that use them (cold-start time)
+DEFERRED = {
+    'telegram_control': ['psutil', 'dotenv', 'subprocess', 'sqlite3'],
+    'unified_bot': ['psutil', 'dotenv', 'http.server'],
+    'degen_hunter': ['psutil', 'dotenv', 'http.server'],
+}
+
+
+def imported_after(module: str, tmp_path) -> set:
+    """sys.modules of a fresh interpreter after importing module"""
+    code = f"import sys, json, {module}; print(json.dumps(sorted(sys.modules)))"
+    env = dict(os.environ, PYTHONPATH=REPO_DIR, PYTHONDONTWRITEBYTECODE='1')
+    result = subprocess.run([sys.executable, '-c', code], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, check=True)
+    return set(json.loads(result.stdout.strip().splitlines()[-1]))
+
+
+@pytest.mark.parametrize('module', sorted(DEFERRED))
+def test_import_defers_heavy_modules(module, tmp_path):
+    loaded = imported_after(module, tmp_path)
+    
+    assert module in loaded
+    assert sorted(name for name in DEFERRED[module] if name in loaded) == []
+
+
+def test_import_does_not_create_files(tmp_path):
+    imported_after('unified_bot', tmp_path)
+    
+    assert os.listdir(tmp_path) == []
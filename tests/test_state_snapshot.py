@@ -0,0 +1,115 @@
+import struct
+
+import pytest
+
+from degen_hunter import DegenCoinHunter, SeenFilter, StateSnapshotFile
+
+
+def make_seen(*items):
+    seen = SeenFilter(capacity=1000)
+    for item in items:
+        seen.add(item)
+    return seen
+
+
+def corrupt_last_byte(path):
+    with open(path, 'r+b') as f:
+        f.seek(-1, 2)
+        last = f.read(1)
+        f.seek(-1, 2)
+        f.write(bytes([last[0] ^ 0xFF]))
+
+
+def set_version(path, version):
+    with open(path, 'r+b') as f:
+        f.seek(4)  # after the magic
+        f.write(struct.pack('<H', version))
+
+
+def test_state_and_seen_round_trip(tmp_path):
+    snapshot = StateSnapshotFile(str(tmp_path / 'state.bin'))
+    seen = make_seen('0xPair1', '0xPair2')
+    
+    snapshot.write({'cycle_count': 7, 'young_pairs': {'0xpair1': 1.5}})
+    snapshot.write_seen(seen)
+    
+    state, meta = snapshot.read()
+    assert state == {'cycle_count': 7, 'young_pairs': {'0xpair1': 1.5}}
+    assert meta['saved_at'] > 0
+    seen_meta, bits = snapshot.read_seen()
+    assert seen_meta['count'] == 2
+    assert (seen_meta['bits'], seen_meta['hashes']) == (seen.size, seen.hashes)
+    assert bits == seen.bits
+
+
+def test_missing_files_read_as_none(tmp_path):
+    snapshot = StateSnapshotFile(str(tmp_path / 'state.bin'))
+    
+    assert snapshot.read() is None
+    assert snapshot.read_seen() is None
+
+
+@pytest.mark.parametrize('seen_file', [False, True])
+def test_checksum_mismatch_reads_as_none(tmp_path, seen_file):
+    snapshot = StateSnapshotFile(str(tmp_path / 'state.bin'))
+    snapshot.write({'cycle_count': 1})
+    snapshot.write_seen(make_seen('0xPair'))
+    
+    corrupt_last_byte(snapshot.seen_path if seen_file else snapshot.path)
+    
+    assert (snapshot.read_seen() if seen_file else snapshot.read()) is None
+    assert (snapshot.read() if seen_file else snapshot.read_seen()) is not None
+
+
+@pytest.mark.parametrize('seen_file', [False, True])
+def test_version_mismatch_reads_as_none(tmp_path, seen_file):
+    snapshot = StateSnapshotFile(str(tmp_path / 'state.bin'))
+    snapshot.write({'cycle_count': 1})
+    snapshot.write_seen(make_seen('0xPair'))
+    
+    if seen_file:
+        set_version(snapshot.seen_path, snapshot.VERSION - 1)
+        assert snapshot.read_seen() is None
+    else:
+        set_version(snapshot.path, snapshot.VERSION - 1)
+        assert snapshot.read() is None
+
+
+def test_truncated_file_reads_as_none(tmp_path):
+    snapshot = StateSnapshotFile(str(tmp_path / 'state.bin'))
+    snapshot.write({'cycle_count': 1})
+    with open(snapshot.path, 'r+b') as f:
+        f.truncate(snapshot.HEADER.size + 2)
+    
+    assert snapshot.read() is None
+
+
+def test_hunter_falls_back_to_cold_start(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('SEEN_CAPACITY', '1000')
+    hunter = DegenCoinHunter('', '')
+    try:
+        hunter.seen_ready.wait(5)
+        hunter.seen_pairs.add('0xPair')
+        hunter.cycle_count = 12
+        hunter.save_state_snapshot(force=True)
+        
+        # Intact snapshot: warm start with the saved filter
+        hunter.seen_pairs = SeenFilter(capacity=1000)
+        assert hunter.restore_state_snapshot() is not None
+        assert '0xPair' in hunter.seen_pairs
+        assert hunter.cycle_count == 12
+        
+        # Corrupt seen filter: rebuild it from the database
+        corrupt_last_byte(hunter.state_file.seen_path)
+        hunter.seen_pairs = SeenFilter(capacity=1000)
+        assert hunter.restore_state_snapshot() is None
+        assert '0xPair' not in hunter.seen_pairs
+        
+        # Old snapshot format: nothing restored
+        set_version(hunter.state_file.path, StateSnapshotFile.VERSION - 1)
+        hunter.cycle_count = 0
+        assert hunter.restore_state_snapshot() is None
+        assert hunter.cycle_count == 0
+    finally:
+        hunter.db_writer.close()
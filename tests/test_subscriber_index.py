@@ -0,0 +1,72 @@
+import pytest
+
+from degen_hunter import SubscriberIndex
+
+
+def make_token(chain, score, pumping=False):
+    return {'chain': chain, 'degen_score': score, 'is_pumping': pumping}
+
+
+@pytest.fixture
+def index(monkeypatch):
+    monkeypatch.setenv('ALERT_SUBSCRIBERS', '-100A:bsc,ethereum:70; -100B:*:50:nopumps; -100C:BSC:90')
+    return SubscriberIndex.from_env('main')
+
+
+def test_route_by_chain_and_min_score(index):
+    assert index.route(make_token('bsc', 95)) == ['-100A', '-100C', '-100B']
+    assert index.route(make_token('bsc', 75)) == ['-100A', '-100B']
+    assert index.route(make_token('ethereum', 70)) == ['-100A', '-100B']
+    assert index.route(make_token('solana', 95)) == ['-100B']
+    assert index.route(make_token('bsc', 40)) == []
+
+
+def test_pumps_reach_chats_below_their_min_score_unless_nopumps(index):
+    assert index.route(make_token('bsc', 40, pumping=True)) == ['-100A', '-100C']
+    assert index.route(make_token('solana', 10, pumping=True)) == []
+
+
+def test_chat_in_several_buckets_is_routed_once(monkeypatch):
+    monkeypatch.setenv('ALERT_SUBSCRIBERS', '-100A:bsc:60;-100A:*:80')
+    index = SubscriberIndex.from_env('main')
+    
+    assert index.route(make_token('bsc', 90, pumping=True)) == ['-100A']
+
+
+def test_min_score_is_the_lowest_threshold(index):
+    assert index.min_score() == 50
+
+
+def test_defaults_to_main_chat(monkeypatch):
+    monkeypatch.delenv('ALERT_SUBSCRIBERS', raising=False)
+    monkeypatch.setenv('MIN_DEGEN_SCORE', '65')
+    
+    index = SubscriberIndex.from_env('main')
+    
+    assert index.route(make_token('base', 65)) == ['main']
+    assert index.route(make_token('base', 60)) == []
+
+
+def test_missing_fields_use_defaults(monkeypatch):
+    monkeypatch.setenv('ALERT_SUBSCRIBERS', '-100A;-100B:bsc')
+    monkeypatch.setenv('MIN_DEGEN_SCORE', '55')
+    
+    index = SubscriberIndex.from_env('main')
+    
+    assert index.subscribers == [
+        {'chat_id': '-100A', 'chains': ['*'], 'min_score': 55.0, 'pumps': True},
+        {'chat_id': '-100B', 'chains': ['bsc'], 'min_score': 55.0, 'pumps': True},
+    ]
+
+
+@pytest.mark.parametrize('spec, message', [
+    ('-100A:bsc:high', "'-100A:bsc:high': min_score 'high'"),
+    ('-100A:bsc:70:quiet', "'-100A:bsc:70:quiet': 4th field"),
+    ('-100A:bsc:70:nopumps:x', "'-100A:bsc:70:nopumps:x': expected"),
+    ('-100A:bsc:70;:bsc:70', "':bsc:70': expected"),
+])
+def test_bad_entry_is_named(monkeypatch, spec, message):
+    monkeypatch.setenv('ALERT_SUBSCRIBERS', spec)
+    
+    with pytest.raises(ValueError, match=message):
+        SubscriberIndex.from_env('main')
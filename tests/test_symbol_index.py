@@ -0,0 +1,83 @@
+from degen_hunter import SymbolIndex
+
+
+def make_token(address, symbol, name='', liquidity=10000, score=50, url=None):
+    return {'token_address': address, 'symbol': symbol, 'name': name, 'chain': 'bsc',
+            'liquidity': liquidity, 'degen_score': score, 'price': 1.0, 'url': url or f"https://dex/{address}"}
+
+
+def symbols(matches):
+    return [match['symbol'] for match in matches]
+
+
+def test_find_matches_symbol_and_name_word_prefixes():
+    index = SymbolIndex()
+    index.add(make_token('0xA', 'PEPE', 'Pepe Coin'))
+    index.add(make_token('0xB', 'DOGE', 'Moon Doge'))
+    index.add(make_token('0xC', 'CAT', 'Cat Token'))
+    
+    assert symbols(index.find('pe')) == ['PEPE']
+    assert symbols(index.find('$Dog')) == ['DOGE']
+    assert symbols(index.find('moon')) == ['DOGE']
+    assert symbols(index.find('coin')) == ['PEPE']
+    assert index.find('xyz') == []
+    assert index.find('$') == []
+
+
+def test_exact_symbol_ranks_first_then_liquidity():
+    index = SymbolIndex()
+    index.add(make_token('0xA', 'PEPE2', liquidity=900000))
+    index.add(make_token('0xB', 'PEPE', liquidity=1000))
+    index.add(make_token('0xC', 'PEPEX', liquidity=50000))
+    
+    assert symbols(index.find('pepe')) == ['PEPE', 'PEPE2', 'PEPEX']
+    assert symbols(index.find('pepe', limit=2)) == ['PEPE', 'PEPE2']
+
+
+def test_rename_replaces_the_old_terms():
+    index = SymbolIndex()
+    index.add(make_token('0xA', 'OLD', 'Old Name'))
+    
+    index.add(make_token('0xa', 'NEW', 'New Name'))
+    
+    assert index.find('old') == []
+    assert symbols(index.find('new')) == ['NEW']
+    assert len(index) == 1
+    assert sorted(term for term, _ in index.terms) == ['name', 'new', 'new name']
+
+
+def test_shallower_listing_keeps_deeper_pair_but_best_score():
+    index = SymbolIndex()
+    index.add(make_token('0xA', 'PEPE', liquidity=50000, score=40, url='https://dex/deep'))
+    
+    index.add(make_token('0xA', 'PEPE', liquidity=1000, score=90, url='https://dex/shallow'))
+    
+    match = index.find('pepe')[0]
+    assert match['url'] == 'https://dex/deep'
+    assert match['liquidity'] == 50000
+    assert match['score'] == 90
+
+
+def test_tokens_without_address_or_names_are_skipped():
+    index = SymbolIndex()
+    index.add(make_token('', 'PEPE'))
+    index.add(make_token('0xA', '', ''))
+    
+    assert len(index) == 0
+
+
+def test_load_keeps_fresher_scanned_entries():
+    index = SymbolIndex()
+    index.add(make_token('0xA', 'PEPE', liquidity=70000))
+    stored = [
+        {'token_address': '0xA', 'symbol': 'PEPE', 'name': '', 'chain': 'bsc',
+         'liquidity': 5000, 'score': 10, 'price': 0.5, 'url': ''},
+        {'token_address': '0xB', 'symbol': 'DOGE', 'name': '', 'chain': 'bsc',
+         'liquidity': 3000, 'score': 20, 'price': 0.1, 'url': ''},
+    ]
+    
+    index.load(stored)
+    
+    assert index.find('pepe')[0]['liquidity'] == 70000
+    assert symbols(index.find('doge')) == ['DOGE']
+    assert index.terms == sorted(index.terms)
@@ -0,0 +1,89 @@
+from degen_hunter import TopKSelector
+
+
+def make_launch(address, score, momentum=0, liquidity=10000, pumping=False):
+    return {'token_address': address, 'degen_score': score, 'price_change_1h': momentum,
+            'liquidity': liquidity, 'is_pumping': pumping}
+
+
+def test_keeps_best_k_in_rank_order():
+    selector = TopKSelector(2)
+    selector.extend([make_launch('0xA', 50), make_launch('0xB', 90),
+                     make_launch('0xC', 70), make_launch('0xD', 60)])
+    
+    assert [launch['token_address'] for launch in selector.ranked()] == ['0xB', '0xC']
+    assert selector.total == 4
+    assert selector.dropped == 2
+    assert selector.dropped_best == 60
+
+
+def test_momentum_breaks_score_ties():
+    selector = TopKSelector(1)
+    selector.extend([make_launch('0xA', 80, momentum=10), make_launch('0xB', 80, momentum=40)])
+    
+    assert [launch['token_address'] for launch in selector.ranked()] == ['0xB']
+
+
+def test_duplicate_listing_is_merged_not_counted():
+    selector = TopKSelector(2)
+    selector.push(make_launch('0xA', 80, liquidity=5000))
+    selector.push(make_launch('0xB', 70))
+    
+    assert selector.push(make_launch('0xa', 80, liquidity=20000, pumping=True)) is False
+    
+    merged = selector.ranked()[0]
+    assert merged['liquidity'] == 20000
+    assert merged['is_pumping'] is True
+    assert merged['other_listings'] == 1
+    assert selector.total == 2
+    assert selector.dropped == 0
+    assert len(selector.heap) == 2
+
+
+def test_drops_are_counted_per_chat():
+    routes = {'0xA': ['chat1'], '0xB': ['chat1', 'chat2'], '0xC': ['chat2']}
+    selector = TopKSelector(1, route=lambda launch: routes[launch['token_address']])
+    selector.extend([make_launch('0xA', 90), make_launch('0xB', 50), make_launch('0xC', 40)])
+    
+    assert selector.dropped_per_chat == {'chat1': 1, 'chat2': 2}
+    assert "2 more" in selector.summary('chat2')
+    assert "1 more" in selector.summary('chat1')
+    assert selector.summary('chat3') is None
+    assert "2 more" in selector.summary()
+
+
+def test_claim_hands_out_at_most_k_dispatches():
+    selector = TopKSelector(2)
+    launches = [make_launch('0xA', 50), make_launch('0xB', 60), make_launch('0xC', 70)]
+    for launch in launches:
+        selector.push(launch)
+    
+    assert selector.claim(launches[0])
+    assert selector.claim(launches[1])
+    assert not selector.claim(launches[2])
+
+
+def test_evicted_dispatched_member_is_not_counted_again():
+    selector = TopKSelector(1)
+    first = make_launch('0xA', 50)
+    selector.push(first)
+    selector.claim(first)
+    
+    selector.push(make_launch('0xB', 90))
+    
+    assert selector.dropped == 0
+    selector.settle()
+    assert selector.dropped == 1  # 0xB never got a dispatch
+
+
+def test_shed_frees_the_slot_and_summarizes():
+    selector = TopKSelector(1)
+    first, second = make_launch('0xA', 50), make_launch('0xB', 40)
+    selector.push(first)
+    selector.claim(first)
+    
+    selector.shed(first)
+    
+    assert selector.dropped == 1
+    assert selector.ranked() == []
+    assert selector.claim(second)
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+UNIFIED BOT
+Degen hunter scanning, SL/TP tracking and Telegram control in ONE process
+One asyncio event loop, one HTTP pool, one DB writer, one Telegram sender
+"""
+
+import os
+import sys
+import time
+import signal
+import asyncio
+import html
+import traceback
+import requests
+from requests.adapters import HTTPAdapter
+
+from degen_hunter import DegenCoinHunter, DatabaseWriter, TelegramTransport, install_control_handler, aligned_delay
+
+
+class UnifiedRuntime:
+    def __init__(self, with_control: bool = True):
+        self.token = os.getenv('TELEGRAM_BOT_TOKEN', '')
+        self.chat_id = os.getenv('TELEGRAM_CHAT_ID', '')
+        
+        # Shared resources
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        self.db_writer = DatabaseWriter("degen_tracker.db")
+        self.transport = TelegramTransport(
+            self.token,
+            chat_interval=float(os.getenv('TELEGRAM_CHAT_INTERVAL', '1')),
+            session=self.session
+        )
+        self.hunter = DegenCoinHunter(
+            self.token, self.chat_id,
+            http_session=self.session,
+            transport=self.transport,
+            db_writer=self.db_writer
+        )
+        
+        self.control = None
+        if with_control:
+            from telegram_control import TelegramControlBot
+            self.control = TelegramControlBot(runtime=self, session=self.session, transport=self.transport)
+        
+        self.scan_minutes = int(os.getenv('DEGEN_CHECK_INTERVAL', os.getenv('CHECK_INTERVAL', '5')))
+        self.price_seconds = float(os.getenv('PRICE_CHECK_SECONDS', '60'))
+        # Power-saving mode: every timer wakes on a shared wall-clock grid
+        self.power_save = os.getenv('POWER_SAVE', 'false').lower() == 'true'
+        
+        self.loop = None
+        self.hunter_tasks = []
+        self.started_at = time.time()
+        
+        from telegram_control import RestartBackoff
+        self.backoff = RestartBackoff()
+        self.restarts = 0
+    
+    # ------------------------------------------------------------------
+    # Tasks
+    # ------------------------------------------------------------------
+    
+    async def sleep(self, seconds: float, timer: str):
+        """Sleep one timer period (to the next grid boundary in power-saving mode)"""
+        await asyncio.sleep(aligned_delay(seconds) if self.power_save else seconds)
+        self.transport.meter.wakeup(timer)
+    
+    async def scan_loop(self):
+        """Scan new launches every scan interval"""
+        while True:
+            try:
+                await asyncio.to_thread(self.hunter.run_monitoring_cycle, False)
+                await asyncio.to_thread(self.hunter.finish_startup)
+                print(f"💤 Next scan in {self.scan_minutes} minutes...\n")
+                self.hunter.heartbeat("sleep", budget=self.scan_minutes * 60 + self.hunter.stage_budget)
+                await self.sleep(self.scan_minutes * 60, 'scan')
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Scan error: {e}")
+                await asyncio.to_thread(self.hunter.finish_startup)
+                await asyncio.sleep(60)
+    
+    async def price_loop(self):
+        """Check SL/TP for tracked tokens on their own (shorter) interval"""
+        while True:
+            try:
+                if self.hunter.tracked_tokens:
+                    await asyncio.to_thread(self.hunter.run_price_checks, 'prices')
+                self.hunter.heartbeat("sleep", budget=self.price_seconds + self.hunter.stage_budget, worker='prices')
+                await self.sleep(self.price_seconds, 'prices')
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Price check error: {e}")
+                await self.sleep(self.price_seconds, 'prices')
+    
+    async def control_loop(self):
+        """Handle Telegram commands (getUpdates long-polls, so no extra sleep)"""
+        bot = self.control
+        while True:
+            try:
+                updates = await asyncio.to_thread(bot.get_updates)
+                if updates is None:
+                    # Network error: back off instead of spinning
+                    await self.sleep(5, 'control')
+                    continue
+                
+                for update in updates:
+                    bot.last_update_id = update['update_id']
+                    
+                    message = update.get('message', {})
+                    text = message.get('text', '')
+                    from_id = str(message.get('chat', {}).get('id', ''))
+                    
+                    # Only respond to authorized user
+                    if from_id == bot.chat_id and text:
+                        print(f"📨 Received: {text}")
+                        response = await asyncio.to_thread(bot.handle_command, text)
+                        await asyncio.to_thread(bot.send_message, response)
+                        print(f"📤 Sent response")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Control error: {e}")
+                await asyncio.sleep(5)
+    
+    async def watchdog_loop(self):
+        """
+        Restart the hunter when a worker overruns its stage deadline
+        The stuck worker thread can't be killed, so it is abandoned and a
+        fresh hunter (positions reloaded from the DB) takes over
+        """
+        check_seconds = float(os.getenv('WATCHDOG_CHECK_SECONDS', '15'))
+        while True:
+            await self.sleep(check_seconds, 'watchdog')
+            if not self.is_hunter_running():
+                continue
+            
+            now = time.time()
+            for worker, beat in list(self.hunter.heartbeats.items()):
+                if now <= beat['deadline']:
+                    continue
+                
+                frame = sys._current_frames().get(beat['thread'])
+                stack = ''.join(traceback.format_stack(frame)) if frame else "(thread finished)"
+                delay = self.backoff.next_delay()
+                self.restarts += 1
+                print(f"🐕 Watchdog: {worker} stalled in {beat['stage']}")
+                
+                self._stop_hunter_tasks()
+                self.hunter.stopped = True  # the stuck thread bails out at its next stage
+                await asyncio.to_thread(
+                    self.transport.send, self.chat_id,
+                    f"🐕 <b>Watchdog:</b> {worker} stalled in stage <b>{beat['stage']}</b> "
+                    f"({now - beat['deadline']:.0f}s past deadline)\n"
+                    f"♻️ Restarting hunter in {delay:.0f}s (restart #{self.restarts})\n\n"
+                    f"<pre>{html.escape(stack[-3000:])}</pre>"
+                )
+                await asyncio.sleep(delay)
+                
+                await asyncio.to_thread(self.db_writer.flush)
+                previous = self.hunter
+                self.hunter = await asyncio.to_thread(
+                    DegenCoinHunter, self.token, self.chat_id,
+                    http_session=self.session, transport=self.transport, db_writer=self.db_writer
+                )
+                self.hunter.adopt_background(previous)
+                self._start_hunter_tasks()
+                break
+    
+    # ------------------------------------------------------------------
+    # Hunter control (called from command handlers in worker threads)
+    # ------------------------------------------------------------------
+    
+    def handle_control(self, request):
+        """Control requests always go to the current hunter (it may have been restarted)"""
+        return self.hunter.handle_control(request)
+    
+    def is_hunter_running(self) -> bool:
+        return any(not task.done() for task in self.hunter_tasks)
+    
+    def _start_hunter_tasks(self):
+        self.hunter_tasks = [
+            self.loop.create_task(self.scan_loop(), name="scan"),
+            self.loop.create_task(self.price_loop(), name="prices"),
+        ]
+    
+    def _stop_hunter_tasks(self):
+        for task in self.hunter_tasks:
+            task.cancel()
+    
+    def start_hunter(self, mode: str = "unified") -> str:
+        if mode == "nft":
+            return "❌ NFT monitor is not part of this build. Use /start or /start_degen"
+        if mode not in ("unified", "degen"):
+            return "❌ Invalid mode! Use: unified, nft, or degen"
+        if self.is_hunter_running():
+            return f"❌ Bot already running (PID: {os.getpid()})"
+        
+        self.loop.call_soon_threadsafe(self._start_hunter_tasks)
+        return f"✅ Hunter started!\n📍 Mode: {mode} (in-process)"
+    
+    def stop_hunter(self) -> str:
+        if not self.is_hunter_running():
+            return "❌ Bot is not running"
+        
+        # A cycle already in its worker thread finishes, but no new one starts
+        self.loop.call_soon_threadsafe(self._stop_hunter_tasks)
+        return "✅ Hunter stopped"
+    
+    def get_status(self) -> str:
+        """Status of this process and its tasks"""
+        import psutil
+        
+        proc = psutil.Process(os.getpid())
+        mem = proc.memory_info().rss / 1024 / 1024  # MB
+        uptime = time.time() - self.started_at
+        state = "RUNNING" if self.is_hunter_running() else "STOPPED"
+        emoji = "🟢" if state == "RUNNING" else "🔴"
+        
+        return f"""
+{emoji} <b>Hunter Status: {state}</b> (unified runtime)
+
+🆔 PID: {os.getpid()}
+⏱️ Uptime: {self.control.format_uptime(uptime)}
+💾 Memory: {mem:.1f} MB (hunter + tracker + control)
+⚡ CPU: {proc.cpu_percent(interval=0.5):.1f}%
+
+📊 Config:
+• Scan Interval: {self.scan_minutes}m
+• SL/TP Interval: {self.price_seconds:.0f}s
+"""
+    
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        
+        # Scan first: the startup message round trip runs alongside it and
+        # background jobs start after it (DegenCoinHunter.finish_startup)
+        self._start_hunter_tasks()
+        await asyncio.to_thread(self.hunter.announce_start, self.scan_minutes)
+        if os.getenv('WATCHDOG', 'true').lower() == 'true':
+            self.loop.create_task(self.watchdog_loop(), name="watchdog")
+        
+        if self.control:
+            await asyncio.to_thread(
+                self.control.send_message,
+                "🤖 <b>Unified Bot Started!</b>\n\n"
+                "Hunter, SL/TP tracker and control bot are running in one process.\n"
+                "Send /help to see available commands."
+            )
+            await self.control_loop()
+        else:
+            await asyncio.gather(*self.hunter_tasks, return_exceptions=True)
+    
+    def shutdown(self):
+        print("\n\n🛑 Unified bot stopped")
+        self.hunter.send_telegram_alert("🛑 <b>Degen Coin Hunter Stopped</b>")
+        self.hunter.shutdown()
+        self.db_writer.close()
+
+
+def main():
+    """Main entry point"""
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    if not os.getenv('TELEGRAM_BOT_TOKEN') or not os.getenv('TELEGRAM_CHAT_ID'):
+        print("❌ Missing Telegram configuration!")
+        return
+    
+    # --no-control: started by telegram_control.py, which already handles commands
+    runtime = UnifiedRuntime(with_control='--no-control' not in sys.argv)
+    install_control_handler(runtime)
+    # SIGTERM (the control bot's /stop and /restart) takes the same shutdown path as Ctrl+C,
+    # so queued writes and the state snapshot are flushed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
+    print("""
+╔═══════════════════════════════════════════════════════════╗
+║                                                           ║
+║       UNIFIED BOT - ACTIVATED                             ║
+║     Hunter + SL/TP Tracker + Control in one process       ║
+║                                                           ║
+╚═══════════════════════════════════════════════════════════╝
+""")
+    
+    try:
+        asyncio.run(runtime.run())
+    except (KeyboardInterrupt, SystemExit):
+        runtime.shutdown()
+
+
+if __name__ == "__main__":
+    main()